@@ -0,0 +1,46 @@
+"""
+Compare fetching a block range one request per block against batched, concurrent fetches.
+
+Runs against the local fake JSON-RPC node with simulated network latency:
+
+    PYTHONPATH=src:tests python benchmarks/bench_block_range.py --blocks 50 --latency 0.05
+"""
+
+import argparse
+import time
+
+from web3 import Web3
+
+from agent_backend.agent.custom_actions.block_range import JsonRpcBatchClient
+from fakes.fake_rpc import FakeRpcServer
+
+def sequential(url: str, numbers) -> None:
+    # What get_latest_block did per block: a fresh provider and one round trip each
+    for number in numbers:
+        Web3(Web3.HTTPProvider(url)).eth.get_block(number, full_transactions=True)
+
+def batched(url: str, numbers, batch_size: int, concurrency: int) -> None:
+    JsonRpcBatchClient(url, batch_size=batch_size, max_concurrency=concurrency).get_blocks(numbers)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per HTTP request")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with FakeRpcServer(head=10_000, latency=args.latency) as server:
+        numbers = list(range(10_000 - args.blocks + 1, 10_001))
+        for name, run in (
+            ("sequential", lambda: sequential(server.url, numbers)),
+            ("batched", lambda: batched(server.url, numbers, args.batch_size, args.concurrency)),
+        ):
+            server.requests.clear()
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            print(f"{name:>10}: {elapsed:.3f}s, {len(server.requests)} HTTP requests for {args.blocks} blocks")
+
+if __name__ == "__main__":
+    main()
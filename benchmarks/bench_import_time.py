@@ -0,0 +1,80 @@
+"""
+Measure cold import time of the web app with a per-module `-X importtime` breakdown.
+
+Each run imports the module in a fresh interpreter, so results include everything a
+worker pays at boot. Reports the median over runs and the slowest top-level packages:
+
+    python benchmarks/bench_import_time.py --runs 5
+    python benchmarks/bench_import_time.py --module agent_backend.agent.initialize_agent
+    python benchmarks/bench_import_time.py --budget-ms 1500   # exit 1 when over budget
+
+Set PYTHONPATH=src when running from the repository root.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Packages that must stay off the import path of agent_backend.index
+AGENT_STACK = ("langchain", "langchain_core", "langchain_openai", "cdp", "cdp_langchain", "web3")
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure(module: str) -> Tuple[int, Dict[str, int]]:
+    """Import `module` in a fresh interpreter; return its cumulative microseconds and per-package self time."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    total, packages = 0, defaultdict(int)
+    for match in LINE.finditer(result.stderr):
+        self_us, cumulative_us, _, name = int(match[1]), int(match[2]), match[3], match[4]
+        packages[name.split(".")[0]] += self_us
+        if name == module:
+            total = cumulative_us
+    return total, packages
+
+def loaded_agent_stack(module: str) -> List[str]:
+    """Agent stack packages present in sys.modules after importing `module`."""
+    code = f"import sys, {module}; print(' '.join(m for m in {AGENT_STACK!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="agent_backend.index")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Packages to list by self time")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when the median exceeds this")
+    args = parser.parse_args()
+
+    totals, per_package = [], defaultdict(list)
+    for _ in range(args.runs):
+        total, packages = measure(args.module)
+        totals.append(total)
+        for name, self_us in packages.items():
+            per_package[name].append(self_us)
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f})")
+    print(f"\n{'package':<30} {'self ms (median)':>16}")
+    ranked = sorted(per_package.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in ranked[:args.top]:
+        print(f"{name:<30} {statistics.median(samples) / 1000:>16.1f}")
+
+    stack = loaded_agent_stack(args.module)
+    print(f"\nagent stack loaded at import: {', '.join(stack) if stack else 'none'}")
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"FAIL: median {median_ms:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Offline load test of the web app: a scripted model, a fake CDP wallet and SQLite, no credentials.
+
+Starts --workers app processes (tests/fakes/fake_app.py, one port each), drives every
+scenario at --concurrency with requests spread over the workers, and reports p50/p95/p99
+latency, requests per second and per-worker RSS. Results are saved as a JSON baseline that a
+later run can be compared against:
+
+    python benchmarks/bench_load.py --workers 2 --concurrency 16 --requests 200 --output base.json
+    python benchmarks/bench_load.py --workers 2 --concurrency 16 --requests 200 --compare base.json
+    python benchmarks/bench_load.py --scenarios tokens,nfts --max-regression 10   # exit 1 on p95 regression
+
+Scenarios: chat (JSON), chat_stream (SSE; also records time to first frame), tokens, nfts.
+With --cassette, chats replay a recorded session (CASSETTE_MODE=record) instead of the scripted
+model; --input must then match the recorded prompt, and CASSETTE_LATENCY_SCALE sets the delays.
+Set PYTHONPATH=src:tests when running from the repository root (the fakes live in tests/fakes).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+SCENARIOS = ("chat", "chat_stream", "tokens", "nfts")
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of `samples` (0 < q <= 100)."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Workers:
+    """App processes on consecutive ports sharing one SQLite database."""
+
+    def __init__(self, database_url: str, app_args: List[str]) -> None:
+        self.database_url = database_url
+        self.app_args = app_args
+        self.urls: List[str] = []
+        self.processes: List[subprocess.Popen] = []
+
+    def start(self, port: int, *extra_args: str) -> None:
+        self.urls.append(f"http://127.0.0.1:{port}")
+        self.processes.append(subprocess.Popen(
+            [sys.executable, "-m", "fakes.fake_app", "--port", str(port),
+             "--database-url", self.database_url, *self.app_args, *extra_args],
+            stdout=subprocess.DEVNULL,
+        ))
+
+    def wait_ready(self, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        for url, process in zip(self.urls, self.processes):
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Worker for {url} exited with {process.returncode}")
+                try:
+                    if requests.get(f"{url}/readyz", timeout=1).status_code == 200:
+                        break
+                except requests.RequestException:
+                    pass
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Worker for {url} did not become ready")
+                time.sleep(0.2)
+
+    def rss(self) -> List[Dict[str, Any]]:
+        return [{"url": url, "pid": p.pid, "rss_mb": rss_mb(p.pid)} for url, p in zip(self.urls, self.processes)]
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+# A request returns (seconds to first byte or frame, total seconds); raising counts as an error
+Request = Callable[[requests.Session, str], Tuple[float, float]]
+
+def chat(prompt: str, stream: bool) -> Request:
+    def post(session: requests.Session, url: str) -> Tuple[float, float]:
+        started = time.perf_counter()
+        first_frame = None
+        payload = {"input": prompt, "conversation_id": str(uuid.uuid4()), "stream": stream}
+        with session.post(f"{url}/api/chat", json=payload, stream=stream, timeout=120) as response:
+            response.raise_for_status()
+            if stream:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    if first_frame is None:
+                        first_frame = time.perf_counter() - started
+                    if json.loads(line.decode()[len("data: "):]).get("type") == "error":
+                        raise RuntimeError("agent error frame")
+        elapsed = time.perf_counter() - started
+        return first_frame if first_frame is not None else elapsed, elapsed
+    return post
+
+def listing(path: str) -> Request:
+    def get(session: requests.Session, url: str) -> Tuple[float, float]:
+        started = time.perf_counter()
+        session.get(f"{url}{path}", params={"limit": 100}, timeout=30).raise_for_status()
+        elapsed = time.perf_counter() - started
+        return elapsed, elapsed
+    return get
+
+def scenario_requests(prompt: str) -> Dict[str, Request]:
+    return {
+        "chat": chat(prompt, stream=False),
+        "chat_stream": chat(prompt, stream=True),
+        "tokens": listing("/tokens"),
+        "nfts": listing("/nfts"),
+    }
+
+def run_scenario(request: Request, urls: List[str], total: int, concurrency: int) -> Dict[str, Any]:
+    """Send `total` requests from `concurrency` threads, round-robin over the workers."""
+    local = threading.local()
+
+    def one(i: int) -> Optional[Tuple[float, float]]:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        try:
+            return request(local.session, urls[i % len(urls)])
+        except Exception:
+            return None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    ok = [result for result in results if result is not None]
+    latencies = [total_s * 1000 for _, total_s in ok]
+    summary: Dict[str, Any] = {"requests": total, "errors": total - len(ok), "seconds": round(wall, 3),
+                               "rps": round(len(ok) / wall, 2) if wall else 0.0}
+    if latencies:
+        summary.update({
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "mean_ms": round(statistics.mean(latencies), 1),
+        })
+        first = [first_s * 1000 for first_s, _ in ok]
+        if first != latencies:
+            summary["first_frame_p50_ms"] = round(percentile(first, 50), 1)
+            summary["first_frame_p95_ms"] = round(percentile(first, 95), 1)
+    return summary
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], max_regression: Optional[float]) -> bool:
+    """Print the change against a baseline; False when a p95 regressed by more than max_regression percent."""
+    print(f"\nagainst baseline {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    passed = True
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or "p95_ms" not in before or "p95_ms" not in current:
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            change = (current[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(f"{key} {before[key]} -> {current[key]} ({change:+.1f}%)")
+            if key == "p95_ms" and max_regression is not None and change > max_regression:
+                passed = False
+        print(f"{name:>12}: " + ", ".join(changes))
+    return passed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--base-port", type=int, default=5101)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--first-token-latency", type=float, default=0.3)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--cdp-latency", type=float, default=0.2)
+    parser.add_argument("--seed-addresses", type=int, default=1000)
+    parser.add_argument("--database-url", default=None, help="Defaults to a fresh SQLite file")
+    parser.add_argument("--cassette", default=None, help="Replay this recorded session for chats")
+    parser.add_argument("--input", default="Deploy a token", help="Chat prompt")
+    parser.add_argument("--output", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=None, help="Fail when a p95 regresses by more (%%)")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app_args = [
+            "--first-token-latency", str(args.first_token_latency),
+            "--token-latency", str(args.token_latency),
+            "--cdp-latency", str(args.cdp_latency),
+            *(["--cassette", os.path.abspath(args.cassette)] if args.cassette else []),
+        ]
+        workers = Workers(database_url, app_args)
+        try:
+            # The first worker creates the tables and seeds the listings; the rest start after it
+            workers.start(args.base_port, "--seed-addresses", str(args.seed_addresses))
+            workers.wait_ready()
+            for i in range(1, args.workers):
+                workers.start(args.base_port + i)
+            workers.wait_ready()
+
+            results: Dict[str, Any] = {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+                "scenarios": {},
+            }
+            requests_by_scenario = scenario_requests(args.input)
+            for name in scenarios:
+                summary = run_scenario(requests_by_scenario[name], workers.urls, args.requests, args.concurrency)
+                results["scenarios"][name] = summary
+                print(f"{name:>12}: " + ", ".join(f"{key} {value}" for key, value in summary.items()))
+            results["workers"] = workers.rss()
+        finally:
+            workers.stop()
+
+    for worker in results["workers"]:
+        print(f"worker {worker['pid']} ({worker['url']}): rss {worker['rss_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            if not compare(json.load(f), results, args.max_regression):
+                print(f"FAIL: p95 regressed by more than {args.max_regression}%")
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Gunicorn configuration.
+
+The app is preloaded so the agent (CDP configuration, wallet hydration, tools, DDL) is
+initialized once in the master and inherited by every forked worker:
+
+    gunicorn --config gunicorn.conf.py agent_backend.index:app
+"""
+
+import os
+
+# Initialize at import rather than on the first request; see agent_backend.index
+os.environ.setdefault("EAGER_INIT", "true")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# Threads rather than sync workers: an agent run holds only its own thread. Admission control
+# (see agent_backend.admission) bounds the threads chats can take, by default 8 for agent runs
+# and 4 for routed lookups, including queued requests, and leaves the rest to /livez, /readyz,
+# /health, /metrics and the listings
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+timeout = 120
+worker_tmp_dir = "/dev/shm"
+loglevel = "info"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes", "on")
+
+def post_fork(server, worker):
+    # If the master could not finish initializing (or preload is off), each worker
+    # completes it in the background while /readyz keeps traffic away
+    from agent_backend import index
+    index.init_app_in_background()
+    index.get_health_monitor()
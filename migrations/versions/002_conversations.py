@@ -0,0 +1,32 @@
+"""Add conversation history table.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Create conversations table."""
+    op.create_table(
+        'conversations',
+        sa.Column('conversation_id', sa.String(255), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False, server_default=''),
+        sa.Column('messages', sa.Text(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('conversation_id')
+    )
+
+def downgrade() -> None:
+    """Drop conversations table."""
+    op.drop_table('conversations')
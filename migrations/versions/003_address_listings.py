@@ -0,0 +1,34 @@
+"""Allow address-only token and NFT rows and index them for pagination.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Make name/symbol optional, default created_at and add (created_at, address) indexes."""
+    for table in ('tokens', 'nfts'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('name', existing_type=sa.String(), nullable=True)
+            batch_op.alter_column('symbol', existing_type=sa.String(), nullable=True)
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), server_default=sa.func.now())
+        op.create_index(f'idx_{table}_created', table, ['created_at', 'address'])
+
+def downgrade() -> None:
+    """Drop the indexes and restore the original column constraints."""
+    for table in ('tokens', 'nfts'):
+        op.drop_index(f'idx_{table}_created', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), server_default=None)
+            batch_op.alter_column('symbol', existing_type=sa.String(), nullable=False)
+            batch_op.alter_column('name', existing_type=sa.String(), nullable=False)
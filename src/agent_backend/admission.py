@@ -0,0 +1,164 @@
+"""
+Admission control for /api/chat.
+
+An agent run holds a worker thread for seconds to minutes, and even a chat the intent router
+answers blocks its thread on a CDP or RPC call. Without a bound, a burst of chats takes every
+thread and /health, /metrics and the listings queue behind it until the load balancer gives
+up. Each worker has two pools, one for agent runs and a smaller one for routed lookups. Each
+admits at most `max_concurrent` chats, lets up to `max_queue` more wait briefly for a slot,
+and turns the rest away at once with 429 and a Retry-After estimate. Threads beyond both pools
+are left to the cheap endpoints (see gunicorn.conf.py).
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from agent_backend.config import get_settings
+from agent_backend.metrics import (
+    AGENT_RUN_LATENCY, CHAT_ADMISSION_IN_FLIGHT, CHAT_ADMISSION_QUEUE_DEPTH, CHAT_ADMISSION_REJECTED, CHAT_ADMISSION_WAIT
+)
+from agent_backend.utils import per_process
+
+logger = logging.getLogger(__name__)
+
+# Retry-After bounds, in seconds, the estimate used before any agent run has finished, and
+# the rough cost of a routed lookup (one CDP or RPC call)
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+DEFAULT_RUN_SECONDS = 10.0
+LOOKUP_SECONDS = 1.0
+
+AGENT_POOL = "agent"
+LOOKUP_POOL = "lookup"
+
+class Overloaded(Exception):
+    """No slot was free; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+def _agent_run_seconds() -> float:
+    return AGENT_RUN_LATENCY.mean(outcome="ok") or DEFAULT_RUN_SECONDS
+
+class AdmissionController:
+    """
+    A bounded number of concurrent chats with a short bounded wait queue in front. `run_seconds`
+    estimates how long one holds its slot, for Retry-After.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        pool: str = AGENT_POOL,
+        run_seconds: Callable[[], float] = _agent_run_seconds,
+    ) -> None:
+        self.pool = pool
+        self.run_seconds = run_seconds
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._running = 0
+        self._queued = 0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def try_acquire(self) -> bool:
+        """Take a run slot, waiting up to `queue_timeout` if every slot is busy; False if rejected."""
+        started = time.perf_counter()
+        with self._condition:
+            if self._running >= self.max_concurrent:
+                if self._queued >= self.max_queue:
+                    return self._reject("queue_full")
+                self._queued += 1
+                self.stats["queued"] += 1
+                CHAT_ADMISSION_QUEUE_DEPTH.set(self._queued, pool=self.pool)
+                try:
+                    admitted = self._condition.wait_for(lambda: self._running < self.max_concurrent, self.queue_timeout)
+                finally:
+                    self._queued -= 1
+                    CHAT_ADMISSION_QUEUE_DEPTH.set(self._queued, pool=self.pool)
+                if not admitted:
+                    return self._reject("timeout")
+            self._running += 1
+            self.stats["admitted"] += 1
+            CHAT_ADMISSION_IN_FLIGHT.set(self._running, pool=self.pool)
+        CHAT_ADMISSION_WAIT.observe(time.perf_counter() - started, pool=self.pool)
+        return True
+
+    def _reject(self, reason: str) -> bool:
+        # Called with the condition held
+        self.stats[f"rejected_{reason}"] += 1
+        CHAT_ADMISSION_REJECTED.inc(pool=self.pool, reason=reason)
+        logger.warning(f"Rejected chat request for the {self.pool} pool ({reason}): {self._running} running, {self._queued} queued")
+        return False
+
+    @contextmanager
+    def admitted(self) -> Iterator[None]:
+        """Hold a slot for the block; raises Overloaded when rejected."""
+        if not self.try_acquire():
+            raise Overloaded(self.retry_after())
+        try:
+            yield
+        finally:
+            self.release()
+
+    def release(self) -> None:
+        """Free a slot taken by try_acquire and wake one waiting request."""
+        with self._condition:
+            self._running -= 1
+            CHAT_ADMISSION_IN_FLIGHT.set(self._running, pool=self.pool)
+            self._condition.notify()
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from how long a chat typically holds one."""
+        with self._condition:
+            waiting = self._queued + 1
+        estimate = math.ceil(self.run_seconds() * waiting / self.max_concurrent)
+        return max(MIN_RETRY_AFTER, min(MAX_RETRY_AFTER, estimate))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                **self.stats,
+                "pool": self.pool,
+                "running": self._running,
+                "queue_depth": self._queued,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+            }
+
+# Each forked worker counts its own chats
+@per_process
+def _admission_controller() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(settings.chat_max_concurrency, settings.chat_max_queue, settings.chat_queue_timeout)
+
+@per_process
+def _lookup_admission_controller() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(
+        settings.chat_lookup_max_concurrency,
+        settings.chat_lookup_max_queue,
+        settings.chat_queue_timeout,
+        pool=LOOKUP_POOL,
+        run_seconds=lambda: LOOKUP_SECONDS,
+    )
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Get the process-wide admission controller for agent runs, or None when admission control is disabled."""
+    if get_settings().chat_max_concurrency <= 0:
+        return None
+    return _admission_controller()
+
+def get_lookup_admission_controller() -> Optional[AdmissionController]:
+    """Get the process-wide admission controller for chats the intent router answers, or None when disabled."""
+    if get_settings().chat_lookup_max_concurrency <= 0:
+        return None
+    return _lookup_admission_controller()
@@ -0,0 +1,24 @@
+from decimal import Decimal
+from typing import Any, Dict
+
+from eth_utils import to_checksum_address
+
+from agent_backend.agent.custom_actions.get_latest_block import get_web3
+
+WEI_PER_ETH = 10 ** 18
+
+def checksum_address(address: str) -> str:
+    """`address` in its EIP-55 checksum spelling, so every caller shares one cache and single-flight key."""
+    return to_checksum_address(address)
+
+def get_address_balance(address: str) -> Dict[str, Any]:
+    """Get the ETH balance of any address on Base Sepolia, read from the RPC node at the latest block."""
+    response = get_web3().provider.make_request("eth_getBalance", [address, "latest"])
+    if response.get("error") or response.get("result") is None:
+        raise Exception(f"Failed to fetch balance of {address} from Base Sepolia: {response.get('error')}")
+    balance_wei = int(response["result"], 16)
+    return {
+        "address": address,
+        "balance_wei": str(balance_wei),
+        "balance_eth": f"{Decimal(balance_wei) / WEI_PER_ETH:f}",
+    }
@@ -0,0 +1,145 @@
+"""Columnar block representation and vectorized block analytics."""
+
+import copy
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from eth_utils import to_checksum_address
+
+WEI_PER_ETH = 10 ** 18
+WEI_PER_GWEI = 10 ** 9
+GAS_PRICE_PERCENTILES = (50, 90, 99)
+# Receiver id used for contract-creation transactions (no "to" address)
+CONTRACT_CREATION = -1
+
+@lru_cache(maxsize=65536)
+def _checksum(address: str) -> str:
+    return to_checksum_address(address)
+
+@dataclass(frozen=True, eq=False)
+class ColumnarBlock:
+    """
+    One block's transactions as NumPy columns. Addresses are interned per block: sender_ids and
+    receiver_ids index into addresses. Values are float64 wei, exact below 2**53 wei (~0.009 ETH)
+    and within float rounding above that.
+    """
+    number: int
+    timestamp: int
+    hash: str
+    addresses: Tuple[str, ...]
+    value_wei: np.ndarray
+    gas: np.ndarray
+    gas_price: np.ndarray  # wei, NaN when the transaction type has no gasPrice
+    sender_ids: np.ndarray
+    receiver_ids: np.ndarray  # CONTRACT_CREATION for deployments
+
+    @property
+    def transactions_count(self) -> int:
+        return len(self.value_wei)
+
+def columnar_block_from_rpc(block: Dict[str, Any]) -> ColumnarBlock:
+    """Build a ColumnarBlock from a raw eth_getBlockByNumber result fetched with full transactions."""
+    transactions = block["transactions"]
+    ids: Dict[str, int] = {}
+    senders = [ids.setdefault(tx["from"], len(ids)) for tx in transactions]
+    receivers = [ids.setdefault(tx["to"], len(ids)) if tx.get("to") else CONTRACT_CREATION for tx in transactions]
+    gas_prices = [int(tx["gasPrice"], 16) if tx.get("gasPrice") else np.nan for tx in transactions]
+
+    return ColumnarBlock(
+        number=int(block["number"], 16),
+        timestamp=int(block["timestamp"], 16),
+        hash=block["hash"],
+        addresses=tuple(_checksum(address) for address in ids),
+        value_wei=np.array([int(tx["value"], 16) for tx in transactions], dtype=np.float64),
+        gas=np.array([int(tx["gas"], 16) for tx in transactions], dtype=np.int64),
+        gas_price=np.array(gas_prices, dtype=np.float64),
+        sender_ids=np.array(senders, dtype=np.int32),
+        receiver_ids=np.array(receivers, dtype=np.int32),
+    )
+
+def _concat(blocks: Sequence[ColumnarBlock]):
+    """Concatenate blocks into one set of columns with address ids interned across the window."""
+    window_ids: Dict[str, int] = {}
+    sender_ids, receiver_ids = [], []
+    for block in blocks:
+        # Map block-local ids to window ids; one Python step per unique address, not per transaction
+        remap = np.array([window_ids.setdefault(address, len(window_ids)) for address in block.addresses] + [CONTRACT_CREATION], dtype=np.int32)
+        sender_ids.append(remap[block.sender_ids])
+        receiver_ids.append(remap[block.receiver_ids])  # CONTRACT_CREATION (-1) picks the trailing sentinel
+
+    def column(name: str, dtype) -> np.ndarray:
+        arrays = [getattr(block, name) for block in blocks]
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+    return (
+        list(window_ids),
+        column("value_wei", np.float64),
+        column("gas", np.int64),
+        column("gas_price", np.float64),
+        np.concatenate(sender_ids) if sender_ids else np.empty(0, dtype=np.int32),
+        np.concatenate(receiver_ids) if receiver_ids else np.empty(0, dtype=np.int32),
+    )
+
+def _top_by_value(ids: np.ndarray, values: np.ndarray, addresses: List[str], top_n: int) -> List[Dict[str, Any]]:
+    if not len(ids):
+        return []
+    totals = np.bincount(ids, weights=values, minlength=len(addresses))
+    counts = np.bincount(ids, minlength=len(addresses))
+    n = min(top_n, int(np.count_nonzero(counts)))
+    candidates = np.argpartition(-totals, n - 1)[:n] if n < len(totals) else np.arange(len(totals))
+    ranked = candidates[np.lexsort((-counts[candidates], -totals[candidates]))][:n]
+    return [
+        {"address": addresses[i], "value_eth": float(totals[i] / WEI_PER_ETH), "transactions": int(counts[i])}
+        for i in ranked
+    ]
+
+def summarize_blocks(blocks: Sequence[ColumnarBlock], top_n: int = 5) -> Dict[str, Any]:
+    """Compute totals, gas-price percentiles, top senders/receivers and contract creations over a window of blocks."""
+    addresses, value_wei, gas, gas_price, sender_ids, receiver_ids = _concat(blocks)
+
+    is_creation = receiver_ids == CONTRACT_CREATION
+    receiver_mask = ~is_creation
+    priced = gas_price[~np.isnan(gas_price)]
+    percentiles = np.percentile(priced, GAS_PRICE_PERCENTILES) / WEI_PER_GWEI if len(priced) else [None] * len(GAS_PRICE_PERCENTILES)
+    unique_senders = np.unique(sender_ids)
+    unique_receivers = np.unique(receiver_ids[receiver_mask])
+
+    return {
+        "blocks_count": len(blocks),
+        "first_block": blocks[0].number if blocks else None,
+        "last_block": blocks[-1].number if blocks else None,
+        "transactions_count": int(len(value_wei)),
+        "total_value_transferred": float(value_wei.sum() / WEI_PER_ETH),
+        "total_gas": int(gas.sum()),
+        "contract_creations": int(is_creation.sum()),
+        "gas_price_gwei": {
+            f"p{p}": (round(float(v), 6) if v is not None else None)
+            for p, v in zip(GAS_PRICE_PERCENTILES, percentiles)
+        },
+        "top_senders": _top_by_value(sender_ids, value_wei, addresses, top_n),
+        "top_receivers": _top_by_value(receiver_ids[receiver_mask], value_wei[receiver_mask], addresses, top_n),
+        "address_summary": {
+            "unique_senders": [addresses[i] for i in unique_senders],
+            "unique_receivers": [addresses[i] for i in unique_receivers],
+            "total_unique_addresses": int(len(np.union1d(unique_senders, unique_receivers))),
+        },
+    }
+
+def summarize_block(block: ColumnarBlock) -> Dict[str, Any]:
+    """Summary of a single block, as returned by get_latest_block. Cached per block; each caller gets its own copy."""
+    return copy.deepcopy(_block_summary(block))
+
+@lru_cache(maxsize=64)
+def _block_summary(block: ColumnarBlock) -> Dict[str, Any]:
+    summary = summarize_blocks([block])
+    for key in ("blocks_count", "first_block", "last_block"):
+        summary.pop(key)
+    return {
+        "block_number": block.number,
+        "timestamp": datetime.fromtimestamp(block.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+        "hash": block.hash,
+        **summary,
+    }
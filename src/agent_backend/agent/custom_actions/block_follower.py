@@ -0,0 +1,111 @@
+"""Background follower that keeps the most recent blocks in memory."""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+from agent_backend.agent.custom_actions.block_analytics import ColumnarBlock
+
+logger = logging.getLogger(__name__)
+
+class BlockFollower:
+    """
+    Polls the chain head on a background thread and keeps the last N decoded blocks in a ring buffer,
+    so readers get the latest block from memory instead of a round trip to the RPC node.
+    """
+
+    def __init__(
+        self,
+        get_head: Callable[[], int],
+        fetch_block: Callable[[int], ColumnarBlock],
+        buffer_size: int,
+        poll_interval: float,
+    ) -> None:
+        self.get_head = get_head
+        self.fetch_block = fetch_block
+        self.poll_interval = poll_interval
+        self._blocks: Deque[ColumnarBlock] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Monotonic time at which the buffered head was last confirmed against the node
+        self._synced_at: Optional[float] = None
+        self.stats = {"polls": 0, "blocks_fetched": 0, "errors": 0}
+
+    def start(self) -> None:
+        """Start following the chain head (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="block-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def poll_once(self) -> None:
+        """Fetch any blocks newer than the buffered head."""
+        head = self.get_head()
+        self.stats["polls"] += 1
+        with self._lock:
+            buffered = self._blocks[-1].number if self._blocks else None
+
+        if buffered is None:
+            # First sync only needs the head; history fills in as new blocks land
+            numbers = [head]
+        else:
+            numbers = list(range(max(buffered + 1, head - self._blocks.maxlen + 1), head + 1))
+
+        for number in numbers:
+            self.add(self.fetch_block(number))
+            self.stats["blocks_fetched"] += 1
+
+        with self._lock:
+            self._synced_at = time.monotonic()
+
+    def add(self, block: ColumnarBlock) -> None:
+        """Add a decoded block if it is newer than the buffered head."""
+        with self._lock:
+            if not self._blocks or block.number > self._blocks[-1].number:
+                self._blocks.append(block)
+
+    def latest(self, max_staleness: float) -> Optional[ColumnarBlock]:
+        """The newest buffered block, or None if the head was not confirmed within max_staleness seconds."""
+        with self._lock:
+            if not self._blocks or self._synced_at is None:
+                return None
+            if time.monotonic() - self._synced_at > max_staleness:
+                return None
+            return self._blocks[-1]
+
+    def get(self, number: int) -> Optional[ColumnarBlock]:
+        """A buffered block by number, if it is still in the ring buffer."""
+        with self._lock:
+            for block in reversed(self._blocks):
+                if block.number == number:
+                    return block
+        return None
+
+    def recent(self) -> List[ColumnarBlock]:
+        """All buffered blocks, oldest first."""
+        with self._lock:
+            return list(self._blocks)
+
+    def lag(self) -> Optional[float]:
+        """Seconds since the head was last confirmed, or None before the first sync."""
+        with self._lock:
+            return None if self._synced_at is None else time.monotonic() - self._synced_at
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Block follower poll failed: {e}")
+            self._stop.wait(self.poll_interval)
@@ -0,0 +1,169 @@
+"""Batched, concurrent JSON-RPC fetches for ranges of blocks."""
+
+import itertools
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from agent_backend.cassette import get_cassette
+from agent_backend.config import get_settings
+from agent_backend.agent.custom_actions.block_analytics import ColumnarBlock, columnar_block_from_rpc, summarize_blocks
+from agent_backend.agent.custom_actions.get_latest_block import get_block_follower
+from agent_backend.utils import per_process
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class JsonRpcError(Exception):
+    """Error returned by the JSON-RPC node for a call."""
+
+class BlockNotFoundError(LookupError):
+    """The node has no such blocks: they are past its head, or it has pruned them."""
+
+    def __init__(self, missing: List[int]) -> None:
+        super().__init__(f"Blocks not found: {missing}")
+        self.missing = missing
+
+class JsonRpcBatchClient:
+    """JSON-RPC client that sends calls as batch requests over a reused keep-alive session."""
+
+    def __init__(
+        self,
+        url: str,
+        batch_size: int = 10,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        timeout: float = 10.0,
+        backoff: float = 0.25,
+    ) -> None:
+        self.url = url
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self._ids = itertools.count(1)
+        self.session = requests.Session()
+        # One pooled connection per concurrent batch
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="jsonrpc")
+        self.stats = {"requests": 0, "calls": 0, "retries": 0}
+
+    def call(self, method: str, params: Sequence[Any] = ()) -> Any:
+        """Make a single call."""
+        return self.batch([(method, params)])[0]
+
+    def batch(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Send calls as one batch request and return their results in order."""
+        payload = [
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+            for method, params in calls
+        ]
+        responses = self._post(payload)
+        by_id = {response.get("id"): response for response in responses}
+        results = []
+        for request in payload:
+            response = by_id.get(request["id"])
+            if response is None:
+                raise JsonRpcError(f"No response for {request['method']} (id {request['id']})")
+            if response.get("error"):
+                raise JsonRpcError(f"{request['method']} failed: {response['error']}")
+            results.append(response.get("result"))
+        return results
+
+    def map_batches(self, calls: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Split calls into batches of batch_size and run up to max_concurrency batches at once."""
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        return [result for chunk in self._executor.map(self.batch, chunks) for result in chunk]
+
+    def _post(self, payload: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.stats["requests"] += 1
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRYABLE_STATUSES:
+                    response.raise_for_status()
+                    self.stats["calls"] += len(payload)
+                    body = response.json()
+                    # Some nodes answer a rejected batch with a single error object
+                    if isinstance(body, dict):
+                        raise JsonRpcError(f"Batch rejected: {body.get('error')}")
+                    return body
+                error: Exception = requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            self.stats["retries"] += 1
+            # Exponential backoff with jitter so concurrent batches do not retry in lockstep
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            logger.debug(f"JSON-RPC batch failed ({error}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    def get_block_number(self) -> int:
+        return int(self.call("eth_blockNumber"), 16)
+
+    def get_blocks(self, numbers: Sequence[int]) -> List[ColumnarBlock]:
+        """Fetch blocks with full transactions, batched and concurrent, as columnar blocks."""
+        results = self.map_batches([("eth_getBlockByNumber", [hex(number), True]) for number in numbers])
+        missing = [number for number, result in zip(numbers, results) if result is None]
+        if missing:
+            raise BlockNotFoundError(missing)
+        return [columnar_block_from_rpc(result) for result in results]
+
+# Its session and worker threads do not survive a fork
+@per_process
+def get_rpc_client() -> JsonRpcBatchClient:
+    """Get the process-wide batch client for the configured RPC node."""
+    settings = get_settings()
+    client = JsonRpcBatchClient(
+        settings.rpc_url,
+        batch_size=settings.rpc_batch_size,
+        max_concurrency=settings.rpc_max_concurrency,
+        max_retries=settings.rpc_max_retries,
+        timeout=settings.rpc_timeout,
+    )
+    cassette = get_cassette()
+    if cassette is not None:
+        cassette.mount(client.session)
+    return client
+
+def fetch_block_range(start: int, end: int) -> List[ColumnarBlock]:
+    """
+    Get blocks start..end (inclusive), oldest first. Blocks still in the follower's
+    ring buffer are served from memory; the rest are fetched in batches.
+    """
+    if end < start:
+        raise ValueError(f"Invalid block range {start}..{end}")
+    limit = get_settings().block_range_limit
+    if end - start + 1 > limit:
+        raise ValueError(f"Block range {start}..{end} exceeds the limit of {limit} blocks")
+
+    follower = get_block_follower()
+    buffered = {block.number: block for block in follower.recent()} if follower else {}
+    missing = [number for number in range(start, end + 1) if number not in buffered]
+    fetched = {block.number: block for block in get_rpc_client().get_blocks(missing)} if missing else {}
+    return [buffered.get(number) or fetched[number] for number in range(start, end + 1)]
+
+def get_recent_blocks(count: int = 10) -> Dict[str, Any]:
+    """
+    Get analytics over the last `count` Base Sepolia blocks: total value transferred, gas used, gas price
+    percentiles, top senders and receivers by value, and contract creations.
+
+    Use this for questions about more than the latest block, such as activity or trends over recent blocks.
+    """
+    settings = get_settings()
+    count = max(1, min(count, settings.block_range_limit))
+    follower = get_block_follower()
+    head_block = follower.latest(settings.block_max_staleness) if follower else None
+    head = head_block.number if head_block is not None else get_rpc_client().get_block_number()
+    return summarize_blocks(fetch_block_range(head - count + 1, head))
@@ -1,69 +1,82 @@
-from web3 import Web3
-from datetime import datetime
-from typing import Set, Dict, List, Any
-from decimal import Decimal
+import logging
+from typing import TYPE_CHECKING, Dict, Any, Optional, Union
+
+from agent_backend.cassette import get_cassette
+from agent_backend.config import get_settings
+from agent_backend.agent.custom_actions.block_analytics import ColumnarBlock, columnar_block_from_rpc, summarize_block
+from agent_backend.agent.custom_actions.block_follower import BlockFollower
+from agent_backend.utils import per_process
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+# The Web3 client and follower do not survive a fork
+@per_process
+def get_web3() -> "Web3":
+    """Get the process-wide Web3 client for Base Sepolia, reusing its HTTP session."""
+    # web3 takes over a second to import; load it on the first block query
+    from web3 import Web3
+    provider = Web3.HTTPProvider(get_settings().rpc_url)
+    cassette = get_cassette()
+    if cassette is not None:
+        provider.make_request = cassette.wrap_make_request(provider.make_request)
+    return Web3(provider)
+
+def fetch_block(block_identifier: Union[int, str] = 'latest') -> ColumnarBlock:
+    """Fetch a block with its transactions straight from the RPC node as columns."""
+    # Raw JSON-RPC skips web3's per-field result formatters; the columns are decoded from hex directly
+    tag = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+    response = get_web3().provider.make_request("eth_getBlockByNumber", [tag, True])
+    if response.get("error") or not response.get("result"):
+        raise Exception(f"Failed to fetch block {block_identifier} from Base Sepolia: {response.get('error')}")
+    return columnar_block_from_rpc(response["result"])
+
+@per_process
+def _block_follower() -> BlockFollower:
+    settings = get_settings()
+    w3 = get_web3()
+    follower = BlockFollower(
+        get_head=lambda: w3.eth.block_number,
+        fetch_block=fetch_block,
+        buffer_size=settings.block_buffer_size,
+        poll_interval=settings.block_poll_interval,
+    )
+    follower.start()
+    return follower
+
+def get_block_follower() -> Optional[BlockFollower]:
+    """Get this process's block follower, starting it on first use. None when disabled."""
+    if not get_settings().block_follower_enabled:
+        return None
+    return _block_follower()
+
+def get_follower_head() -> Optional[int]:
+    """The chain head the block follower confirmed within BLOCK_MAX_STALENESS, if any."""
+    follower = get_block_follower()
+    if follower is None:
+        return None
+    block = follower.latest(get_settings().block_max_staleness)
+    return block.number if block is not None else None
 
 def get_latest_block() -> Dict[str, Any]:
     """
     Get real time block data from the Base Sepolia network, including all addresses involved in transactions
     and total value transferred.
-    
+
     This function MUST be called every time in order to receive the latest block information.
     """
-    # Connect to Base Sepolia network
-    base_sepolia_rpc = "https://sepolia.base.org"
-    w3 = Web3(Web3.HTTPProvider(base_sepolia_rpc))
-    
-    # Check connection
-    if not w3.is_connected():
-        raise Exception("Failed to connect to Base Sepolia network")
-
-    # Get latest block
-    latest_block = w3.eth.get_block('latest', full_transactions=True)
-    
-    # Initialize sets to store unique addresses and total value
-    sender_addresses: Set[str] = set()
-    receiver_addresses: Set[str] = set()
-    total_value_eth: Decimal = Decimal('0')
-    
-    # Process all transactions in the block
-    transactions_data: List[Dict[str, Any]] = []
-    
-    for tx in latest_block.transactions:
-        # Add sender address
-        sender_addresses.add(tx["from"])
-        
-        # Add receiver address if it exists
-        if tx["to"]:
-            receiver_addresses.add(tx["to"])
+    settings = get_settings()
+    follower = get_block_follower()
+    if follower is not None:
+        block = follower.latest(settings.block_max_staleness)
+        if block is not None:
+            return summarize_block(block)
 
-        # Convert value to ETH and add to total
-        tx_value_eth = Decimal(str(w3.from_wei(tx["value"], 'ether')))
-        total_value_eth += tx_value_eth
-        
-        # Store transaction data
-        tx_data = {
-            "hash": tx.hash.hex(),
-            "from": tx["from"],
-            "to": tx["to"] if tx["to"] else "Contract Creation",
-            "value": tx_value_eth,
-            "gas_price": w3.from_wei(tx["gasPrice"], 'gwei') if "gasPrice" in tx else None,
-            "gas": tx["gas"]
-        }
-        transactions_data.append(tx_data)
-    
-    # Compile block data
-    block_data = {
-        "block_number": latest_block.number,
-        "timestamp": datetime.fromtimestamp(latest_block.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
-        "hash": latest_block.hash.hex(),
-        "transactions_count": len(latest_block.transactions),
-        "total_value_transferred": float(total_value_eth),
-        "address_summary": {
-            "unique_senders": list(sender_addresses),
-            "unique_receivers": list(receiver_addresses),
-            "total_unique_addresses": len(sender_addresses.union(receiver_addresses))
-        }
-    }
-    
-    return block_data
\ No newline at end of file
+    # Follower disabled, still warming up, or lagging behind: go to the node directly
+    logger.debug("Block follower has no fresh head, fetching latest block directly")
+    block = fetch_block('latest')
+    if follower is not None:
+        follower.add(block)
+    return summarize_block(block)
@@ -1,20 +1,21 @@
+import logging
 import re
 from agent_backend.constants import DEPLOY_TOKEN, DEPLOY_NFT
-from agent_backend.db.tokens import add_token
-from agent_backend.db.nfts import add_nft
+from agent_backend.agent.outbox import get_outbox
+
+logger = logging.getLogger(__name__)
 
 def handle_agent_action(agent_action: str, content: str) -> None:
     """
     Adds handling for the agent action.
     In our sample app, we just add deployed tokens and NFTs to the database.
+    Writes go through the outbox so the response stream never waits on the database.
     """
-    if agent_action == DEPLOY_TOKEN:
-        # Search for contract address from output
-        address = re.search(r'0x[a-fA-F0-9]{40}', content).group()
-        # Add token to database
-        add_token(address)
-    if agent_action == DEPLOY_NFT:
+    if agent_action in (DEPLOY_TOKEN, DEPLOY_NFT):
         # Search for contract address from output
-        address = re.search(r'0x[a-fA-F0-9]{40}', content).group()
-        # Add NFT to database
-        add_nft(address)
\ No newline at end of file
+        match = re.search(r'0x[a-fA-F0-9]{40}', content)
+        if match is None:
+            logger.warning(f"No contract address in {agent_action} output")
+            return
+        # Queue the token or NFT for the database
+        get_outbox().publish(agent_action, match.group())
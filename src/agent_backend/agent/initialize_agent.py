@@ -2,7 +2,7 @@ import os
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import datetime
 
 from cdp import Cdp, Wallet
@@ -11,14 +11,34 @@ from cdp_langchain.tools.cdp_tool import CdpTool
 from cdp_langchain.agent_toolkits.cdp_toolkit import CDP_ACTIONS
 from langchain.agents import AgentExecutor
 from langchain.agents.format_scratchpad import format_to_openai_function_messages
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
 from langchain.agents.output_parsers import OpenAIFunctionsAgentOutputParser
+from langchain.agents.output_parsers.tools import ToolsAgentOutputParser
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools.render import format_tool_to_openai_function
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_openai import ChatOpenAI
 
+from agent_backend.cassette import REPLAY, Cassette, get_cassette
 from agent_backend.config import get_settings
-from agent_backend.constants import AGENT_MODEL, AGENT_PROMPT, WALLET_ID_ENV_VAR
+from agent_backend.constants import (
+    AGENT_MODEL, AGENT_PROMPT, BLOCK_CACHED_ACTIONS, GET_ADDRESS_BALANCE, GET_LATEST_BLOCK, GET_RECENT_BLOCKS,
+    READ_ONLY_ACTIONS, READ_TOOL_OUTPUT, WALLET_ID_ENV_VAR,
+)
 from agent_backend.db.wallet import save_wallet_info, get_wallet_info
+from agent_backend.agent.llm_cache import get_response_cache
+from agent_backend.agent.metrics_callback import MetricsCallbackHandler
+from agent_backend.agent.parallel_executor import ParallelAgentExecutor
+from agent_backend.agent.single_flight import get_single_flight
+from agent_backend.agent.tool_cache import get_tool_cache
+from agent_backend.agent.tool_output import get_tool_output_store, read_tool_output
+from agent_backend.agent.tool_selection import ToolSelector
+from agent_backend.agent.custom_actions.get_latest_block import get_latest_block
+from agent_backend.agent.custom_actions.block_range import get_recent_blocks
+from agent_backend.agent.custom_actions.address_balance import get_address_balance
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -112,9 +132,51 @@ def initialize_wallet(config: Dict[str, str]) -> Wallet:
         logger.error(f"Failed to create Developer-Managed wallet: {e}")
         raise
 
+def create_block_tools() -> List[BaseTool]:
+    """Create tools backed by the Base Sepolia RPC node rather than the CDP SDK."""
+    return [
+        StructuredTool.from_function(
+            func=get_latest_block,
+            name=GET_LATEST_BLOCK,
+            description=get_latest_block.__doc__,
+        ),
+        StructuredTool.from_function(
+            func=get_recent_blocks,
+            name=GET_RECENT_BLOCKS,
+            description=get_recent_blocks.__doc__,
+        ),
+        StructuredTool.from_function(
+            func=get_address_balance,
+            name=GET_ADDRESS_BALANCE,
+            description=get_address_balance.__doc__,
+        ),
+    ]
+
+def _reset_cdp_connections_after_fork() -> None:
+    """Drop CDP API connections inherited from the parent process.
+
+    With gunicorn --preload the agent is initialized in the master, so its keep-alive
+    connections to the CDP API would otherwise be shared by every forked worker.
+    """
+    cdp_client = getattr(Cdp.api_clients, "_cdp_client", None)
+    rest_client = getattr(cdp_client, "rest_client", None)
+    if rest_client is not None:
+        rest_client.pool_manager.clear()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_cdp_connections_after_fork)
+
 def initialize_agent() -> AgentExecutor:
     """Initialize the agent with the CDP configuration and tools."""
     settings = get_settings()
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == REPLAY:
+        # CDP actions and model responses all come from the cassette: no credentials, SDK or wallet
+        logger.info(f"Replaying agent traffic from {cassette.path}")
+        agentkit = CdpAgentkitWrapper.model_construct(
+            wallet=None, network_id=settings.network_id, cdp_api_key_name=None, cdp_api_key_private_key=None
+        )
+        return create_agent_executor(create_llm(cassette), agentkit, cassette)
     
     # Get CDP configuration from environment variables
     cdp_api_key_name = os.getenv("CDP_API_KEY_NAME")
@@ -151,21 +213,73 @@ def initialize_agent() -> AgentExecutor:
     agentkit = CdpAgentkitWrapper(**values)
     logger.info("CDP Agentkit wrapper initialized successfully")
 
-    # Initialize LLM and tools
-    llm = ChatOpenAI(model=AGENT_MODEL, temperature=0)
+    return create_agent_executor(create_llm(cassette), agentkit, cassette)
+
+def create_llm(cassette: Optional[Cassette] = None) -> ChatOpenAI:
+    """The agent's chat model, talking to OpenAI through the cassette when one is active."""
+    options: Dict[str, Any] = {}
+    if cassette is not None:
+        options["http_client"] = cassette.httpx_client()
+        if cassette.mode == REPLAY:
+            # A cassette miss is not transient; retrying would only add backoff to the profile
+            options["max_retries"] = 0
+            if not os.getenv("OPENAI_API_KEY"):
+                options["api_key"] = "cassette-replay"
+    # streaming=True makes the model emit tokens through callbacks for the SSE chat mode;
+    # temperature=0 makes responses deterministic enough to cache
+    # stream_usage=True asks for token usage on streamed responses, for the token histograms
+    return ChatOpenAI(
+        model=AGENT_MODEL,
+        temperature=0,
+        streaming=True,
+        stream_usage=True,
+        cache=get_response_cache(),
+        **options,
+    )
+
+def create_agent_executor(
+    llm: BaseChatModel, agentkit: CdpAgentkitWrapper, cassette: Optional[Cassette] = None
+) -> AgentExecutor:
+    """
+    Build the agent over the CDP actions (run through `agentkit`) and the block tools.
+    With PARALLEL_TOOL_CALLS the model may ask for several tools per turn and the read-only
+    ones run concurrently; otherwise it makes one legacy function call per turn.
+    With a cassette, CDP actions are recorded or replayed.
+    """
+    settings = get_settings()
+    metrics = MetricsCallbackHandler()
+    # Attached to this agent's binding rather than the model, which the caller may share
+    model = llm.with_config(callbacks=[metrics])
     tools = [
         CdpTool(
             name=action.name,
             description=action.description,
-            func=action.func,
+            func=cassette.wrap_action(action.func) if cassette is not None else action.func,
             args_schema=action.args_schema,
             cdp_agentkit_wrapper=agentkit
         )
         for action in CDP_ACTIONS
     ]
+    tools.extend(create_block_tools())
+    tool_outputs = get_tool_output_store()
+    if tool_outputs is not None:
+        tools.append(StructuredTool.from_function(
+            func=read_tool_output,
+            name=READ_TOOL_OUTPUT,
+            description=read_tool_output.__doc__,
+        ))
+    single_flight = get_single_flight()
+    tool_cache = get_tool_cache()
+    for tool in tools:
+        tool.callbacks = [metrics]
+        if single_flight is not None and tool.name in READ_ONLY_ACTIONS:
+            tool.func = single_flight.wrap(tool.name, tool.func)
+        if tool_cache is not None and tool.name in BLOCK_CACHED_ACTIONS:
+            tool.func = tool_cache.wrap(tool.name, tool.func)
+        elif tool_cache is not None and tool.name not in READ_ONLY_ACTIONS:
+            tool.func = tool_cache.invalidating(tool.func)
     
     logger.info(f"Created {len(tools)} tools from CDP actions")
-    tool_functions = [format_tool_to_openai_function(t) for t in tools]
     
     # Create the prompt template and agent
     prompt = ChatPromptTemplate.from_messages([
@@ -174,17 +288,39 @@ def initialize_agent() -> AgentExecutor:
         MessagesPlaceholder(variable_name="agent_scratchpad"),
     ])
 
-    llm_with_tools = llm.bind(functions=tool_functions)
+    if settings.parallel_tool_calls:
+        kwarg, to_schema = "tools", convert_to_openai_tool
+        format_scratchpad, output_parser = format_to_tool_messages, ToolsAgentOutputParser()
+    else:
+        kwarg, to_schema = "functions", format_tool_to_openai_function
+        format_scratchpad, output_parser = format_to_openai_function_messages, OpenAIFunctionsAgentOutputParser()
+
+    if settings.tool_selection_enabled:
+        # Each call binds only the tools the request is about; see agent_backend.agent.tool_selection
+        selector = ToolSelector(tools, to_schema, needs_followup=tool_outputs.shortened_any if tool_outputs is not None else None)
+        call_llm = RunnableLambda(
+            lambda x: prompt | selector.bind(model, x["messages"], x.get("intermediate_steps", []), kwarg),
+            name="select_tools",
+        )
+    else:
+        call_llm = prompt | model.bind(**{kwarg: [to_schema(t) for t in tools]})
+    def scratchpad(x: Dict[str, Any]) -> List[Any]:
+        # Only the model sees compacted outputs; streamed events and returned steps keep them whole
+        steps = x.get("intermediate_steps", [])
+        return format_scratchpad(tool_outputs.compact_steps(steps) if tool_outputs is not None else steps)
+
     agent = (
-        {
-            "messages": lambda x: x["messages"],
-            "agent_scratchpad": lambda x: format_to_openai_function_messages(
-                x.get("intermediate_steps", [])
-            ),
-        }
-        | prompt
-        | llm_with_tools
-        | OpenAIFunctionsAgentOutputParser()
+        RunnablePassthrough.assign(agent_scratchpad=scratchpad)
+        | call_llm
+        | output_parser
     )
 
-    return AgentExecutor(agent=agent, tools=tools, verbose=True)
\ No newline at end of file
+    # Constructor callbacks are not inherited by child runs, hence the LLM and tools get the handler too
+    return ParallelAgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True,
+        callbacks=[metrics],
+        read_only_tools=READ_ONLY_ACTIONS,
+        max_parallel_tools=settings.tool_max_concurrency,
+    )
@@ -0,0 +1,214 @@
+"""
+Fast path for chat messages that are plainly structured queries.
+
+"What's my address", "balance of 0x...", "latest block" or "list my tokens" each cost two or
+more LLM round trips through the agent. The router recognizes these with local rules, calls
+the same tool (or listing query) the agent would, and renders a templated answer. A rule must
+match the whole message, so anything with more to it (follow-ups, extra instructions, a second
+question) goes to the agent; so does any tool failure.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, Tuple
+
+from agent_backend.admission import AdmissionController
+from agent_backend.config import get_settings
+from agent_backend.constants import (
+    EVENT_TYPE_AGENT, EVENT_TYPE_COMPLETED, EVENT_TYPE_TOOLS, GET_ADDRESS_BALANCE, GET_LATEST_BLOCK
+)
+from agent_backend.metrics import AGENT_RUN_LATENCY, INTENT_ROUTER_FALLBACKS, INTENT_ROUTER_LATENCY
+from agent_backend.utils import format_sse
+
+logger = logging.getLogger(__name__)
+
+# Listings name at most this many addresses in an answer
+LISTING_LIMIT = 10
+
+_ADDRESS = re.compile(r"0x[a-fA-F0-9]{40}")
+_NETWORK = re.compile(r"on network: (\S+)")
+_FILLER = re.compile(r"^(?:hey|hi|please|can you|could you)\s+|\s+please$")
+
+@dataclass
+class RoutedAnswer:
+    """An answer produced without the agent; `tool` and `tool_output` are what it looked up."""
+    intent: str
+    tool: str
+    tool_output: str
+    answer: str
+
+# An intent handler gets the match and the agent's tools by name; it returns the tool it used,
+# that tool's output and the answer, or None to leave the message to the agent.
+Handler = Callable[["re.Match[str]", Dict[str, Any]], Optional[Tuple[str, str, str]]]
+
+def normalize(text: str) -> str:
+    """Lowercase, straighten apostrophes, collapse whitespace and drop closing punctuation and filler."""
+    text = " ".join(text.replace("’", "'").lower().split()).rstrip("?!. ")
+    previous = None
+    while previous != text:
+        previous, text = text, _FILLER.sub("", text)
+    return text
+
+def _run_tool(tools: Dict[str, Any], name: str, arguments: Dict[str, Any]) -> Optional[str]:
+    tool = tools.get(name)
+    if tool is None:
+        return None
+    output = tool.run(arguments)
+    # CDP actions report failures as text; let the agent deal with those
+    if isinstance(output, str) and output.startswith("Error"):
+        return None
+    return output
+
+def _wallet_address(match: "re.Match[str]", tools: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+    output = _run_tool(tools, "get_wallet_details", {})
+    address = _ADDRESS.search(output or "")
+    if address is None:
+        return None
+    network = _NETWORK.search(output)
+    where = f" on {network.group(1)}" if network else ""
+    return "get_wallet_details", output, f"Your wallet address is {address.group()}{where}."
+
+def _wallet_balance(match: "re.Match[str]", tools: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+    asset = match.group("asset") or "eth"
+    output = _run_tool(tools, "get_balance", {"asset_id": asset})
+    if output is None:
+        return None
+    lines = [line.strip() for line in output.splitlines()[1:] if line.strip()]
+    if not lines:
+        return None
+    answer = f"Your {asset.upper()} balance:\n" + "\n".join(f"- {line}" for line in lines)
+    return "get_balance", output, answer
+
+def _address_balance(match: "re.Match[str]", tools: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+    from agent_backend.agent.custom_actions.address_balance import checksum_address
+    # normalize() lowercased the message; checksumming restores the user's spelling of a valid
+    # address and gives the tool the same cache key /api/balance uses
+    address = checksum_address(match.group("address"))
+    output = _run_tool(tools, GET_ADDRESS_BALANCE, {"address": address})
+    if output is None:
+        return None
+    return GET_ADDRESS_BALANCE, _as_text(output), f"The balance of {address} is {output['balance_eth']} ETH."
+
+def _latest_block(match: "re.Match[str]", tools: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+    block = _run_tool(tools, GET_LATEST_BLOCK, {})
+    if block is None:
+        return None
+    answer = (
+        f"The latest block is {block['block_number']} ({block['timestamp']}), with "
+        f"{block['transactions_count']} transactions moving {block['total_value_transferred']:g} ETH."
+    )
+    return GET_LATEST_BLOCK, _as_text(block), answer
+
+def _listing(kind: str) -> Handler:
+    def handler(match: "re.Match[str]", tools: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+        if kind == "tokens":
+            from agent_backend.db.tokens import get_tokens_page as get_page
+        else:
+            from agent_backend.db.nfts import get_nfts_page as get_page
+        page = get_page(LISTING_LIMIT)
+        if not page.addresses:
+            return f"list_{kind}", "[]", f"No {kind} have been deployed yet."
+        more = f" (the first {len(page.addresses)}; see /{kind} for the full list)" if page.next_cursor else ""
+        answer = f"Deployed {kind}{more}:\n" + "\n".join(f"- {address}" for address in page.addresses)
+        return f"list_{kind}", _as_text(page.addresses), answer
+    return handler
+
+def _as_text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+_WHAT_IS = r"(?:what(?:'s| is) |show(?: me)? |get |tell me )?"
+RULES: List[Tuple[str, Pattern[str], Handler]] = [
+    ("wallet_address", re.compile(_WHAT_IS + r"(?:(?:my|your|the) (?:wallet )?address|(?:my |the )?wallet details)"), _wallet_address),
+    ("wallet_balance", re.compile(_WHAT_IS + r"(?:my|your|the wallet(?:'s)?) (?:(?P<asset>eth|usdc|weth) )?balance"), _wallet_balance),
+    ("address_balance", re.compile(_WHAT_IS + r"(?:the )?(?:eth )?balance (?:of|for) (?P<address>0x[0-9a-f]{40})"), _address_balance),
+    ("latest_block", re.compile(_WHAT_IS + r"(?:the )?(?:latest|current|newest|last) block(?: number)?"), _latest_block),
+    ("list_tokens", re.compile(r"(?:list|show)(?: me)? (?:my |the |all )*(?:deployed )?tokens|what tokens have (?:i|you) deployed"), _listing("tokens")),
+    ("list_nfts", re.compile(r"(?:list|show)(?: me)? (?:my |the |all )*(?:deployed )?nfts|what nfts have (?:i|you) deployed"), _listing("nfts")),
+]
+
+def classify(text: str) -> Optional[Tuple[str, "re.Match[str]", Handler]]:
+    """The intent whose rule matches the whole (normalized) message, if any."""
+    normalized = normalize(text)
+    for intent, pattern, handler in RULES:
+        match = pattern.fullmatch(normalized)
+        if match:
+            return intent, match, handler
+    return None
+
+class IntentRouter:
+    """Answers recognized messages directly and counts hits, fallbacks and the time spent."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "fallbacks": 0, "errors": 0, "fast_path_seconds": 0.0}
+
+    def route(self, text: str, agent_executor: Any, admission: Optional[AdmissionController] = None) -> Optional[RoutedAnswer]:
+        """
+        Answer `text` with the agent's own tools, or None to hand it to the agent. A matched
+        lookup holds a slot of `admission`, which raises Overloaded when none is free.
+        """
+        classified = classify(text)
+        if classified is None:
+            self._count("fallbacks")
+            INTENT_ROUTER_FALLBACKS.inc(reason="no_match")
+            return None
+
+        intent, match, handler = classified
+        with admission.admitted() if admission is not None else nullcontext():
+            started = time.perf_counter()
+            try:
+                result = handler(match, {tool.name: tool for tool in agent_executor.tools})
+            except Exception as e:
+                logger.warning(f"Intent {intent} failed, falling back to the agent: {e}")
+                result = None
+                self._count("errors")
+            elapsed = time.perf_counter() - started
+        if result is None:
+            self._count("fallbacks")
+            INTENT_ROUTER_FALLBACKS.inc(reason=intent)
+            return None
+
+        INTENT_ROUTER_LATENCY.observe(elapsed, intent=intent)
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["fast_path_seconds"] += elapsed
+        tool, tool_output, answer = result
+        logger.info(f"Answered {intent} intent without the agent in {elapsed:.3f}s")
+        return RoutedAnswer(intent, tool, tool_output, answer)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Hit rate and fast-path time. The latency saved is estimated from this worker's mean
+        agent run latency, which is what each hit would otherwise have cost.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        routed = stats["hits"] + stats["fallbacks"]
+        stats["hit_rate"] = round(stats["hits"] / routed, 4) if routed else 0.0
+        agent_mean = AGENT_RUN_LATENCY.mean(outcome="ok")
+        stats["latency_saved_seconds"] = (
+            round(max(0.0, stats["hits"] * agent_mean - stats["fast_path_seconds"]), 3) if agent_mean is not None else None
+        )
+        stats["fast_path_seconds"] = round(stats["fast_path_seconds"], 3)
+        return stats
+
+def stream_routed_answer(routed: RoutedAnswer) -> Iterator[str]:
+    """The SSE frames run_agent would send for the same lookup and answer."""
+    yield format_sse(routed.tool_output, EVENT_TYPE_TOOLS, functions=[routed.tool])
+    yield format_sse(routed.answer, EVENT_TYPE_AGENT)
+    yield format_sse("", EVENT_TYPE_COMPLETED)
+
+_router = IntentRouter()
+
+def get_intent_router() -> Optional[IntentRouter]:
+    """Get the process-wide intent router, or None when disabled."""
+    return _router if get_settings().intent_router_enabled else None
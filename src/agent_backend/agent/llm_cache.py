@@ -0,0 +1,268 @@
+"""Deterministic response cache for the temperature-0 agent model."""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+from sqlalchemy import text
+
+from agent_backend.config import get_settings
+from agent_backend.constants import READ_ONLY_ACTIONS
+from agent_backend.db.setup import get_engine
+from agent_backend.utils import per_process
+
+logger = logging.getLogger(__name__)
+
+# Message fields that differ between otherwise identical prompts (run ids, token usage)
+VOLATILE_MESSAGE_FIELDS = frozenset({"id", "response_metadata", "usage_metadata"})
+
+# A cached entry: (generations, generation latency in seconds, expiry as epoch seconds)
+CacheEntry = Tuple[RETURN_VAL_TYPE, float, float]
+
+def _normalize(node: Any) -> Any:
+    if isinstance(node, list):
+        return [_normalize(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    normalized = {key: _normalize(value) for key, value in node.items()}
+    kwargs = normalized.get("kwargs")
+    if isinstance(kwargs, dict):
+        kwargs = {key: value for key, value in kwargs.items() if key not in VOLATILE_MESSAGE_FIELDS}
+        if isinstance(kwargs.get("content"), str):
+            kwargs["content"] = " ".join(kwargs["content"].split())
+        normalized["kwargs"] = kwargs
+    return normalized
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a serialized prompt so equivalent requests share a cache key."""
+    try:
+        return json.dumps(_normalize(json.loads(prompt)), sort_keys=True)
+    except ValueError:
+        return " ".join(prompt.split())
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Key on the normalized prompt and the llm string (model name, params and bound tool schemas)."""
+    return hashlib.sha256(f"{normalize_prompt(prompt)}\x00{llm_string}".encode()).hexdigest()
+
+def _called_functions(generations: RETURN_VAL_TYPE) -> List[str]:
+    names = []
+    for generation in generations:
+        message = getattr(generation, "message", None)
+        if message is None:
+            continue
+        function_call = message.additional_kwargs.get("function_call")
+        if function_call:
+            names.append(function_call.get("name"))
+        names.extend(call["name"] for call in getattr(message, "tool_calls", []) or [])
+    return names
+
+def _generation_to_dict(generation: Generation) -> Dict[str, Any]:
+    row: Dict[str, Any] = {"text": generation.text, "generation_info": generation.generation_info}
+    message = getattr(generation, "message", None)
+    if message is not None:
+        row["message"] = message_to_dict(message)
+    return row
+
+def _generation_from_dict(row: Dict[str, Any]) -> Generation:
+    # Plain data only: message types are rebuilt from their known "type" tag, never imported by path
+    if "message" in row:
+        return ChatGeneration(message=messages_from_dict([row["message"]])[0], generation_info=row["generation_info"])
+    return Generation(text=row["text"], generation_info=row["generation_info"])
+
+class MemoryCacheTier:
+    """In-process LRU tier."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SQLCacheTier:
+    """Persistent tier in a SQLite or Postgres table, shared by all workers."""
+
+    def __init__(self, url: Optional[str] = None) -> None:
+        self.url = url
+        self._table_ready = False
+
+    def _engine(self):
+        engine = get_engine(self.url)
+        if not self._table_ready:
+            with engine.connect() as conn:
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        cache_key VARCHAR(64) PRIMARY KEY,
+                        generations TEXT NOT NULL,
+                        latency DOUBLE PRECISION NOT NULL,
+                        expires_at DOUBLE PRECISION NOT NULL
+                    )
+                """))
+                conn.commit()
+            self._table_ready = True
+        return engine
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._engine().connect() as conn:
+            row = conn.execute(
+                text("SELECT generations, latency, expires_at FROM llm_cache WHERE cache_key = :key"),
+                {"key": key}
+            ).first()
+        if not row:
+            return None
+        generations, latency, expires_at = row
+        return [_generation_from_dict(generation) for generation in json.loads(generations)], latency, expires_at
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        generations, latency, expires_at = entry
+        with self._engine().connect() as conn:
+            conn.execute(
+                text("""
+                INSERT INTO llm_cache (cache_key, generations, latency, expires_at)
+                VALUES (:key, :generations, :latency, :expires_at)
+                ON CONFLICT (cache_key) DO UPDATE
+                SET generations = excluded.generations,
+                    latency = excluded.latency,
+                    expires_at = excluded.expires_at
+                """),
+                {
+                    "key": key,
+                    "generations": json.dumps([_generation_to_dict(generation) for generation in generations], default=str),
+                    "latency": latency,
+                    "expires_at": expires_at,
+                }
+            )
+            conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._engine().connect() as conn:
+            conn.execute(text("DELETE FROM llm_cache WHERE cache_key = :key"), {"key": key})
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._engine().connect() as conn:
+            conn.execute(text("DELETE FROM llm_cache"))
+            conn.commit()
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain cache that serves repeated prompts from an ordered list of tiers (fastest first).
+    Turns that call a state-changing action are never cached.
+    """
+
+    def __init__(self, tiers: Sequence[Any], ttl: float) -> None:
+        self.tiers = list(tiers)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._miss_started: Dict[str, float] = {}
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0, "latency_saved_seconds": 0.0}
+        self._tier_hits = [0] * len(self.tiers)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        for index, tier in enumerate(self.tiers):
+            entry = self._safely(tier, "get", key)
+            if entry is None:
+                continue
+            generations, latency, expires_at = entry
+            if expires_at <= now:
+                self._safely(tier, "delete", key)
+                continue
+            # Promote into the faster tiers
+            for faster in self.tiers[:index]:
+                self._safely(faster, "set", key, entry)
+            with self._lock:
+                self._stats["hits"] += 1
+                self._stats["latency_saved_seconds"] += latency
+                self._tier_hits[index] += 1
+            return generations
+
+        with self._lock:
+            self._stats["misses"] += 1
+            # Entries are normally popped by update(); failed generations never get there
+            if len(self._miss_started) > 1024:
+                self._miss_started.clear()
+            self._miss_started[key] = time.perf_counter()
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            started = self._miss_started.pop(key, None)
+        if any(name not in READ_ONLY_ACTIONS for name in _called_functions(return_val)):
+            self._count("bypassed")
+            return
+
+        latency = time.perf_counter() - started if started is not None else 0.0
+        entry = (return_val, latency, time.time() + self.ttl)
+        for tier in self.tiers:
+            self._safely(tier, "set", key, entry)
+
+    def clear(self, **kwargs: Any) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate, per-tier hits and the LLM latency avoided by cache hits."""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["latency_saved_seconds"] = round(stats["latency_saved_seconds"], 3)
+            stats["tier_hits"] = {type(tier).__name__: hits for tier, hits in zip(self.tiers, self._tier_hits)}
+        return stats
+
+    def _safely(self, tier: Any, method: str, *args: Any) -> Any:
+        # A broken tier degrades to a miss; it must never fail the LLM call
+        try:
+            return getattr(tier, method)(*args)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"LLM cache tier {type(tier).__name__} {method} failed: {e}")
+            return None
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+@per_process
+def _response_cache() -> LLMResponseCache:
+    settings = get_settings()
+    return LLMResponseCache(
+        tiers=[MemoryCacheTier(settings.llm_cache_size), SQLCacheTier(settings.llm_cache_url)],
+        ttl=settings.llm_cache_ttl,
+    )
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """Get the process-wide LLM response cache, or None when disabled."""
+    if not get_settings().llm_cache_enabled:
+        return None
+    return _response_cache()
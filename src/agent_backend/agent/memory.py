@@ -0,0 +1,213 @@
+"""Conversation memory keyed by conversation_id."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from agent_backend.config import get_settings
+from agent_backend.db.conversations import get_conversation, get_conversation_version, save_conversation
+from agent_backend.utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Summarizes (previous summary, dropped messages) into a new summary
+Summarizer = Callable[[str, List[BaseMessage]], str]
+
+# After trimming, history is cut down to this fraction of the budget so summarization
+# runs once every few turns rather than on every turn
+TRIM_TARGET_RATIO = 0.75
+# Per-message overhead of the chat format, in tokens
+MESSAGE_TOKEN_OVERHEAD = 4
+MAX_SAVE_ATTEMPTS = 3
+
+SUMMARY_PROMPT = """Summarize the conversation below for an assistant that will continue it.
+Keep wallet addresses, contract addresses, token names and symbols, and any outstanding requests.
+Be concise.
+
+Previous summary:
+{summary}
+
+New messages:
+{messages}"""
+
+@dataclass
+class Conversation:
+    """A conversation's rolling summary and the turns kept verbatim."""
+    summary: str = ""
+    messages: List[BaseMessage] = field(default_factory=list)
+    version: int = 0
+
+def _message_tokens(message: BaseMessage) -> int:
+    return count_tokens(message.content) + MESSAGE_TOKEN_OVERHEAD
+
+def _to_dicts(messages: List[BaseMessage]) -> List[Dict[str, str]]:
+    return [{"role": message.type, "content": message.content} for message in messages]
+
+def _from_dicts(rows: List[Dict[str, str]]) -> List[BaseMessage]:
+    return [HumanMessage(content=row["content"]) if row["role"] == "human" else AIMessage(content=row["content"]) for row in rows]
+
+def _transcript(messages: List[BaseMessage]) -> str:
+    return "\n".join(f"{'User' if message.type == 'human' else 'Assistant'}: {message.content}" for message in messages)
+
+def truncating_summarizer(max_chars: int = 2000) -> Summarizer:
+    """Summarizer that keeps the most recent text of the dropped turns, for use without an LLM."""
+    def summarize(summary: str, messages: List[BaseMessage]) -> str:
+        combined = f"{summary}\n{_transcript(messages)}".strip()
+        return combined[-max_chars:]
+    return summarize
+
+def llm_summarizer(llm) -> Summarizer:
+    """Summarizer that asks a chat model to fold dropped turns into the running summary."""
+    def summarize(summary: str, messages: List[BaseMessage]) -> str:
+        prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", messages=_transcript(messages))
+        return llm.invoke([HumanMessage(content=prompt)]).content
+    return summarize
+
+class ConversationMemory:
+    """
+    Conversation history with an in-process LRU tier in front of the conversations table.
+    History is bounded by a token budget; the oldest turns are folded into a summary.
+
+    Saved turns are written through to the cache, and a cached conversation is trusted for
+    `cache_ttl` seconds before its stored version is checked again, so turns another worker
+    saves show up within that time. Turns still waiting for the background writer are part of
+    what `load` returns.
+    """
+
+    def __init__(
+        self, token_budget: int, cache_size: int, summarizer: Optional[Summarizer] = None, cache_ttl: float = 30.0
+    ) -> None:
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.summarizer = summarizer or truncating_summarizer(max_chars=token_budget)
+        # Conversation and when it was last loaded or checked against the database
+        self._cache: "OrderedDict[str, Tuple[Conversation, float]]" = OrderedDict()
+        # Turns submitted to the writer and not yet saved, oldest first
+        self._pending: Dict[str, List[List[BaseMessage]]] = {}
+        self._lock = threading.Lock()
+        # Saves (and any summarization) run off the request path, one at a time
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-memory")
+
+    def load(self, conversation_id: str) -> List[BaseMessage]:
+        """Get the prior turns of a conversation, ready for the prompt's messages placeholder."""
+        try:
+            conversation = self._get(conversation_id)
+        except Exception as e:
+            logger.warning(f"Failed to load conversation {conversation_id}: {e}")
+            conversation = Conversation()
+        # The writer caches a saved turn and drops it from pending under the lock, so reading both
+        # together sees every turn exactly once
+        with self._lock:
+            entry = self._cache.get(conversation_id)
+            if entry is not None and entry[0].version > conversation.version:
+                conversation = entry[0]
+            pending = [message for turn in self._pending.get(conversation_id, []) for message in turn]
+        history: List[BaseMessage] = []
+        if conversation.summary:
+            history.append(SystemMessage(content=f"Summary of the earlier conversation: {conversation.summary}"))
+        history.extend(conversation.messages)
+        # Unsaved turns are not trimmed yet; the budget is applied when they are saved
+        history.extend(pending)
+        return history
+
+    def append_turn(self, conversation_id: str, user_input: str, output: str) -> Future:
+        """Record a completed turn in the background; `load` includes it straight away."""
+        turn = [HumanMessage(content=user_input), AIMessage(content=output)]
+        with self._lock:
+            self._pending.setdefault(conversation_id, []).append(turn)
+        return self._writer.submit(self._append_turn, conversation_id, turn)
+
+    def _append_turn(self, conversation_id: str, turn: List[BaseMessage]) -> None:
+        saved = False
+        try:
+            for attempt in range(MAX_SAVE_ATTEMPTS):
+                conversation = self._get(conversation_id, revalidate=attempt > 0)
+                summary, messages = self._trim(conversation.summary, conversation.messages + turn)
+                if save_conversation(conversation_id, summary, _to_dicts(messages), conversation.version):
+                    with self._lock:
+                        self._store(conversation_id, Conversation(summary, messages, conversation.version + 1))
+                        self._pop_pending(conversation_id)
+                    saved = True
+                    return
+                # Another worker saved this conversation first; reload and reapply the turn
+                logger.debug(f"Conversation {conversation_id} changed concurrently, retrying save")
+            logger.warning(f"Gave up saving conversation {conversation_id} after {MAX_SAVE_ATTEMPTS} attempts")
+        except Exception as e:
+            logger.error(f"Failed to save conversation {conversation_id}: {e}")
+        finally:
+            if not saved:
+                with self._lock:
+                    self._pop_pending(conversation_id)
+
+    def _pop_pending(self, conversation_id: str) -> None:
+        # Called with the lock held; the single writer saves turns in the order they were submitted
+        turns = self._pending.get(conversation_id)
+        if turns:
+            turns.pop(0)
+        if not turns:
+            self._pending.pop(conversation_id, None)
+
+    def _trim(self, summary: str, messages: List[BaseMessage]):
+        """Fold the oldest turns into the summary until history fits the token budget."""
+        sizes = [_message_tokens(message) for message in messages]
+        total = count_tokens(summary) + sum(sizes)
+        if total <= self.token_budget:
+            return summary, messages
+
+        target = self.token_budget * TRIM_TARGET_RATIO
+        # Drop whole turns (user + assistant) and always keep the latest one
+        cut = 0
+        while cut < len(messages) - 2 and total > target:
+            total -= sizes[cut] + sizes[cut + 1]
+            cut += 2
+        if cut == 0:
+            return summary, messages
+        return self.summarizer(summary, messages[:cut]), messages[cut:]
+
+    def _get(self, conversation_id: str, revalidate: bool = False) -> Conversation:
+        with self._lock:
+            entry = self._cache.get(conversation_id)
+            if entry is not None and not revalidate and time.monotonic() - entry[1] < self.cache_ttl:
+                self._cache.move_to_end(conversation_id)
+                return entry[0]
+
+        # An expired copy costs a single primary-key lookup when nothing changed, and picks up
+        # turns saved by other workers when something did
+        if entry is not None and get_conversation_version(conversation_id) == entry[0].version:
+            conversation = entry[0]
+        else:
+            row = get_conversation(conversation_id)
+            conversation = Conversation(row["summary"], _from_dicts(row["messages"]), row["version"]) if row else Conversation()
+        with self._lock:
+            return self._store(conversation_id, conversation)
+
+    def _store(self, conversation_id: str, conversation: Conversation) -> Conversation:
+        # Called with the lock held. A read that raced a save must not replace the newer copy.
+        entry = self._cache.get(conversation_id)
+        if entry is not None and entry[0].version > conversation.version:
+            conversation = entry[0]
+        self._cache[conversation_id] = (conversation, time.monotonic())
+        self._cache.move_to_end(conversation_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return conversation
+
+def create_conversation_memory() -> ConversationMemory:
+    """Create the conversation memory from settings, summarizing with an LLM."""
+    from langchain_openai import ChatOpenAI
+
+    settings = get_settings()
+    llm = ChatOpenAI(model=settings.memory_summary_model, temperature=0)
+    return ConversationMemory(
+        token_budget=settings.memory_token_budget,
+        cache_size=settings.memory_cache_size,
+        summarizer=llm_summarizer(llm),
+        cache_ttl=settings.memory_cache_ttl,
+    )
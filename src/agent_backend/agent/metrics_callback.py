@@ -0,0 +1,130 @@
+"""LangChain callback handler feeding the /metrics histograms."""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from agent_backend.metrics import (
+    AGENT_RUN_LATENCY,
+    LLM_COMPLETION_TOKENS,
+    LLM_ERRORS,
+    LLM_LATENCY,
+    LLM_PROMPT_TOKENS,
+    LLM_TIME_TO_FIRST_TOKEN,
+    TOOL_ERRORS,
+    TOOL_LATENCY,
+)
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records per-stage agent latency: whole agent runs, LLM calls (with time to first token and
+    token usage) and tool calls, keyed by run id since callbacks arrive from several threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # run_id -> (label, start time)
+        self._runs: Dict[UUID, Tuple[str, float]] = {}
+        self._first_token_seen: set = set()
+
+    def _start(self, run_id: UUID, label: str) -> None:
+        with self._lock:
+            self._runs[run_id] = (label, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            self._first_token_seen.discard(run_id)
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        label, started = run
+        return label, time.perf_counter() - started
+
+    @staticmethod
+    def _model_name(kwargs: Dict[str, Any]) -> str:
+        metadata = kwargs.get("metadata") or {}
+        params = kwargs.get("invocation_params") or {}
+        return str(metadata.get("ls_model_name") or params.get("model_name") or params.get("model") or "unknown")
+
+    # Agent runs
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Dict[str, Any], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "agent")
+
+    def on_chain_end(self, outputs: Dict[str, Any], *, run_id: UUID, **kwargs: Any) -> None:
+        self._observe_chain(run_id, "ok")
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._observe_chain(run_id, "error")
+
+    def _observe_chain(self, run_id: UUID, outcome: str) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            AGENT_RUN_LATENCY.observe(finished[1], outcome=outcome)
+
+    # LLM calls
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, self._model_name(kwargs))
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, self._model_name(kwargs))
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None or run_id in self._first_token_seen:
+                return
+            self._first_token_seen.add(run_id)
+        model, started = run
+        LLM_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - started, model=model)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished is None:
+            return
+        model, elapsed = finished
+        LLM_LATENCY.observe(elapsed, model=model)
+        usage = self._token_usage(response)
+        if usage:
+            LLM_PROMPT_TOKENS.observe(usage[0], model=model)
+            LLM_COMPLETION_TOKENS.observe(usage[1], model=model)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            LLM_ERRORS.inc(model=finished[0])
+
+    @staticmethod
+    def _token_usage(response: LLMResult) -> Optional[Tuple[int, int]]:
+        """(prompt, completion) tokens from the provider's usage report, if it sent one."""
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("prompt_tokens") is not None:
+            return usage["prompt_tokens"], usage.get("completion_tokens", 0)
+        # Streamed responses carry usage on the message instead
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    return metadata["input_tokens"], metadata["output_tokens"]
+        return None
+
+    # Tool calls
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, str(kwargs.get("name") or serialized.get("name") or "unknown"))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            TOOL_LATENCY.observe(finished[1], tool=finished[0])
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            TOOL_LATENCY.observe(finished[1], tool=finished[0])
+            TOOL_ERRORS.inc(tool=finished[0])
@@ -0,0 +1,206 @@
+"""Write-behind outbox for agent action side effects."""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from agent_backend.config import get_settings
+from agent_backend.constants import DEPLOY_NFT, DEPLOY_TOKEN
+from agent_backend.db.nfts import add_nfts
+from agent_backend.db.tokens import add_tokens
+from agent_backend.utils import per_process
+
+logger = logging.getLogger(__name__)
+
+# Delivers a batch of payloads for one event kind; must be idempotent
+Handler = Callable[[Sequence[str]], None]
+
+class ActionOutbox:
+    """
+    Events are journaled to a local SQLite file on publish and delivered by a background
+    worker, one handler call per event kind per flush. Undelivered events stay in the journal
+    and are retried, including after a restart.
+
+    Every worker process on a machine shares the journal and runs its own delivery thread.
+    A flush first claims its rows in a single UPDATE, so two workers never deliver the same
+    event; rows claimed by a worker that died mid-delivery are taken over after `claim_timeout`.
+    """
+
+    def __init__(
+        self,
+        journal_path: str,
+        handlers: Dict[str, Handler],
+        flush_interval: float = 0.5,
+        batch_size: int = 500,
+        max_backoff: float = 30.0,
+        claim_timeout: float = 60.0,
+    ) -> None:
+        self.journal_path = journal_path
+        self.handlers = handlers
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.claim_timeout = claim_timeout
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+        self.stats = {"published": 0, "delivered": 0, "flushes": 0, "errors": 0}
+
+        self._conn = sqlite3.connect(journal_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                claimed_by TEXT,
+                claimed_at REAL
+            )
+        """)
+        # Journals written before rows were claimed lack the claim columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        for column, kind in (("claimed_by", "TEXT"), ("claimed_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {kind}")
+
+    def publish(self, kind: str, payload: str) -> None:
+        """Journal an event for delivery. Only touches the local journal, never the application database."""
+        if kind not in self.handlers:
+            raise ValueError(f"No outbox handler for {kind}")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO outbox (kind, payload, created_at) VALUES (?, ?, ?)",
+                (kind, payload, time.time())
+            )
+            self.stats["published"] += 1
+        self._wake.set()
+
+    def pending(self) -> int:
+        """Number of events not yet delivered."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def flush(self) -> int:
+        """Deliver up to batch_size journaled events and return how many were delivered."""
+        rows = self._claim()
+        if not rows:
+            return 0
+
+        by_kind: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        for event_id, kind, payload in rows:
+            by_kind[kind].append((event_id, payload))
+
+        delivered, error = 0, None
+        for kind, events in by_kind.items():
+            ids = [event_id for event_id, _ in events]
+            placeholders = ",".join("?" * len(ids))
+            try:
+                self.handlers[kind]([payload for _, payload in events])
+            except Exception as e:
+                # Leave this kind in the journal, unclaimed for the next flush; other kinds still go out
+                error = e
+                with self._lock:
+                    self._conn.execute(f"UPDATE outbox SET claimed_by = NULL, claimed_at = NULL WHERE id IN ({placeholders})", ids)
+                continue
+            with self._lock:
+                self._conn.execute(f"DELETE FROM outbox WHERE id IN ({placeholders})", ids)
+            delivered += len(ids)
+
+        with self._lock:
+            self.stats["flushes"] += 1
+            self.stats["delivered"] += delivered
+        if error is not None:
+            raise error
+        return delivered
+
+    def _claim(self) -> List[Tuple[int, str, str]]:
+        # One statement, so it is atomic across the processes sharing the journal
+        claim, now = f"{os.getpid()}-{uuid.uuid4().hex}", time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE outbox SET claimed_by = ?, claimed_at = ?
+                WHERE id IN (
+                    SELECT id FROM outbox WHERE claimed_by IS NULL OR claimed_at < ? ORDER BY id LIMIT ?
+                )
+                """,
+                (claim, now, now - self.claim_timeout, self.batch_size)
+            )
+            return self._conn.execute(
+                "SELECT id, kind, payload FROM outbox WHERE claimed_by = ? ORDER BY id", (claim,)
+            ).fetchall()
+
+    def start(self) -> None:
+        """Start the delivery worker (idempotent). Events left from a previous run are delivered first."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="action-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker after a last flush attempt. Anything undelivered stays journaled."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["pending"] = self.pending()
+        return stats
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._delay())
+            self._wake.clear()
+            stopping = self._stop.is_set()
+            try:
+                # Keep going while full batches come back; the journal may hold a backlog
+                while self.flush() == self.batch_size:
+                    pass
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                with self._lock:
+                    self.stats["errors"] += 1
+                logger.warning(f"Outbox delivery failed ({self._failures} in a row), will retry: {e}")
+            if stopping:
+                return
+
+    def _delay(self) -> float:
+        if not self._failures:
+            return self.flush_interval
+        return min(self.max_backoff, self.flush_interval * 2 ** self._failures)
+
+# Its journal connection and worker thread do not survive a fork
+@per_process
+def get_outbox() -> ActionOutbox:
+    """Get the process-wide outbox for deployed token and NFT addresses, starting its worker on first use."""
+    settings = get_settings()
+    outbox = ActionOutbox(
+        settings.outbox_path,
+        handlers={DEPLOY_TOKEN: add_tokens, DEPLOY_NFT: add_nfts},
+        flush_interval=settings.outbox_flush_interval,
+        batch_size=settings.outbox_batch_size,
+        claim_timeout=settings.outbox_claim_timeout,
+    )
+    outbox.start()
+    atexit.register(outbox.stop)
+    return outbox
+
+def peek_outbox() -> Optional[ActionOutbox]:
+    """This process's outbox if anything has used it yet, without creating one."""
+    return get_outbox.peek()
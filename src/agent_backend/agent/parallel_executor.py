@@ -0,0 +1,128 @@
+"""Agent executor that runs a step's independent read-only tool calls concurrently."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, FrozenSet, Iterator, List, Optional, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.callbacks import AsyncCallbackManagerForChainRun, CallbackManagerForChainRun
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _PendingStep:
+    """A tool call the base step loop asked for, to be run once the whole step is known."""
+    action: AgentAction
+    # Returns the AgentStep, or an awaitable of it on the async path
+    run: Callable[[], Union[AgentStep, Awaitable[AgentStep]]]
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    When the model asks for several tools in one turn (tools API with parallel tool calls), runs
+    consecutive calls to `read_only_tools` in a pool of up to `max_parallel_tools` threads.
+    Any other tool is state-changing: it runs alone, after every call before it has finished
+    and before any call after it starts. Observations keep the order the model asked for.
+
+    The async path (ainvoke, astream) schedules the same way, with asyncio tasks instead of
+    threads; the base class would otherwise gather every call of a step at once, writes
+    included. Both paths hook AgentExecutor's private per-step methods, so
+    tests/test_parallel_executor.py checks their signatures against the installed langchain.
+    """
+
+    read_only_tools: FrozenSet[str] = frozenset()
+    max_parallel_tools: int = 4
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map: dict,
+        color_mapping: dict,
+        agent_action: AgentAction,
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> _PendingStep:
+        # The base loop calls this once per action in turn; defer so the step can be scheduled as a whole
+        perform = super()._perform_agent_action
+        return _PendingStep(agent_action, lambda: perform(name_to_tool_map, color_mapping, agent_action, run_manager))
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: dict,
+        color_mapping: dict,
+        inputs: dict,
+        intermediate_steps: list,
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending: List[_PendingStep] = []
+        for item in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+            if isinstance(item, _PendingStep):
+                pending.append(item)
+            else:
+                yield item
+        yield from self._run_pending(pending)
+
+    async def _aperform_agent_action(
+        self,
+        name_to_tool_map: dict,
+        color_mapping: dict,
+        agent_action: AgentAction,
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> _PendingStep:
+        perform = super()._aperform_agent_action
+        return _PendingStep(agent_action, lambda: perform(name_to_tool_map, color_mapping, agent_action, run_manager))
+
+    async def _aiter_next_step(
+        self,
+        name_to_tool_map: dict,
+        color_mapping: dict,
+        inputs: dict,
+        intermediate_steps: list,
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> AsyncIterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending: List[_PendingStep] = []
+        async for item in super()._aiter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+            if isinstance(item, _PendingStep):
+                pending.append(item)
+            else:
+                yield item
+        for group in self._groups(pending):
+            for step in await self._arun_group(group):
+                yield step
+
+    def _groups(self, pending: List[_PendingStep]) -> Iterator[List[_PendingStep]]:
+        """Consecutive read-only calls together, each state-changing call on its own, in order."""
+        group: List[_PendingStep] = []
+        for step in pending:
+            if step.action.tool in self.read_only_tools:
+                group.append(step)
+                continue
+            if group:
+                yield group
+            group = []
+            yield [step]
+        if group:
+            yield group
+
+    def _run_pending(self, pending: List[_PendingStep]) -> Iterator[AgentStep]:
+        for group in self._groups(pending):
+            yield from self._run_group(group)
+
+    def _run_group(self, group: List[_PendingStep]) -> List[AgentStep]:
+        if len(group) <= 1:
+            return [step.run() for step in group]
+        logger.debug(f"Running {len(group)} read-only tool calls concurrently: {[step.action.tool for step in group]}")
+        # ContextThreadPoolExecutor carries the callback and tracing context into the pool threads
+        with ContextThreadPoolExecutor(max_workers=min(len(group), self.max_parallel_tools)) as pool:
+            return list(pool.map(lambda step: step.run(), group))
+
+    async def _arun_group(self, group: List[_PendingStep]) -> List[AgentStep]:
+        if len(group) <= 1:
+            return [await step.run() for step in group]
+        logger.debug(f"Running {len(group)} read-only tool calls concurrently: {[step.action.tool for step in group]}")
+        slots = asyncio.Semaphore(self.max_parallel_tools)
+
+        async def run(step: _PendingStep) -> AgentStep:
+            async with slots:
+                return await step.run()
+        return list(await asyncio.gather(*(run(step) for step in group)))
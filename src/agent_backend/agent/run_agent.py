@@ -1,57 +1,106 @@
-from typing import Iterator
-from langchain_core.messages import HumanMessage
+import json
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+from uuid import UUID
 
-from agent_backend.constants import EVENT_TYPE_AGENT, EVENT_TYPE_TOOLS, EVENT_TYPE_ERROR
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.outputs import LLMResult
+
+from agent_backend.constants import EVENT_TYPE_AGENT, EVENT_TYPE_COMPLETED, EVENT_TYPE_TOOLS, EVENT_TYPE_ERROR
 from agent_backend.utils import format_sse
 from agent_backend.agent.handle_agent_action import handle_agent_action
 
-def run_agent(input, agent_executor, config) -> Iterator[str]:
-    """Run the agent and yield formatted SSE messages"""
-    try:
-        print(f"Running agent with input: {input}")  # Debug log
-        for chunk in agent_executor.stream(
-            {"messages": [HumanMessage(content=input)]}, config
-        ):
-            print(f"Raw chunk: {chunk}")  # Debug raw chunk
-            
-            # Handle the new output format
-            if "output" in chunk:
-                content = chunk["output"]
-                if content:
-                    # Split content into paragraphs
-                    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-                    
-                    # For numbered lists, split on number patterns
-                    if any(p.strip().startswith(str(i)+'.') for i in range(1,10) for p in paragraphs):
-                        new_paragraphs = []
-                        for p in paragraphs:
-                            # Split numbered points into separate messages
-                            if p.count('\n') > 2:  # If paragraph has multiple lines
-                                points = [point.strip() for point in p.split('\n') if point.strip()]
-                                new_paragraphs.extend(points)
-                            else:
-                                new_paragraphs.append(p)
-                        paragraphs = new_paragraphs
-                    
-                    # Send each paragraph as a separate message
-                    for paragraph in paragraphs:
-                        print(f"Agent response paragraph: {paragraph}")  # Debug log
-                        formatted = format_sse(paragraph, EVENT_TYPE_AGENT)
-                        print(f"Formatted SSE message: {formatted}")  # Debug formatted message
-                        yield formatted
-            
-            # Keep existing tool handling
-            elif "tools" in chunk:
-                name = chunk["tools"]["messages"][0].name
-                content = chunk["tools"]["messages"][0].content
-                if content:
-                    print(f"Tool response: {content}")  # Debug log
-                    formatted = format_sse(content, EVENT_TYPE_TOOLS, functions=[name])
-                    print(f"Formatted SSE message: {formatted}")  # Debug formatted message
-                    yield formatted
-                    handle_agent_action(name, content)
-    except Exception as e:
-        print(f"Agent error: {str(e)}")  # Debug log
-        formatted = format_sse(f"Error: {str(e)}", EVENT_TYPE_ERROR)
-        print(f"Formatted error message: {formatted}")  # Debug formatted message
-        yield formatted
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+def _tool_content(output: Any) -> Any:
+    content = getattr(output, "content", output)
+    # Custom block tools return dicts; send them as JSON like the agent scratchpad does
+    return content if not content or isinstance(content, str) else json.dumps(content, default=str)
+
+class ActionRecordingHandler(BaseCallbackHandler):
+    """Callback handler that records deployments from tool results, streamed or not."""
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        content = _tool_content(output)
+        if content:
+            handle_agent_action(kwargs.get("name"), content)
+
+class SSEStreamingHandler(BaseCallbackHandler):
+    """Callback handler that turns LLM tokens and tool results into SSE frames as they happen."""
+
+    def __init__(self, events: "queue.Queue[Optional[str]]") -> None:
+        self.events = events
+        self._streamed_runs: Set[UUID] = set()
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        # Function-call deltas arrive as empty content tokens
+        if token:
+            self._streamed_runs.add(run_id)
+            self.events.put(format_sse(token, EVENT_TYPE_AGENT))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        # Responses served from the LLM cache arrive whole, without token callbacks
+        if run_id in self._streamed_runs:
+            self._streamed_runs.discard(run_id)
+            return
+        for generations in response.generations:
+            for generation in generations:
+                if generation.text:
+                    self.events.put(format_sse(generation.text, EVENT_TYPE_AGENT))
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        name = kwargs.get("name")
+        content = _tool_content(output)
+        if not content:
+            return
+        logger.debug(f"Tool response from {name}: {content}")
+        self.events.put(format_sse(content, EVENT_TYPE_TOOLS, functions=[name]))
+
+def run_agent(
+    input,
+    agent_executor,
+    config: Optional[Dict[str, Any]] = None,
+    history: Optional[List[BaseMessage]] = None,
+    on_complete: Optional[Callable[[str], None]] = None,
+    on_finish: Optional[Callable[[], None]] = None,
+) -> Iterator[str]:
+    """
+    Start the agent and return an iterator of formatted SSE messages as they are produced.
+    history is prepended to the input; on_complete receives the final output. The run goes on
+    if the client stops reading, and on_finish is called when it ends, however it ends.
+    """
+    logger.info(f"Running agent with input: {input}")
+    events: "queue.Queue[Optional[str]]" = queue.Queue()
+    config = dict(config or {})
+    config["callbacks"] = [*config.get("callbacks", []), ActionRecordingHandler(), SSEStreamingHandler(events)]
+
+    def invoke() -> None:
+        try:
+            result = agent_executor.invoke({"messages": [*(history or []), HumanMessage(content=input)]}, config)
+            if on_complete:
+                on_complete(result["output"])
+        except Exception as e:
+            logger.error(f"Agent error: {str(e)}")
+            events.put(format_sse(f"Error: {str(e)}", EVENT_TYPE_ERROR))
+        finally:
+            try:
+                if on_finish:
+                    on_finish()
+            finally:
+                events.put(None)
+
+    # The agent runs on its own thread so frames reach the client while it is still working
+    threading.Thread(target=invoke, name="agent-stream", daemon=True).start()
+    return _frames(events)
+
+def _frames(events: "queue.Queue[Optional[str]]") -> Iterator[str]:
+    while True:
+        frame = events.get()
+        if frame is None:
+            break
+        yield frame
+
+    yield format_sse("", EVENT_TYPE_COMPLETED)
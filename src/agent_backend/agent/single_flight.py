@@ -0,0 +1,99 @@
+"""
+Single-flight for read-only tools: concurrent identical calls share one upstream request.
+
+When a block lands, many conversations ask for the latest block or the same balance at once.
+The first caller (the leader) runs the tool; callers with the same tool name and arguments
+that arrive while it is running wait for it and get its result, or its exception.
+Nothing is kept once the call finishes, so a later call always goes upstream.
+"""
+
+import functools
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agent_backend.config import get_settings
+from agent_backend.metrics import TOOL_CALLS_COALESCED
+from agent_backend.utils import per_process
+
+logger = logging.getLogger(__name__)
+
+def call_key(name: str, arguments: Dict[str, Any]) -> str:
+    """Tool name plus canonical JSON of the arguments, leaving out unset (None) ones."""
+    normalized = {k: v for k, v in arguments.items() if v is not None}
+    return f"{name}:{json.dumps(normalized, sort_keys=True, separators=(',', ':'), default=str)}"
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers with that key share its outcome."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {"calls": 0, "executed": 0, "coalesced": 0}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run `func` for `key`, or wait for the call already running; returns (result, shared)."""
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["executed"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wrap a tool function. Calls are keyed on `name` and the keyword arguments; positional
+        arguments (the process wallet CdpAgentkitWrapper passes to CDP actions) are not part
+        of the key. The wrapper keeps the function's signature.
+        """
+        @functools.wraps(func)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            result, shared = self.do(call_key(name, kwargs), lambda: func(*args, **kwargs))
+            if shared:
+                logger.debug(f"Coalesced {name} call into one already in flight")
+                TOOL_CALLS_COALESCED.inc(tool=name)
+            return result
+        return wrapped
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["in_flight"] = len(self._calls)
+        stats["coalesced_rate"] = round(stats["coalesced"] / stats["calls"], 4) if stats["calls"] else 0.0
+        return stats
+
+# A call in flight at fork time has no leader in the child
+_single_flight = per_process(SingleFlight)
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Get the process-wide single-flight group for read-only tools, or None when disabled."""
+    if not get_settings().tool_single_flight_enabled:
+        return None
+    return _single_flight()
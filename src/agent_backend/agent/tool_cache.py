@@ -0,0 +1,149 @@
+"""
+Block-aware cache for read-only CDP tool results.
+
+Wallet balances and details only change when a block lands, so a result is tagged with the
+chain head it was observed at and served again until the head moves on. The head comes from
+the block follower; without a fresh head nothing is cached. A state-changing action run by
+this process (a transfer, a deployment, ...) clears the cache straight away, since our own
+transaction changes the wallet before any new block is seen here. Other workers find out
+when the head advances.
+"""
+
+import functools
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from agent_backend.config import get_settings
+from agent_backend.agent.single_flight import call_key
+from agent_backend.utils import per_process
+
+logger = logging.getLogger(__name__)
+
+class _Entry(NamedTuple):
+    block: int
+    result: Any
+    size: int
+
+def _size(key: str, result: Any) -> int:
+    # Characters of the key and the serialized result, a close enough proxy for their footprint
+    text = result if isinstance(result, str) else json.dumps(result, default=str)
+    return len(key) + len(text)
+
+class ToolResultCache:
+    """
+    LRU of tool results tagged with the block they were observed at, capped at `max_bytes`.
+    `get_head` returns the current chain head, or None when it is not known to be fresh.
+    """
+
+    def __init__(self, get_head: Callable[[], Optional[int]], max_bytes: int) -> None:
+        self.get_head = get_head
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._head: Optional[int] = None
+        # Bumped on invalidation, so a call that started before it is not cached after it
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: str, head: int) -> Optional[_Entry]:
+        with self._lock:
+            self._advance(head)
+            entry = self._entries.get(key)
+            if entry is None or entry.block != head:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, head: int, result: Any, generation: Optional[int] = None) -> None:
+        size = _size(key, result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._advance(head)
+            if head != self._head or (generation is not None and generation != self._generation):
+                # The head moved on, or our wallet transacted, while the call ran
+                return
+            self._remove(key)
+            self._entries[key] = _Entry(head, result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after our wallet submitted a transaction."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def _advance(self, head: int) -> None:
+        # Every entry was observed at an older head once a newer one is seen
+        if self._head is None or head > self._head:
+            if self._entries:
+                logger.debug(f"Chain head advanced to {head}, dropping {len(self._entries)} cached tool results")
+            self._entries.clear()
+            self._bytes = 0
+            self._head = head
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a read-only tool function; like single-flight, only keyword arguments form the key."""
+        @functools.wraps(func)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            head = self.get_head()
+            if head is None:
+                with self._lock:
+                    self.stats["bypassed"] += 1
+                return func(*args, **kwargs)
+            key = call_key(name, kwargs)
+            entry = self.get(key, head)
+            if entry is not None:
+                return entry.result
+            generation = self._generation
+            result = func(*args, **kwargs)
+            self.put(key, head, result, generation)
+            return result
+        return wrapped
+
+    def invalidating(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a state-changing tool function so the cache is cleared once it has run, even if it failed."""
+        @functools.wraps(func)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.invalidate()
+        return wrapped
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update(entries=len(self._entries), bytes=self._bytes, head=self._head)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+def _follower_head() -> Optional[int]:
+    from agent_backend.agent.custom_actions.get_latest_block import get_follower_head
+    return get_follower_head()
+
+# Per-process, like the wallet whose transactions invalidate it
+_tool_cache = per_process(lambda: ToolResultCache(_follower_head, get_settings().tool_cache_max_bytes))
+
+def get_tool_cache() -> Optional[ToolResultCache]:
+    """Get the process-wide read-only tool result cache, or None when disabled."""
+    if not get_settings().tool_cache_enabled:
+        return None
+    return _tool_cache()
@@ -0,0 +1,202 @@
+"""
+Compaction of large tool outputs before they reach the agent scratchpad.
+
+Every observation is sent back to the model on each later turn of a run, and one busy block
+from get_latest_block lists thousands of addresses. Outputs over their tool's token budget are
+shortened (long lists cut to their first items with a count of the rest, transaction hashes
+abbreviated, long text truncated) and the full output is kept in memory under a handle. The
+model can page through it with the read_tool_output tool. Clients still receive the full
+output through the stream, and deployments are still recorded from it.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agent_backend.config import get_settings
+from agent_backend.constants import GET_LATEST_BLOCK, GET_RECENT_BLOCKS, READ_TOOL_OUTPUT
+from agent_backend.metrics import TOOL_OUTPUT_TOKENS_SAVED, TOOL_OUTPUTS_COMPACTED
+from agent_backend.utils import count_tokens, per_process
+
+logger = logging.getLogger(__name__)
+
+# Token budgets for tools whose outputs are usually skimmed rather than read in full
+TOOL_OUTPUT_BUDGETS: Dict[str, int] = {
+    GET_LATEST_BLOCK: 300,
+    GET_RECENT_BLOCKS: 400,
+}
+
+# List lengths tried in turn until a structured output fits its budget
+LIST_LIMITS = (10, 5, 3, 1)
+CHARS_PER_TOKEN = 4
+# Token counts remembered for large observations, which are re-checked on every turn of a run
+MAX_TOKEN_COUNTS = 1024
+
+_HASH = re.compile(r"0x[0-9a-fA-F]{64}")
+
+def _as_text(output: Any) -> str:
+    return output if isinstance(output, str) else json.dumps(output, ensure_ascii=False, default=str)
+
+def _handle(text: str) -> str:
+    return "out_" + hashlib.sha256(text.encode()).hexdigest()[:12]
+
+def shorten(value: Any, list_limit: int) -> Any:
+    """`value` with lists cut to `list_limit` items (plus a count of the rest) and hashes abbreviated."""
+    if isinstance(value, dict):
+        return {key: shorten(item, list_limit) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [shorten(item, list_limit) for item in value[:list_limit]]
+        if len(value) > list_limit:
+            items.append(f"... {len(value) - list_limit} more")
+        return items
+    if isinstance(value, str) and _HASH.fullmatch(value):
+        return f"{value[:10]}...{value[-4:]}"
+    return value
+
+class ToolOutputStore:
+    """
+    Full tool outputs by handle, least recently used dropped beyond `max_bytes`. Handles are
+    content hashes, so compacting the same observation on every turn of a run stores it once.
+    Stored outputs are paged back in pages of `default_budget` tokens, whatever the tool's budget.
+    """
+
+    def __init__(self, max_bytes: int, default_budget: int, budgets: Optional[Dict[str, int]] = None) -> None:
+        self.max_bytes = max_bytes
+        self.default_budget = default_budget
+        self.budgets = dict(TOOL_OUTPUT_BUDGETS if budgets is None else budgets)
+        self._outputs: "OrderedDict[str, str]" = OrderedDict()
+        self._compacted: Dict[Tuple[str, str], Any] = {}
+        self._token_counts: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"compacted": 0, "pages_read": 0, "expired_reads": 0}
+
+    def budget(self, tool: str) -> int:
+        return self.budgets.get(tool, self.default_budget)
+
+    def compact(self, tool: str, output: Any) -> Any:
+        """`output` itself if it fits the tool's budget, otherwise its compacted form with a handle."""
+        if tool == READ_TOOL_OUTPUT:
+            return output
+        text = _as_text(output)
+        budget = self.budget(tool)
+        if not self._over_budget(text, budget):
+            return output
+
+        handle = _handle(text)
+        with self._lock:
+            self._put(handle, text)
+            compacted = self._compacted.get((tool, handle))
+        if compacted is not None:
+            return compacted
+
+        pages = self._page_count(text)
+        hint = f"Output shortened. Call {READ_TOOL_OUTPUT} with handle {handle} for the full output ({pages} pages)."
+        compacted = self._shrink(output, text, budget)
+        compacted = {**compacted, "output_handle": handle, "note": hint} if isinstance(compacted, dict) else {
+            "output": compacted, "output_handle": handle, "note": hint}
+        saved = self._tokens(text) - count_tokens(_as_text(compacted))
+        with self._lock:
+            self.stats["compacted"] += 1
+        TOOL_OUTPUTS_COMPACTED.inc(tool=tool)
+        TOOL_OUTPUT_TOKENS_SAVED.inc(max(saved, 0), tool=tool)
+        logger.debug(f"Compacted {tool} output to {handle}, saving about {saved} tokens")
+        with self._lock:
+            if handle in self._outputs:
+                self._compacted[(tool, handle)] = compacted
+        return compacted
+
+    def _over_budget(self, text: str, budget: int) -> bool:
+        # Cheap bound before counting tokens: nothing this short can be over budget
+        return len(text) > budget * 2 and self._tokens(text) > budget
+
+    def _tokens(self, text: str) -> int:
+        handle = _handle(text)
+        with self._lock:
+            tokens = self._token_counts.get(handle)
+            if tokens is not None:
+                self._token_counts.move_to_end(handle)
+                return tokens
+        tokens = count_tokens(text)
+        with self._lock:
+            self._token_counts[handle] = tokens
+            while len(self._token_counts) > MAX_TOKEN_COUNTS:
+                self._token_counts.popitem(last=False)
+        return tokens
+
+    def shortened_any(self, intermediate_steps: Sequence[Tuple[Any, Any]]) -> bool:
+        """Whether any of the steps' observations is compacted in the scratchpad."""
+        return any(
+            action.tool != READ_TOOL_OUTPUT and self._over_budget(_as_text(observation), self.budget(action.tool))
+            for action, observation in intermediate_steps
+        )
+
+    def _shrink(self, output: Any, text: str, budget: int) -> Any:
+        if isinstance(output, (dict, list, tuple)):
+            for limit in LIST_LIMITS:
+                shortened = shorten(output, limit)
+                if count_tokens(_as_text(shortened)) <= budget:
+                    return shortened
+        return text[:budget * CHARS_PER_TOKEN] + "..."
+
+    def _page_count(self, text: str) -> int:
+        size = self.default_budget * CHARS_PER_TOKEN
+        return max(1, -(-len(text) // size))
+
+    def read(self, handle: str, page: int = 1) -> str:
+        """One page of a stored output, about one default budget long."""
+        with self._lock:
+            text = self._outputs.get(handle)
+            if text is not None:
+                self._outputs.move_to_end(handle)
+            self.stats["pages_read" if text is not None else "expired_reads"] += 1
+        if text is None:
+            return f"No stored output for handle {handle}; it may have expired. Run the original tool again."
+        pages = self._page_count(text)
+        if not 1 <= page <= pages:
+            return f"Page {page} is out of range; {handle} has {pages} pages."
+        size = self.default_budget * CHARS_PER_TOKEN
+        return f"Page {page} of {pages} of {handle}:\n{text[(page - 1) * size:page * size]}"
+
+    def _put(self, handle: str, text: str) -> None:
+        if handle in self._outputs:
+            self._outputs.move_to_end(handle)
+            return
+        self._outputs[handle] = text
+        self._bytes += len(text)
+        while self._bytes > self.max_bytes and len(self._outputs) > 1:
+            old, old_text = self._outputs.popitem(last=False)
+            self._bytes -= len(old_text)
+            for key in [key for key in self._compacted if key[1] == old]:
+                del self._compacted[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._outputs), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def compact_steps(self, intermediate_steps: Sequence[Tuple[Any, Any]]) -> List[Tuple[Any, Any]]:
+        """Intermediate steps with their observations compacted, for the scratchpad."""
+        return [(action, self.compact(action.tool, observation)) for action, observation in intermediate_steps]
+
+# Handles are only read back by runs in the process that stored them
+@per_process
+def _tool_output_store() -> ToolOutputStore:
+    settings = get_settings()
+    return ToolOutputStore(settings.tool_output_store_max_bytes, settings.tool_output_token_budget)
+
+def get_tool_output_store() -> Optional[ToolOutputStore]:
+    """Get the process-wide tool output store, or None when compaction is disabled."""
+    if not get_settings().tool_output_compaction_enabled:
+        return None
+    return _tool_output_store()
+
+def read_tool_output(handle: str, page: int = 1) -> str:
+    """Read the full output of an earlier tool call that was shortened, one page at a time. Pass the output_handle it returned and a page number starting at 1."""
+    store = get_tool_output_store()
+    if store is None:
+        return "Tool outputs are not stored; run the original tool again."
+    return store.read(handle, page)
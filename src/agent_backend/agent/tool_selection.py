@@ -0,0 +1,105 @@
+"""
+Per-request tool subsetting, so each LLM call carries only the schemas it is likely to need.
+
+The full catalog of CDP actions and block tools costs hundreds of prompt tokens on every
+round trip. The selector matches the latest user message against curated keywords per tool
+and binds the matching tools plus a small core set. A message that matches nothing (small
+talk, "what can you do", "yes, go ahead") gets the whole catalog, as does any tool without
+keywords, so selection can narrow what the model sees but never hide a tool it was asked about.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Sequence, Tuple
+
+from langchain_core.agents import AgentAction
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.tools import BaseTool
+
+from agent_backend.constants import GET_ADDRESS_BALANCE, GET_LATEST_BLOCK, GET_RECENT_BLOCKS, READ_TOOL_OUTPUT
+from agent_backend.metrics import AGENT_BOUND_TOOLS
+
+# Words (singular, lowercase) that point at each tool
+TOOL_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    "deploy_nft": frozenset({"nft", "erc721", "collection", "deploy", "launch"}),
+    "deploy_token": frozenset({"token", "erc20", "coin", "supply", "deploy", "launch"}),
+    "get_balance": frozenset({"balance", "fund", "much", "holding", "eth", "usdc", "weth"}),
+    "get_balance_nft": frozenset({"nft", "balance", "own", "hold"}),
+    "get_wallet_details": frozenset({"wallet", "address", "detail"}),
+    "mint_nft": frozenset({"mint", "nft"}),
+    "pyth_fetch_price": frozenset({"price", "worth", "cost", "usd", "rate"}),
+    "pyth_fetch_price_feed_id": frozenset({"price", "feed", "worth", "usd", "rate"}),
+    "register_basename": frozenset({"basename", "ens", "register"}),
+    "request_faucet_funds": frozenset({"faucet", "fund", "testnet"}),
+    "trade": frozenset({"trade", "swap", "exchange", "convert", "buy", "sell"}),
+    "transfer": frozenset({"transfer", "send", "pay"}),
+    "transfer_nft": frozenset({"transfer", "send", "nft"}),
+    "wow_buy_token": frozenset({"wow", "buy", "bonding", "curve", "meme", "memecoin"}),
+    "wow_create_token": frozenset({"wow", "create", "meme", "memecoin"}),
+    "wow_sell_token": frozenset({"wow", "sell", "meme", "memecoin"}),
+    "wrap_eth": frozenset({"wrap", "weth"}),
+    GET_LATEST_BLOCK: frozenset({"block", "latest", "chain", "transaction", "network"}),
+    GET_RECENT_BLOCKS: frozenset({"block", "recent", "activity", "gas", "trend", "transaction"}),
+    GET_ADDRESS_BALANCE: frozenset({"balance", "address", "0x"}),
+    # Only useful once a run has a shortened output; see `needs_followup`
+    READ_TOOL_OUTPUT: frozenset(),
+}
+
+# Bound on every call: cheap, and what most actions start from
+CORE_TOOLS: FrozenSet[str] = frozenset({"get_wallet_details"})
+
+_WORD = re.compile(r"0x|[a-z0-9]+")
+
+def keywords(text: str) -> FrozenSet[str]:
+    """Lowercase words of `text`, with a plural s dropped."""
+    words = _WORD.findall(text.lower())
+    return frozenset(word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word for word in words)
+
+class ToolSelector:
+    """
+    Picks the tools to bind for a request and memoizes the function schemas of each subset.
+    `to_schema` converts one tool (OpenAI tool or legacy function format). `needs_followup`,
+    given a run's steps, says whether to add the read_tool_output tool.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        to_schema: Callable[[BaseTool], Dict[str, Any]],
+        cache_size: int = 512,
+        needs_followup: Optional[Callable[[Sequence[Tuple[AgentAction, Any]]], bool]] = None,
+    ) -> None:
+        self.tools = list(tools)
+        self.needs_followup = needs_followup
+        self._schemas = {tool.name: to_schema(tool) for tool in self.tools}
+        self._all = frozenset(self._schemas)
+        # Tools nobody wrote keywords for are always offered
+        self._unmatched = frozenset(name for name in self._all if name not in TOOL_KEYWORDS)
+        self.select = lru_cache(maxsize=cache_size)(self._select)
+        self.schemas = lru_cache(maxsize=cache_size)(self._subset_schemas)
+
+    def _select(self, text: str) -> FrozenSet[str]:
+        words = keywords(text)
+        matched = frozenset(name for name in self._all if TOOL_KEYWORDS.get(name, frozenset()) & words)
+        if not matched:
+            return self._all
+        return matched | (CORE_TOOLS & self._all) | self._unmatched
+
+    def _subset_schemas(self, names: FrozenSet[str]) -> Tuple[Dict[str, Any], ...]:
+        # Catalog order, so a subset always renders the same prompt
+        return tuple(self._schemas[tool.name] for tool in self.tools if tool.name in names)
+
+    def select_for(self, messages: Sequence[BaseMessage], intermediate_steps: Iterable[Tuple[AgentAction, Any]] = ()) -> FrozenSet[str]:
+        """Tools for the latest human message, plus any already called in this run."""
+        text = next((str(message.content) for message in reversed(messages) if isinstance(message, HumanMessage)), "")
+        steps = list(intermediate_steps)
+        called = frozenset(action.tool for action, _ in steps if action.tool in self._all)
+        if READ_TOOL_OUTPUT in self._all and self.needs_followup is not None and self.needs_followup(steps):
+            called |= {READ_TOOL_OUTPUT}
+        return self.select(text) | called
+
+    def bind(self, llm: Any, messages: Sequence[BaseMessage], intermediate_steps: Iterable[Tuple[AgentAction, Any]], kwarg: str) -> Any:
+        """`llm` bound to the selected schemas as `kwarg` ("tools" or the legacy "functions")."""
+        names = self.select_for(messages, intermediate_steps)
+        AGENT_BOUND_TOOLS.observe(len(names))
+        return llm.bind(**{kwarg: list(self.schemas(names))})
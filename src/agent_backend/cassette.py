@@ -0,0 +1,293 @@
+"""
+Record/replay of the agent's external traffic, for profiling realistic runs offline.
+
+A cassette is a gzip-compressed JSON file of interactions indexed by a hash of the request:
+OpenAI HTTP exchanges (through an httpx transport), JSON-RPC calls (web3 and the batch client)
+and CDP actions run by the tools. Record a real session once with CASSETTE_MODE=record, then
+run with CASSETTE_MODE=replay to serve every call from the file with no network access.
+"""
+
+import atexit
+import base64
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from agent_backend.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+FORMAT_VERSION = 1
+
+# Headers describing the wire encoding of a body that is stored decoded
+_ENCODING_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+JsonRpcPayload = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+class CassetteMissError(LookupError):
+    """Replay found no recorded interaction for a request."""
+
+def request_key(kind: str, request: Any) -> str:
+    """Stable hash of a request: kind plus canonical JSON."""
+    canonical = json.dumps([kind, request], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class Cassette:
+    """
+    Interactions keyed by request hash. Identical requests recorded several times replay in
+    recorded order, then the last response repeats (e.g. a polled block number).
+
+    Replay sleeps for the recorded latency times `latency_scale`, or for a fixed `latency`
+    when given, so runs can be profiled with realistic, scaled or no network delay.
+    """
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 1.0, latency: Optional[float] = None) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Cassette mode must be {RECORD!r} or {REPLAY!r}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._positions: Dict[str, int] = {}
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        if mode == REPLAY or os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')} in {self.path}")
+        self._interactions = data["interactions"]
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the cassette atomically, to its own path unless another is given."""
+        path = path or self.path
+        with self._lock:
+            data = {"version": FORMAT_VERSION, "interactions": self._interactions}
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"), default=str)
+            os.replace(tmp, path)
+        logger.info(f"Saved {sum(map(len, self._interactions.values()))} interactions to {path}")
+
+    def play(self, kind: str, request: Any, perform: Callable[[], Any]) -> Any:
+        """
+        Replay the response to `request`, or in record mode run `perform` and record what it
+        returns (which must be JSON-serializable) along with how long it took.
+        """
+        key = request_key(kind, request)
+        if self.mode == REPLAY:
+            return self._replay(key, kind, request)
+
+        started = time.perf_counter()
+        response = perform()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._interactions.setdefault(key, []).append(
+                {"kind": kind, "request": request, "response": response, "elapsed": round(elapsed, 6)}
+            )
+            self.stats["recorded"] += 1
+        return response
+
+    def _replay(self, key: str, kind: str, request: Any) -> Any:
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                self.stats["misses"] += 1
+                raise CassetteMissError(f"No recorded {kind} interaction for {json.dumps(request, default=str)[:200]}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            entry = entries[min(position, len(entries) - 1)]
+            self.stats["replayed"] += 1
+        delay = self.latency if self.latency is not None else entry["elapsed"] * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        return entry["response"]
+
+    # JSON-RPC
+
+    def play_json_rpc(self, payload: JsonRpcPayload, perform: Callable[[], JsonRpcPayload]) -> JsonRpcPayload:
+        """
+        Play a JSON-RPC call or batch. Request ids vary between runs, so calls are keyed without
+        them and replayed batch responses get the ids of the current request.
+        """
+        batch = isinstance(payload, list)
+        calls = payload if batch else [payload]
+        request = [{"method": call["method"], "params": call.get("params", [])} for call in calls]
+        if not batch:
+            return self.play("json-rpc", request, perform)
+
+        def perform_in_request_order() -> Any:
+            body = perform()
+            if isinstance(body, dict):
+                # A rejected batch answers with a single error object
+                return {"rejected": body}
+            by_id = {response.get("id"): response for response in body}
+            return [{k: v for k, v in by_id.get(call.get("id"), {}).items() if k != "id"} for call in calls]
+
+        recorded = self.play("json-rpc", request, perform_in_request_order)
+        if isinstance(recorded, dict):
+            return recorded["rejected"]
+        return [dict(response, id=call.get("id")) for call, response in zip(calls, recorded)]
+
+    def wrap_make_request(self, make_request: Callable[[str, Any], Dict[str, Any]]) -> Callable[[str, Any], Dict[str, Any]]:
+        """Wrap a web3 provider's make_request(method, params)."""
+        @functools.wraps(make_request)
+        def wrapped(method: str, params: Any) -> Dict[str, Any]:
+            call = {"method": method, "params": list(params)}
+            return self.play_json_rpc(call, lambda: dict(make_request(method, params)))
+        return wrapped
+
+    def mount(self, session: requests.Session) -> None:
+        """Route a requests session's JSON-RPC posts through the cassette."""
+        adapter = CassetteAdapter(self, session.get_adapter("https://"))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    # OpenAI
+
+    def httpx_client(self) -> httpx.Client:
+        """An httpx client (for the OpenAI SDK) whose exchanges go through the cassette."""
+        return httpx.Client(transport=CassetteTransport(self), timeout=httpx.Timeout(60.0, connect=5.0))
+
+    # CDP actions
+
+    def wrap_action(self, func: Callable[..., str]) -> Callable[..., str]:
+        """
+        Wrap a CDP action function. The wrapper keeps the action's signature, so CdpAgentkitWrapper
+        still passes the wallet; in replay the wallet is not used and may be None.
+        """
+        @functools.wraps(func)
+        def wrapped(*args: Any, **kwargs: Any) -> str:
+            return self.play("cdp", {"action": func.__name__, "arguments": kwargs}, lambda: func(*args, **kwargs))
+        return wrapped
+
+def _body_to_json(content: bytes) -> Dict[str, str]:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+def _body_from_json(body: Dict[str, str]) -> bytes:
+    return body["text"].encode("utf-8") if "text" in body else base64.b64decode(body["base64"])
+
+def _request_body(content: bytes) -> Any:
+    try:
+        return json.loads(content) if content else None
+    except ValueError:
+        return _body_to_json(content)
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport that records or replays whole responses, including streamed ones."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.BaseTransport] = None) -> None:
+        self.cassette = cassette
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = {"method": request.method, "url": str(request.url), "body": _request_body(request.read())}
+
+        def perform() -> Dict[str, Any]:
+            response = self.transport.handle_request(request)
+            try:
+                content = response.read()
+            finally:
+                response.close()
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _ENCODING_HEADERS}
+            return {"status": response.status_code, "headers": headers, "body": _body_to_json(content)}
+
+        recorded = self.cassette.play("http", key, perform)
+        return httpx.Response(
+            recorded["status"], headers=recorded["headers"], content=_body_from_json(recorded["body"]), request=request
+        )
+
+    def close(self) -> None:
+        self.transport.close()
+
+class _Unrecorded(Exception):
+    def __init__(self, response: requests.Response) -> None:
+        super().__init__(response.status_code)
+        self.response = response
+
+class CassetteAdapter(HTTPAdapter):
+    """requests adapter that plays JSON-RPC posts through the cassette."""
+
+    def __init__(self, cassette: Cassette, adapter: Optional[HTTPAdapter] = None) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        payload = json.loads(request.body or b"null")
+
+        def perform() -> JsonRpcPayload:
+            response = self.adapter.send(request, **kwargs)
+            if response.status_code != 200:
+                # Failed attempts are left to the caller's retries, not recorded
+                raise _Unrecorded(response)
+            return response.json()
+
+        try:
+            body = self.cassette.play_json_rpc(payload, perform)
+        except _Unrecorded as e:
+            return e.response
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response._content = json.dumps(body).encode()
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        self.adapter.close()
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+def _save_at_exit(cassette: Cassette, owner_pid: int) -> None:
+    """Save the recording; forked workers (which inherit this handler) each write their own file."""
+    if os.getpid() == owner_pid:
+        cassette.save()
+        return
+    root = cassette.path[:-len(".json.gz")] if cassette.path.endswith(".json.gz") else cassette.path
+    cassette.save(f"{root}.{os.getpid()}.json.gz")
+
+def get_cassette() -> Optional[Cassette]:
+    """Get the process-wide cassette, or None unless CASSETTE_MODE is record or replay."""
+    global _cassette
+    settings = get_settings()
+    if not settings.cassette_mode:
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(
+                settings.cassette_path,
+                settings.cassette_mode,
+                latency_scale=settings.cassette_latency_scale,
+                latency=settings.cassette_latency,
+            )
+            if _cassette.mode == RECORD:
+                atexit.register(_save_at_exit, _cassette, os.getpid())
+            logger.info(f"Cassette {_cassette.mode} mode: {_cassette.path}")
+        return _cassette
@@ -1,8 +1,136 @@
-from typing import Dict, Any
+"""Application settings."""
 
-def get_settings() -> Dict[str, Any]:
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from agent_backend.constants import AGENT_MODEL
+from agent_backend.utils import env_bool, env_float, env_int
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed application settings, resolved once per process from the environment."""
+    network_id: str = "base-sepolia"  # Default network ID
+    openai_api_key: Optional[str] = None
+    # Initialize the agent at import (in the gunicorn master with preload) instead of on first request
+    eager_init: bool = False
+    # Conversation memory
+    memory_token_budget: int = 2000
+    memory_cache_size: int = 256
+    memory_cache_ttl: float = 30.0
+    memory_summary_model: str = AGENT_MODEL
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_size: int = 512
+    llm_cache_ttl: int = 3600
+    llm_cache_url: Optional[str] = None  # Defaults to the application database
+    # Tools API with parallel tool calls; read-only tools in one turn run concurrently
+    parallel_tool_calls: bool = True
+    tool_max_concurrency: int = 4
+    # Bind only the tools each request is about; see agent_backend.agent.tool_selection
+    tool_selection_enabled: bool = True
+    # Concurrent identical read-only tool calls share one upstream request
+    tool_single_flight_enabled: bool = True
+    # Read-only CDP results cached until the chain head advances; see agent_backend.agent.tool_cache
+    tool_cache_enabled: bool = True
+    tool_cache_max_bytes: int = 4 * 1024 * 1024
+    # Large tool outputs shortened in the scratchpad; see agent_backend.agent.tool_output
+    tool_output_compaction_enabled: bool = True
+    tool_output_token_budget: int = 500
+    tool_output_store_max_bytes: int = 4 * 1024 * 1024
+    # Answer plainly structured chat messages without the LLM; see agent_backend.agent.intent_router
+    intent_router_enabled: bool = True
+    # Base Sepolia JSON-RPC and the background block follower
+    rpc_url: str = "https://sepolia.base.org"
+    block_follower_enabled: bool = True
+    block_buffer_size: int = 32
+    block_poll_interval: float = 1.0
+    block_max_staleness: float = 6.0
+    # Blocks behind the head before a range is treated as final (no longer reorged) by /api/blocks
+    block_confirmations: int = 300
+    # Batched JSON-RPC range fetches
+    rpc_batch_size: int = 10
+    rpc_max_concurrency: int = 4
+    rpc_max_retries: int = 3
+    rpc_timeout: float = 10.0
+    block_range_limit: int = 100
+    # Write-behind outbox for agent action side effects
+    outbox_path: str = "outbox.db"
+    outbox_flush_interval: float = 0.5
+    outbox_batch_size: int = 500
+    outbox_claim_timeout: float = 60.0
+    # Seconds between background health checks behind /health
+    health_check_interval: float = 15.0
+    # Agent runs per worker on /api/chat (0: unlimited) and the wait queue in front of them,
+    # and the same for chats the intent router answers; see agent_backend.admission
+    chat_max_concurrency: int = 4
+    chat_max_queue: int = 4
+    chat_lookup_max_concurrency: int = 2
+    chat_lookup_max_queue: int = 2
+    chat_queue_timeout: float = 2.0
+    # flask-limiter storage shared by all workers; see agent_backend.db.rate_limit
+    rate_limit_storage_uri: str = "db://"
+    rate_limit_lease_size: int = 5
+    # /tokens and /nfts listing cache
+    listing_cache_ttl: float = 5.0
+    # Record/replay of OpenAI, CDP and JSON-RPC traffic; see agent_backend.cassette
+    cassette_mode: Optional[str] = None  # "record" or "replay"
+    cassette_path: str = "cassettes/agent.json.gz"
+    cassette_latency_scale: float = 1.0
+    cassette_latency: Optional[float] = None  # Fixed replay latency, overriding the recorded one
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
     """Get the application settings."""
-    return {
-        "network_id": "base-sepolia",  # Default network ID
-        "openai_api_key": None,  # Will be loaded from environment variable
-    } 
\ No newline at end of file
+    return Settings(
+        network_id=os.getenv("NETWORK_ID", "base-sepolia"),
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        eager_init=env_bool("EAGER_INIT", False),
+        memory_token_budget=env_int("MEMORY_TOKEN_BUDGET", 2000),
+        memory_cache_size=env_int("MEMORY_CACHE_SIZE", 256),
+        memory_cache_ttl=env_float("MEMORY_CACHE_TTL", 30.0),
+        memory_summary_model=os.getenv("MEMORY_SUMMARY_MODEL", AGENT_MODEL),
+        llm_cache_enabled=env_bool("LLM_CACHE_ENABLED", True),
+        llm_cache_size=env_int("LLM_CACHE_SIZE", 512),
+        llm_cache_ttl=env_int("LLM_CACHE_TTL", 3600),
+        llm_cache_url=os.getenv("LLM_CACHE_URL") or None,
+        parallel_tool_calls=env_bool("PARALLEL_TOOL_CALLS", True),
+        tool_max_concurrency=env_int("TOOL_MAX_CONCURRENCY", 4),
+        tool_selection_enabled=env_bool("TOOL_SELECTION_ENABLED", True),
+        tool_single_flight_enabled=env_bool("TOOL_SINGLE_FLIGHT_ENABLED", True),
+        tool_cache_enabled=env_bool("TOOL_CACHE_ENABLED", True),
+        tool_cache_max_bytes=env_int("TOOL_CACHE_MAX_BYTES", 4 * 1024 * 1024),
+        tool_output_compaction_enabled=env_bool("TOOL_OUTPUT_COMPACTION_ENABLED", True),
+        tool_output_token_budget=env_int("TOOL_OUTPUT_TOKEN_BUDGET", 500),
+        tool_output_store_max_bytes=env_int("TOOL_OUTPUT_STORE_MAX_BYTES", 4 * 1024 * 1024),
+        intent_router_enabled=env_bool("INTENT_ROUTER_ENABLED", True),
+        rpc_url=os.getenv("BASE_SEPOLIA_RPC_URL", "https://sepolia.base.org"),
+        block_follower_enabled=env_bool("BLOCK_FOLLOWER_ENABLED", True),
+        block_buffer_size=env_int("BLOCK_BUFFER_SIZE", 32),
+        block_poll_interval=env_float("BLOCK_POLL_INTERVAL", 1.0),
+        block_max_staleness=env_float("BLOCK_MAX_STALENESS", 6.0),
+        block_confirmations=env_int("BLOCK_CONFIRMATIONS", 300),
+        rpc_batch_size=env_int("RPC_BATCH_SIZE", 10),
+        rpc_max_concurrency=env_int("RPC_MAX_CONCURRENCY", 4),
+        rpc_max_retries=env_int("RPC_MAX_RETRIES", 3),
+        rpc_timeout=env_float("RPC_TIMEOUT", 10.0),
+        block_range_limit=env_int("BLOCK_RANGE_LIMIT", 100),
+        outbox_path=os.getenv("OUTBOX_PATH", "outbox.db"),
+        outbox_flush_interval=env_float("OUTBOX_FLUSH_INTERVAL", 0.5),
+        outbox_batch_size=env_int("OUTBOX_BATCH_SIZE", 500),
+        outbox_claim_timeout=env_float("OUTBOX_CLAIM_TIMEOUT", 60.0),
+        health_check_interval=env_float("HEALTH_CHECK_INTERVAL", 15.0),
+        chat_max_concurrency=env_int("CHAT_MAX_CONCURRENCY", 4),
+        chat_max_queue=env_int("CHAT_MAX_QUEUE", 4),
+        chat_lookup_max_concurrency=env_int("CHAT_LOOKUP_MAX_CONCURRENCY", 2),
+        chat_lookup_max_queue=env_int("CHAT_LOOKUP_MAX_QUEUE", 2),
+        chat_queue_timeout=env_float("CHAT_QUEUE_TIMEOUT", 2.0),
+        rate_limit_storage_uri=os.getenv("RATE_LIMIT_STORAGE_URI", "db://"),
+        rate_limit_lease_size=env_int("RATE_LIMIT_LEASE_SIZE", 5),
+        listing_cache_ttl=env_float("LISTING_CACHE_TTL", 5.0),
+        cassette_mode=os.getenv("CASSETTE_MODE") or None,
+        cassette_path=os.getenv("CASSETTE_PATH", "cassettes/agent.json.gz"),
+        cassette_latency_scale=env_float("CASSETTE_LATENCY_SCALE", 1.0),
+        cassette_latency=float(os.environ["CASSETTE_LATENCY"]) if os.getenv("CASSETTE_LATENCY") else None,
+    )
@@ -1,6 +1,6 @@
 """Constants used throughout the application."""
 
-from typing import Final
+from typing import Final, FrozenSet
 
 # Event types
 EVENT_TYPE_AGENT: Final[str] = "agent"
@@ -20,6 +20,31 @@ class InputValidationError(Exception):
 # Actions
 DEPLOY_TOKEN: Final[str] = "deploy_token"
 DEPLOY_NFT: Final[str] = "deploy_nft"
+GET_LATEST_BLOCK: Final[str] = "get_latest_block"
+GET_RECENT_BLOCKS: Final[str] = "get_recent_blocks"
+GET_ADDRESS_BALANCE: Final[str] = "get_address_balance"
+READ_TOOL_OUTPUT: Final[str] = "read_tool_output"
+
+# Actions that only read chain or wallet state. Anything else is treated as state-changing.
+READ_ONLY_ACTIONS: Final[FrozenSet[str]] = frozenset({
+    "get_balance",
+    "get_balance_nft",
+    "get_wallet_details",
+    "pyth_fetch_price",
+    "pyth_fetch_price_feed_id",
+    GET_LATEST_BLOCK,
+    GET_RECENT_BLOCKS,
+    GET_ADDRESS_BALANCE,
+    READ_TOOL_OUTPUT,
+})
+
+# Read-only actions whose results only change with a new block (or our own transaction)
+BLOCK_CACHED_ACTIONS: Final[FrozenSet[str]] = frozenset({
+    "get_balance",
+    "get_balance_nft",
+    "get_wallet_details",
+    GET_ADDRESS_BALANCE,
+})
 
 # Agent
 AGENT_MODEL: Final[str] = "gpt-4-0125-preview"
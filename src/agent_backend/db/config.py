@@ -1,35 +1,87 @@
 """Database configuration."""
 
 import os
-from typing import Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional
 from urllib.parse import urlparse
 
-def get_database_url() -> str:
-    """Get database URL from environment variables."""
+from agent_backend.utils import env_bool, env_float, env_int
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """Typed database settings, resolved once per process from the environment."""
+    url: str
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    echo: bool = False
+
+    @property
+    def is_sqlite(self) -> bool:
+        """Whether the configured database is SQLite."""
+        return self.url.startswith("sqlite")
+
+def _resolve_database_url() -> str:
+    """Build the database URL from environment variables."""
     # First try Render's internal database URL
     database_url = os.getenv("DATABASE_URL")
     if database_url:
+        # SQLite URLs are used as-is for local development
+        if database_url.startswith("sqlite"):
+            return database_url
         # Parse the URL to handle any special characters in password
         parsed = urlparse(database_url)
         # Reconstruct the URL with proper escaping
         return f"postgresql://{parsed.username}:{parsed.password}@{parsed.hostname}:{parsed.port or 5432}{parsed.path}"
-        
+
     # Fallback to constructing URL from individual components
     host = os.getenv("POSTGRES_HOST", "localhost")
     port = os.getenv("POSTGRES_PORT", "5432")
     database = os.getenv("POSTGRES_DB", "onchain_agent")
     user = os.getenv("POSTGRES_USER", "postgres")
     password = os.getenv("POSTGRES_PASSWORD", "postgres")
-    
+
     return f"postgresql://{user}:{password}@{host}:{port}/{database}"
 
-def get_engine_options() -> Dict[str, Any]:
-    """Get SQLAlchemy engine options."""
-    return {
-        "pool_pre_ping": True,  # Enable connection health checks
-        "pool_size": 5,  # Set a reasonable pool size
-        "max_overflow": 10,  # Allow some overflow connections
-        "pool_timeout": 30,  # Connection timeout in seconds
-        "pool_recycle": 1800,  # Recycle connections every 30 minutes
-        "echo": True,  # Enable SQL query logging for debugging
-    } 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_database_settings() -> DatabaseSettings:
+    """Get the database settings, parsing the environment only on first use."""
+    return DatabaseSettings(
+        url=_resolve_database_url(),
+        pool_size=env_int("DB_POOL_SIZE", 5),
+        max_overflow=env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=env_float("DB_POOL_TIMEOUT", 30.0),
+        pool_recycle=env_int("DB_POOL_RECYCLE", 1800),
+        pool_pre_ping=env_bool("DB_POOL_PRE_PING", True),
+        echo=env_bool("DB_ECHO", False),
+    )
+
+def is_memory_sqlite(url: str) -> bool:
+    """Whether the URL points at an in-memory SQLite database."""
+    return url in ("sqlite://", "sqlite:///") or (url.startswith("sqlite") and ":memory:" in url)
+
+def get_database_url() -> str:
+    """Get database URL from environment variables."""
+    return get_database_settings().url
+
+def get_engine_options(url: Optional[str] = None) -> Dict[str, Any]:
+    """Get SQLAlchemy engine options for the given URL."""
+    settings = get_database_settings()
+    url = url or settings.url
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.pool_pre_ping,  # Enable connection health checks
+        "echo": settings.echo,  # SQL query logging, opt-in via DB_ECHO
+    }
+    # In-memory SQLite lives in a single connection, so it keeps SQLAlchemy's default pool
+    if is_memory_sqlite(url):
+        return options
+    options.update({
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "pool_timeout": settings.pool_timeout,
+        "pool_recycle": settings.pool_recycle,
+    })
+    return options
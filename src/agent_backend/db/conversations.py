@@ -0,0 +1,68 @@
+"""Conversation history database operations."""
+
+import json
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+
+from agent_backend.db.setup import get_engine
+
+def get_conversation_version(conversation_id: str) -> int:
+    """Get the stored version of a conversation, or 0 if it has never been saved."""
+    engine = get_engine()
+    with engine.connect() as conn:
+        version = conn.execute(
+            text("SELECT version FROM conversations WHERE conversation_id = :conversation_id"),
+            {"conversation_id": conversation_id}
+        ).scalar()
+        return version or 0
+
+def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """Get a conversation's summary, messages and version from the database."""
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execute(
+            text("SELECT summary, messages, version FROM conversations WHERE conversation_id = :conversation_id"),
+            {"conversation_id": conversation_id}
+        ).first()
+
+        if not result:
+            return None
+        summary, messages, version = result
+        return {"summary": summary or "", "messages": json.loads(messages), "version": version}
+
+def save_conversation(conversation_id: str, summary: str, messages: List[Dict[str, str]], expected_version: int) -> bool:
+    """
+    Save a conversation if it is still at expected_version.
+    Returns False when another worker wrote it first, so the caller can reload and retry.
+    """
+    params = {
+        "conversation_id": conversation_id,
+        "summary": summary,
+        "messages": json.dumps(messages),
+        "expected_version": expected_version,
+    }
+    engine = get_engine()
+    with engine.connect() as conn:
+        if expected_version == 0:
+            result = conn.execute(
+                text("""
+                INSERT INTO conversations (conversation_id, summary, messages, version, updated_at)
+                VALUES (:conversation_id, :summary, :messages, 1, CURRENT_TIMESTAMP)
+                ON CONFLICT (conversation_id) DO NOTHING
+                """),
+                params
+            )
+        else:
+            result = conn.execute(
+                text("""
+                UPDATE conversations
+                SET summary = :summary,
+                    messages = :messages,
+                    version = version + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE conversation_id = :conversation_id AND version = :expected_version
+                """),
+                params
+            )
+        conn.commit()
+        return result.rowcount == 1
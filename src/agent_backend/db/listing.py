@@ -0,0 +1,126 @@
+"""Cursor-paginated, cached listings of deployed contract addresses."""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from agent_backend.config import get_settings
+from agent_backend.db.setup import get_engine
+
+# Cached pages kept per listing; the cache is emptied whenever the table changes
+MAX_CACHED_PAGES = 256
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+@dataclass(frozen=True)
+class Page:
+    """One page of addresses, oldest first, with the validators for conditional GETs."""
+    addresses: List[str]
+    next_cursor: Optional[str]
+    etag: str
+    last_modified: Optional[datetime]
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    # Postgres returns datetimes; SQLite returns the stored CURRENT_TIMESTAMP text (UTC)
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def encode_cursor(created_at: Any, address: str) -> str:
+    # The timestamp goes back to the database exactly as it came out, so keyset comparisons stay exact
+    created = created_at.isoformat() if isinstance(created_at, datetime) else str(created_at)
+    return base64.urlsafe_b64encode(json.dumps([created, address]).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, address = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(address)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+class AddressListing:
+    """
+    Pages over a (address, created_at) table ordered by created_at, address.
+
+    Pages are cached in-process against the table version (row count and newest created_at).
+    The version is re-read from the database at most once per ttl seconds; local writes call
+    invalidate() so they show up immediately.
+    """
+
+    def __init__(self, table: str) -> None:
+        self.table = table
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[int, Any]] = None
+        self._version_checked_at = 0.0
+        self._pages: Dict[Tuple[Optional[str], int], Page] = {}
+        self.stats = {"hits": 0, "misses": 0, "version_checks": 0}
+
+    def invalidate(self) -> None:
+        """Forget the cached version and pages."""
+        with self._lock:
+            self._version = None
+            self._pages.clear()
+
+    def version(self) -> Tuple[int, Any]:
+        """(row count, newest created_at), re-read when older than the cache ttl."""
+        ttl = get_settings().listing_cache_ttl
+        with self._lock:
+            if self._version is not None and time.monotonic() - self._version_checked_at < ttl:
+                return self._version
+
+        with get_engine().connect() as conn:
+            count, newest = conn.execute(text(f"SELECT COUNT(*), MAX(created_at) FROM {self.table}")).one()
+
+        with self._lock:
+            self.stats["version_checks"] += 1
+            if (count, newest) != self._version:
+                self._pages.clear()
+            self._version, self._version_checked_at = (count, newest), time.monotonic()
+            return self._version
+
+    def page(self, limit: int, cursor: Optional[str] = None) -> Page:
+        """Get `limit` addresses after `cursor` (from the start when None)."""
+        after = decode_cursor(cursor) if cursor else None
+        version = self.version()
+        with self._lock:
+            cached = self._pages.get((cursor, limit))
+            self.stats["hits" if cached else "misses"] += 1
+        if cached:
+            return cached
+
+        where = "WHERE created_at > :created_at OR (created_at = :created_at AND address > :address)" if after else ""
+        params: Dict[str, Any] = {"limit": limit + 1}
+        if after:
+            params.update(created_at=after[0], address=after[1])
+        with get_engine().connect() as conn:
+            rows = conn.execute(
+                text(f"SELECT address, created_at FROM {self.table} {where} ORDER BY created_at, address LIMIT :limit"),
+                params
+            ).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        etag = hashlib.sha256(json.dumps([self.table, version[0], str(version[1]), cursor, limit]).encode()).hexdigest()
+        result = Page(
+            addresses=[row[0] for row in rows],
+            next_cursor=encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None,
+            etag=etag,
+            last_modified=_as_datetime(version[1]),
+        )
+        with self._lock:
+            # Only cache against the version the page was read under
+            if self._version == version:
+                if len(self._pages) >= MAX_CACHED_PAGES:
+                    self._pages.clear()
+                self._pages[(cursor, limit)] = result
+        return result
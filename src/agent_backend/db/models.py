@@ -4,7 +4,8 @@ from datetime import datetime
 from typing import Dict, Any
 import json
 
-from sqlalchemy import Column, String, DateTime, JSON, create_engine
+from sqlalchemy import Column, String, DateTime, JSON, Index, Integer, Text, create_engine, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -38,14 +39,26 @@ class Wallet(Base):
             'updated_at': self.updated_at.isoformat()
         }
 
+class WalletInfo(Base):
+    """Agent wallet data with validation metadata, as created by setup_database."""
+    __tablename__ = 'wallet_info'
+    __table_args__ = (Index('idx_wallet_updated', 'updated_at'),)
+
+    wallet_id = Column(String(255), primary_key=True)
+    info = Column(JSON().with_variant(JSONB(), 'postgresql'), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    validation_count = Column(Integer, server_default='1')
+
 class Token(Base):
     """Token model for storing deployed token information."""
     __tablename__ = 'tokens'
+    __table_args__ = (Index('idx_tokens_created', 'created_at', 'address'),)
 
     address = Column(String, primary_key=True)
-    name = Column(String, nullable=False)
-    symbol = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    name = Column(String, nullable=True)
+    symbol = Column(String, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the token to a dictionary."""
@@ -59,11 +72,12 @@ class Token(Base):
 class NFT(Base):
     """NFT model for storing deployed NFT information."""
     __tablename__ = 'nfts'
+    __table_args__ = (Index('idx_nfts_created', 'created_at', 'address'),)
 
     address = Column(String, primary_key=True)
-    name = Column(String, nullable=False)
-    symbol = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    name = Column(String, nullable=True)
+    symbol = Column(String, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the NFT to a dictionary."""
@@ -74,6 +88,16 @@ class NFT(Base):
             'created_at': self.created_at.isoformat()
         }
 
+class Conversation(Base):
+    """Conversation model for storing chat history per conversation_id."""
+    __tablename__ = 'conversations'
+
+    conversation_id = Column(String(255), primary_key=True)
+    summary = Column(Text, nullable=False, default='')
+    messages = Column(Text, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
 def init_db(database_url: str) -> sessionmaker:
     """Initialize the database connection."""
     engine = create_engine(database_url)
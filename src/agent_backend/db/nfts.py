@@ -1,23 +1,41 @@
 """NFT database operations."""
 
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence
 from sqlalchemy import text
 
+from agent_backend.db.listing import AddressListing, Page
+from agent_backend.db.models import NFT
+from agent_backend.db.repository import UpsertRepository
 from agent_backend.db.setup import get_engine
 
+nft_repository = UpsertRepository(NFT.__table__, key_columns=["address"])
+nft_listing = AddressListing("nfts")
+
 def add_nft(address: str) -> None:
     """Add an NFT address to the database."""
-    engine = get_engine()
-    with engine.connect() as conn:
-        conn.execute(
-            text("INSERT OR REPLACE INTO nfts (address) VALUES (:address)"),
-            {"address": address}
-        )
-        conn.commit()
+    add_nfts([address])
+
+def add_nfts(addresses: Sequence[str]) -> None:
+    """Add NFT addresses in one upsert, skipping addresses already stored."""
+    add_nft_records([{"address": address} for address in addresses])
+
+def add_nft_records(rows: Sequence[Dict[str, Any]]) -> int:
+    """
+    Bulk-add NFT rows (address, optionally name, symbol and created_at; every row with the same
+    columns), e.g. to backfill historical deployments. Existing addresses are left untouched.
+    """
+    count = nft_repository.add_many(rows)
+    if count:
+        nft_listing.invalidate()
+    return count
 
 def get_nfts() -> List[str]:
-    """Get all NFT addresses from the database."""
+    """Get all NFT addresses from the database, oldest first."""
     engine = get_engine()
     with engine.connect() as conn:
-        result = conn.execute(text("SELECT address FROM nfts"))
-        return [row[0] for row in result]
\ No newline at end of file
+        result = conn.execute(text("SELECT address FROM nfts ORDER BY created_at, address"))
+        return [row[0] for row in result]
+
+def get_nfts_page(limit: int, cursor: Optional[str] = None) -> Page:
+    """Get a page of NFT addresses ordered by created_at, served from cache when unchanged."""
+    return nft_listing.page(limit, cursor)
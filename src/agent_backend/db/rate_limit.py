@@ -0,0 +1,178 @@
+"""Shared rate-limit storage for flask-limiter, backed by the application database."""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Type, Union
+
+from limits.storage import Storage
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from agent_backend.db.setup import get_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SIZE = 5
+
+@dataclass
+class Lease:
+    """A block of hits reserved from the shared counter: positions next..last of the window."""
+    next: int
+    last: int
+    expires_at: float
+
+class LeasedSQLStorage(Storage):
+    """
+    Fixed-window counters shared by all workers and machines through a database table.
+
+    Each worker leases hits from the shared counter in blocks of `lease_size` with one upsert, then
+    hands them out locally, so most requests never touch the database. A hit's count is its position
+    in the shared window, so the limit is never exceeded across workers; at worst, hits still leased
+    by other workers when the window ends go unused.
+
+    URIs: ``db://`` uses the application database (SQLite on a single node, Postgres across nodes);
+    ``db+sqlite:///path`` and ``db+postgresql://...`` point at a specific database.
+    """
+
+    STORAGE_SCHEME = ["db", "db+sqlite", "db+postgresql"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, lease_size: int = DEFAULT_LEASE_SIZE, **options) -> None:
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.url = self._database_url(uri or "db://")
+        self.lease_size = max(1, int(lease_size))
+        self._leases: Dict[str, Lease] = {}
+        # Keys with a reservation in flight; other hits on the key wait for it instead of reserving too
+        self._reserving: Dict[str, threading.Event] = {}
+        self._leases_pid = os.getpid()
+        self._table_ready = False
+        self.stats = {"hits": 0, "leases": 0}
+
+    @staticmethod
+    def _database_url(uri: str) -> Optional[str]:
+        scheme, _, rest = uri.partition("://")
+        if scheme == "db":
+            return None
+        return f"{scheme[len('db+'):]}://{rest}"
+
+    @property
+    def base_exceptions(self) -> Union[Type[Exception], Tuple[Type[Exception], ...]]:
+        return SQLAlchemyError
+
+    def _engine(self):
+        engine = get_engine(self.url)
+        if not self._table_ready:
+            with engine.connect() as conn:
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS rate_limits (
+                        limit_key VARCHAR(255) PRIMARY KEY,
+                        count INTEGER NOT NULL,
+                        expires_at DOUBLE PRECISION NOT NULL
+                    )
+                """))
+                conn.commit()
+            self._table_ready = True
+        return engine
+
+    def _local_leases(self) -> Dict[str, Lease]:
+        # Leases copied into a forked child would hand out the same hits twice
+        if self._leases_pid != os.getpid():
+            self._leases, self._reserving, self._leases_pid = {}, {}, os.getpid()
+        return self._leases
+
+    def _reserve(self, key: str, expiry: int, size: int, elastic_expiry: bool) -> Lease:
+        """Atomically add `size` hits to the shared window (starting a new one if it expired)."""
+        now = time.time()
+        with self._engine().connect() as conn:
+            count, expires_at = conn.execute(
+                text("""
+                INSERT INTO rate_limits (limit_key, count, expires_at)
+                VALUES (:key, :size, :expires_at)
+                ON CONFLICT (limit_key) DO UPDATE
+                SET count = CASE WHEN rate_limits.expires_at <= :now THEN :size ELSE rate_limits.count + :size END,
+                    expires_at = CASE
+                        WHEN rate_limits.expires_at <= :now OR :elastic THEN :expires_at
+                        ELSE rate_limits.expires_at
+                    END
+                RETURNING count, expires_at
+                """),
+                {"key": key, "size": size, "now": now, "expires_at": now + expiry, "elastic": elastic_expiry}
+            ).one()
+            conn.commit()
+        self.stats["leases"] += 1
+        return Lease(next=count - size + 1, last=count, expires_at=expires_at)
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        # Only the local lease bookkeeping is under the lock; the database round trip is not, so a
+        # new client or an expired lease does not stall every other rate-limited request
+        while True:
+            with self.lock:
+                leases = self._local_leases()
+                lease = leases.get(key)
+                if lease is not None and lease.expires_at > time.time() and lease.next + amount - 1 <= lease.last:
+                    return self._take(lease, amount)
+                reserved = self._reserving.get(key)
+                if reserved is None:
+                    reserved = self._reserving[key] = threading.Event()
+                    break
+            reserved.wait()
+
+        try:
+            lease = self._reserve(key, expiry, max(self.lease_size, amount), elastic_expiry)
+            with self.lock:
+                self._local_leases()[key] = lease
+                return self._take(lease, amount)
+        finally:
+            with self.lock:
+                self._reserving.pop(key, None)
+            reserved.set()
+
+    def _take(self, lease: Lease, amount: int) -> int:
+        # Called with the lock held
+        lease.next += amount
+        self.stats["hits"] += 1
+        return lease.next - 1
+
+    def get(self, key: str) -> int:
+        with self._engine().connect() as conn:
+            row = conn.execute(
+                text("SELECT count, expires_at FROM rate_limits WHERE limit_key = :key"), {"key": key}
+            ).first()
+        return row[0] if row and row[1] > time.time() else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self.lock:
+            lease = self._local_leases().get(key)
+        if lease is not None and lease.expires_at > time.time():
+            return lease.expires_at
+        with self._engine().connect() as conn:
+            expires_at = conn.execute(
+                text("SELECT expires_at FROM rate_limits WHERE limit_key = :key"), {"key": key}
+            ).scalar()
+        return expires_at if expires_at is not None else time.time()
+
+    def check(self) -> bool:
+        try:
+            with self._engine().connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            # Includes driver import errors, which are not SQLAlchemyErrors
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self.lock:
+            self._local_leases().clear()
+        with self._engine().connect() as conn:
+            deleted = conn.execute(text("DELETE FROM rate_limits")).rowcount
+            conn.commit()
+        return deleted
+
+    def clear(self, key: str) -> None:
+        with self.lock:
+            self._local_leases().pop(key, None)
+        with self._engine().connect() as conn:
+            conn.execute(text("DELETE FROM rate_limits WHERE limit_key = :key"), {"key": key})
+            conn.commit()
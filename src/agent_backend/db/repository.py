@@ -0,0 +1,75 @@
+"""Dialect-aware upserts for the application tables."""
+
+import logging
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from agent_backend.db.setup import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Rows per executemany call; SQLAlchemy further pages these into multi-row INSERTs
+DEFAULT_BATCH_SIZE = 1000
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+class UpsertRepository:
+    """
+    Writes rows to a table with one native INSERT ... ON CONFLICT statement per batch.
+
+    On a key conflict, update_columns are overwritten from the incoming row and update_set
+    expressions (e.g. bumping a counter) are applied; with neither, existing rows are kept.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        key_columns: Sequence[str],
+        update_columns: Sequence[str] = (),
+        update_set: Optional[Mapping[str, Any]] = None,
+        url: Optional[str] = None,
+    ) -> None:
+        self.table = table
+        self.key_columns = list(key_columns)
+        self.update_columns = list(update_columns)
+        self.update_set = dict(update_set or {})
+        self.url = url
+
+    def _engine(self) -> Engine:
+        return get_engine(self.url)
+
+    def statement(self, dialect_name: str):
+        """The upsert statement for a dialect."""
+        insert = _INSERTS.get(dialect_name)
+        if insert is None:
+            raise NotImplementedError(f"Upserts are not supported on {dialect_name}")
+        stmt = insert(self.table)
+        set_ = {column: stmt.excluded[column] for column in self.update_columns}
+        set_.update(self.update_set)
+        if not set_:
+            return stmt.on_conflict_do_nothing(index_elements=self.key_columns)
+        return stmt.on_conflict_do_update(index_elements=self.key_columns, set_=set_)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Upsert one row."""
+        self.add_many([row])
+
+    def add_many(self, rows: Sequence[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Upsert rows with executemany, one round trip per batch. Returns the number of distinct rows sent."""
+        # A statement may not touch the same key twice on Postgres; the last row for a key wins
+        unique = list({tuple(row[key] for key in self.key_columns): row for row in rows}.values())
+        if not unique:
+            return 0
+        engine = self._engine()
+        stmt = self.statement(engine.dialect.name)
+        with engine.begin() as conn:
+            for start in range(0, len(unique), batch_size):
+                conn.execute(stmt, unique[start:start + batch_size])
+        logger.debug(f"Upserted {len(unique)} rows into {self.table.name}")
+        return len(unique)
@@ -1,33 +1,144 @@
 """Database setup and initialization."""
 
 import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 
-from agent_backend.db.config import get_database_url, get_engine_options
+from agent_backend.db.config import get_database_url, get_engine_options, is_memory_sqlite
+from agent_backend.metrics import instrument_engine
 
 logger = logging.getLogger(__name__)
 
-def get_engine() -> Engine:
-    """Get SQLAlchemy engine with appropriate configuration."""
-    url = get_database_url()
-    options = get_engine_options()
-    return create_engine(url, **options)
+class PoolWaitStats:
+    """Running totals of how long callers waited to check out a connection."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, elapsed: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.total_wait, 6),
+                "wait_seconds_avg": round(self.total_wait / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.max_wait, 6),
+            }
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+    def recreate(self) -> "TimedQueuePool":
+        # dispose() swaps in a fresh pool; keep the counters across it
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+# One engine per database URL per process, shared by every caller
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """Get the process-wide SQLAlchemy engine for the configured (or given) database URL."""
+    url = url or get_database_url()
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        engine = _engines.get(url)
+        if engine is None:
+            options = get_engine_options(url)
+            if not is_memory_sqlite(url):
+                options["poolclass"] = TimedQueuePool
+            engine = create_engine(url, **options)
+            instrument_engine(engine)
+            _engines[url] = engine
+            logger.info(f"Created database engine for {engine.url.render_as_string(hide_password=True)}")
+        return engine
+
+def dispose_engines() -> None:
+    """Close every pooled connection and forget the registered engines."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get connection pool statistics for every registered engine."""
+    stats = {}
+    for engine in list(_engines.values()):
+        pool = engine.pool
+        entry: Dict[str, Any] = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        if isinstance(pool, TimedQueuePool):
+            entry.update(pool.wait_stats.to_dict())
+        stats[engine.url.render_as_string(hide_password=True)] = entry
+    return stats
+
+def _reset_engines_after_fork() -> None:
+    """Drop pooled connections inherited from the parent process.
+
+    gunicorn forks workers from the master; sockets opened before the fork must
+    not be shared, so each child starts with empty pools. close=False leaves the
+    parent's connections untouched.
+    """
+    global _engines_lock
+    _engines_lock = threading.Lock()
+    for engine in _engines.values():
+        engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_engines_after_fork)
 
 def setup_database() -> None:
     """Set up the database tables."""
     try:
         engine = get_engine()
         
+        # JSONB is Postgres-only; SQLite stores the same JSON as text
+        json_type = "JSONB" if engine.dialect.name == "postgresql" else "JSON"
+        
         # Create tables using SQLAlchemy
         with engine.connect() as conn:
             # Create wallet info table with security metadata
-            conn.execute(text("""
+            conn.execute(text(f"""
                 CREATE TABLE IF NOT EXISTS wallet_info (
                     wallet_id VARCHAR(255) PRIMARY KEY,
-                    info JSONB NOT NULL,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                    info {json_type} NOT NULL,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
                     validation_count INTEGER DEFAULT 1,
                     CONSTRAINT valid_json CHECK (info IS NOT NULL)
                 )
@@ -39,6 +150,32 @@ def setup_database() -> None:
                 ON wallet_info(updated_at)
             """))
             
+            # Deployed tokens and NFTs, listed oldest first with keyset pagination
+            for table in ("tokens", "nfts"):
+                conn.execute(text(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        address VARCHAR(42) PRIMARY KEY,
+                        name VARCHAR(255),
+                        symbol VARCHAR(255),
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                """))
+                conn.execute(text(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{table}_created
+                    ON {table}(created_at, address)
+                """))
+            
+            # Conversation history, one row per conversation_id
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS conversations (
+                    conversation_id VARCHAR(255) PRIMARY KEY,
+                    summary TEXT NOT NULL DEFAULT '',
+                    messages TEXT NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+            
             conn.commit()
             logger.info("Database tables created successfully")
         
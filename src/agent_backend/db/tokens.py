@@ -1,23 +1,41 @@
 """Token database operations."""
 
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence
 from sqlalchemy import text
 
+from agent_backend.db.listing import AddressListing, Page
+from agent_backend.db.models import Token
+from agent_backend.db.repository import UpsertRepository
 from agent_backend.db.setup import get_engine
 
+token_repository = UpsertRepository(Token.__table__, key_columns=["address"])
+token_listing = AddressListing("tokens")
+
 def add_token(address: str) -> None:
     """Add a token address to the database."""
-    engine = get_engine()
-    with engine.connect() as conn:
-        conn.execute(
-            text("INSERT OR REPLACE INTO tokens (address) VALUES (:address)"),
-            {"address": address}
-        )
-        conn.commit()
+    add_tokens([address])
+
+def add_tokens(addresses: Sequence[str]) -> None:
+    """Add token addresses in one upsert, skipping addresses already stored."""
+    add_token_records([{"address": address} for address in addresses])
+
+def add_token_records(rows: Sequence[Dict[str, Any]]) -> int:
+    """
+    Bulk-add token rows (address, optionally name, symbol and created_at; every row with the same
+    columns), e.g. to backfill historical deployments. Existing addresses are left untouched.
+    """
+    count = token_repository.add_many(rows)
+    if count:
+        token_listing.invalidate()
+    return count
 
 def get_tokens() -> List[str]:
-    """Get all token addresses from the database."""
+    """Get all token addresses from the database, oldest first."""
     engine = get_engine()
     with engine.connect() as conn:
-        result = conn.execute(text("SELECT address FROM tokens"))
-        return [row[0] for row in result]
\ No newline at end of file
+        result = conn.execute(text("SELECT address FROM tokens ORDER BY created_at, address"))
+        return [row[0] for row in result]
+
+def get_tokens_page(limit: int, cursor: Optional[str] = None) -> Page:
+    """Get a page of token addresses ordered by created_at, served from cache when unchanged."""
+    return token_listing.page(limit, cursor)
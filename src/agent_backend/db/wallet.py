@@ -1,54 +1,33 @@
 """Database operations for wallet management."""
 
 import logging
-import json
 from typing import Optional, Dict, Any
-from sqlalchemy import text
+from sqlalchemy import func, select
 
+from agent_backend.db.models import WalletInfo
+from agent_backend.db.repository import UpsertRepository
 from agent_backend.db.setup import get_engine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+wallet_info_table = WalletInfo.__table__
+wallet_info_repository = UpsertRepository(
+    wallet_info_table,
+    key_columns=["wallet_id"],
+    update_columns=["info"],
+    update_set={
+        "updated_at": func.now(),
+        "validation_count": wallet_info_table.c.validation_count + 1,
+    },
+)
+
 def save_wallet_info(wallet_id: str, wallet_info: Dict[str, Any]) -> None:
     """Save wallet information to database."""
-    engine = get_engine()
-    
     try:
-        # Convert wallet info to JSON string
-        wallet_json = json.dumps(wallet_info)
-        
-        with engine.connect() as conn:
-            # Check if wallet exists
-            result = conn.execute(
-                text("SELECT wallet_id FROM wallet_info WHERE wallet_id = :wallet_id"),
-                {"wallet_id": wallet_id}
-            ).fetchone()
-            
-            if result:
-                # Update existing wallet
-                conn.execute(
-                    text("""
-                    UPDATE wallet_info 
-                    SET info = :info,
-                        updated_at = NOW(),
-                        validation_count = validation_count + 1
-                    WHERE wallet_id = :wallet_id
-                    """),
-                    {"info": wallet_json, "wallet_id": wallet_id}
-                )
-            else:
-                # Insert new wallet
-                conn.execute(
-                    text("""
-                    INSERT INTO wallet_info (wallet_id, info, created_at, updated_at, validation_count)
-                    VALUES (:wallet_id, :info, NOW(), NOW(), 1)
-                    """),
-                    {"wallet_id": wallet_id, "info": wallet_json}
-                )
-            
-            conn.commit()
-            logger.info(f"Saved wallet info for {wallet_id}")
+        # Insert, or update the existing wallet and count the validation, in one statement
+        wallet_info_repository.add({"wallet_id": wallet_id, "info": wallet_info})
+        logger.info(f"Saved wallet info for {wallet_id}")
         
     except Exception as e:
         logger.error(f"Failed to save wallet info: {str(e)}")
@@ -61,17 +40,18 @@ def get_wallet_info(wallet_id: str) -> Optional[Dict[str, Any]]:
     try:
         with engine.connect() as conn:
             result = conn.execute(
-                text("""
-                SELECT info, created_at, updated_at, validation_count
-                FROM wallet_info 
-                WHERE wallet_id = :wallet_id
-                """),
-                {"wallet_id": wallet_id}
+                select(
+                    wallet_info_table.c.info,
+                    wallet_info_table.c.created_at,
+                    wallet_info_table.c.updated_at,
+                    wallet_info_table.c.validation_count,
+                ).where(wallet_info_table.c.wallet_id == wallet_id)
             ).fetchone()
             
             if result:
                 info, created_at, updated_at, validation_count = result
-                wallet_info = json.loads(info)
+                # The JSON column type decodes info on both Postgres (JSONB) and SQLite
+                wallet_info = dict(info)
                 # Add metadata
                 wallet_info.update({
                     "created_at": created_at.isoformat(),
@@ -84,4 +64,4 @@ def get_wallet_info(wallet_id: str) -> Optional[Dict[str, Any]]:
             
     except Exception as e:
         logger.error(f"Failed to get wallet info: {str(e)}")
-        raise
\ No newline at end of file
+        raise
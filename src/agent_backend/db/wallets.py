@@ -1,28 +1,28 @@
 """Wallet database operations."""
 
-import json
 from typing import Dict, Optional
-from sqlalchemy import text
+from sqlalchemy import func, select
 
+from agent_backend.db.models import Wallet
+from agent_backend.db.repository import UpsertRepository
 from agent_backend.db.setup import get_engine
 
+wallets = Wallet.__table__
+wallet_repository = UpsertRepository(
+    wallets,
+    key_columns=["id"],
+    update_columns=["data"],
+    update_set={"updated_at": func.now()},
+)
+
 def save_wallet(wallet_id: str, data: Dict) -> None:
     """Save wallet data to the database."""
-    engine = get_engine()
-    with engine.connect() as conn:
-        conn.execute(
-            text("INSERT OR REPLACE INTO wallets (id, data) VALUES (:id, :data)"),
-            {"id": wallet_id, "data": json.dumps(data)}
-        )
-        conn.commit()
+    wallet_repository.add({"id": wallet_id, "data": data})
 
 def get_wallet(wallet_id: str) -> Optional[Dict]:
     """Get wallet data from the database."""
     engine = get_engine()
     with engine.connect() as conn:
-        result = conn.execute(
-            text("SELECT data FROM wallets WHERE id = :id"),
-            {"id": wallet_id}
-        ).first()
-
-        return json.loads(result[0]) if result else None 
\ No newline at end of file
+        return conn.execute(
+            select(wallets.c.data).where(wallets.c.id == wallet_id)
+        ).scalar()
@@ -0,0 +1,99 @@
+"""Background health monitor whose cached snapshot backs /health."""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from agent_backend.db.setup import get_engine
+
+logger = logging.getLogger(__name__)
+
+# A check returns a short detail string and raises when unhealthy
+HealthCheck = Callable[[], str]
+
+# A snapshot older than this many intervals means the monitor itself has stalled
+STALE_INTERVALS = 3
+
+def check_database() -> str:
+    """Run SELECT 1 on a pooled connection."""
+    with get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return "connected"
+
+class HealthMonitor:
+    """
+    Runs health checks on a background thread every `interval` seconds and caches the results,
+    so health probes read a snapshot instead of touching the database themselves.
+    """
+
+    def __init__(self, checks: Dict[str, HealthCheck], interval: float) -> None:
+        self.checks = checks
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Optional[float] = None
+
+    def run_checks(self) -> None:
+        """Run every check once and replace the snapshot."""
+        results = {}
+        for name, check in self.checks.items():
+            started = time.perf_counter()
+            try:
+                detail, ok = check(), True
+            except Exception as e:
+                detail, ok = f"failed: {e}", False
+            results[name] = {
+                "status": "ok" if ok else "failed",
+                "detail": detail,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                "checked_at": datetime.now(timezone.utc).isoformat(),
+            }
+        with self._lock:
+            self._results, self._checked_at = results, time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The latest results with their age. Status is "unknown" before the first run."""
+        with self._lock:
+            results, checked_at = dict(self._results), self._checked_at
+        if checked_at is None:
+            return {"status": "unknown", "checks": {}, "checked_at": None, "age_seconds": None}
+
+        age = time.time() - checked_at
+        healthy = all(result["status"] == "ok" for result in results.values())
+        if age > self.interval * STALE_INTERVALS:
+            status = "stale"
+        else:
+            status = "healthy" if healthy else "unhealthy"
+        return {
+            "status": status,
+            "checks": results,
+            "checked_at": datetime.fromtimestamp(checked_at, timezone.utc).isoformat(),
+            "age_seconds": round(age, 3),
+        }
+
+    def start(self) -> None:
+        """Start checking in the background (idempotent); the first run starts immediately."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_checks()
+            except Exception as e:
+                logger.warning(f"Health checks failed to run: {e}")
+            self._stop.wait(self.interval)
@@ -1,4 +1,4 @@
-from flask import Flask, request, Response, stream_with_context, jsonify
+from flask import Flask, request, Response, stream_with_context, jsonify, g
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -9,17 +9,29 @@ import json
 import time
 import threading
 from datetime import datetime
-from sqlalchemy import text
 import concurrent.futures
 import logging
 
-from agent_backend.agent.initialize_agent import initialize_agent
-from agent_backend.agent.run_agent import run_agent
-from agent_backend.db.setup import setup_database, get_engine
-from agent_backend.db.tokens import get_tokens
-from agent_backend.db.nfts import get_nfts
-from agent_backend.schemas import chat_request_schema
+# The agent stack (langchain, langchain_openai, cdp, cdp_langchain, web3) is imported on first
+# use inside init_app() and the chat path, so /livez, /health, /tokens and /nfts can serve
+# before it is loaded. See benchmarks/bench_import_time.py.
+from agent_backend.admission import Overloaded, get_admission_controller, get_lookup_admission_controller
+from agent_backend.agent.outbox import peek_outbox
+from agent_backend.health import HealthMonitor, check_database
+from agent_backend.metrics import (
+    COMPONENT_STATS, DB_POOL_STATS, REGISTRY, HTTP_IN_FLIGHT, HTTP_LATENCY, flatten_stats
+)
+from agent_backend.db.setup import setup_database, get_pool_stats
+# Registers the db:// rate-limit storage scheme with limits
+from agent_backend.db import rate_limit  # noqa: F401
+from agent_backend.db.listing import InvalidCursorError
+from agent_backend.db.tokens import get_tokens_page
+from agent_backend.db.nfts import get_nfts_page
+from agent_backend.schemas import (
+    block_range_request_schema, block_request_schema, chat_request_schema, page_request_schema
+)
 from agent_backend.config import get_settings
+from agent_backend.utils import per_process
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -29,114 +41,429 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
-# Initialize rate limiter
+# Initialize rate limiter. Budgets are shared by every worker and machine through the
+# database (leased in batches so most requests stay local); if the database is unreachable
+# limits fall back to per-process memory.
 limiter = Limiter(
     get_remote_address,
     app=app,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    storage_uri=get_settings().rate_limit_storage_uri,
+    storage_options={"lease_size": get_settings().rate_limit_lease_size},
+    in_memory_fallback_enabled=True,
 )
 
 # Initialize these as None first
 agent_executor = None
+conversation_memory = None
 db_initialized = False
+init_error = None
+_init_lock = threading.Lock()
+_init_thread = None
 
 def init_app():
     """Initialize the application."""
-    global agent_executor, db_initialized
-    
-    if not db_initialized:
-        logger.info("Setting up database...")
-        setup_database()
-        logger.info("Database setup complete")
-        db_initialized = True
+    global agent_executor, conversation_memory, db_initialized, init_error
     
-    if agent_executor is None:
-        logger.info("Starting agent initialization...")
-        agent_executor = initialize_agent()
-        logger.info("Agent initialization complete")
+    # One initializer at a time; later callers find everything already set up
+    with _init_lock:
+        try:
+            if not db_initialized:
+                logger.info("Setting up database...")
+                setup_database()
+                logger.info("Database setup complete")
+                db_initialized = True
+            
+            if agent_executor is None:
+                from agent_backend.agent.initialize_agent import initialize_agent
+                logger.info("Starting agent initialization...")
+                agent_executor = initialize_agent()
+                logger.info("Agent initialization complete")
 
-@app.route('/health')
-def health():
-    """Health check endpoint."""
-    # Initialize if not already done
-    if not db_initialized or agent_executor is None:
+            if conversation_memory is None:
+                from agent_backend.agent.memory import create_conversation_memory
+                conversation_memory = create_conversation_memory()
+            init_error = None
+        except Exception as e:
+            init_error = str(e)
+            raise
+
+def is_ready() -> bool:
+    """Whether this process can serve chat requests without initializing first."""
+    return db_initialized and agent_executor is not None and conversation_memory is not None
+
+def init_app_in_background() -> None:
+    """Finish initialization on a background thread, unless it is done or already running."""
+    global _init_thread
+    if is_ready() or (_init_thread is not None and _init_thread.is_alive()):
+        return
+
+    def run():
         try:
             init_app()
         except Exception as e:
-            logger.error(f"Failed to initialize: {e}")
-            return jsonify({
-                "status": "unhealthy",
-                "database": "unknown",
-                "agent": f"failed: {str(e)}",
-                "timestamp": datetime.datetime.utcnow().isoformat()
-            }), 500
-    
-    # Check database connection
-    try:
-        engine = get_engine()
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        db_status = "connected"
-    except Exception as e:
-        logger.error(f"Database health check failed: {e}")
-        db_status = f"failed: {str(e)}"
-    
-    # Check agent status
-    agent_status = "initialized" if agent_executor else "not initialized"
-    
+            logger.error(f"Background initialization failed: {e}")
+
+    _init_thread = threading.Thread(target=run, name="app-init", daemon=True)
+    _init_thread.start()
+
+@app.route('/livez')
+@limiter.exempt
+def livez():
+    """Liveness check: the process is up and serving requests."""
+    return jsonify({"status": "alive", "pid": os.getpid()})
+
+@app.route('/readyz')
+@limiter.exempt
+def readyz():
+    """Readiness check: this worker is initialized and can take chat traffic."""
+    ready = is_ready()
+    return jsonify({
+        "status": "ready" if ready else "starting",
+        "database": "initialized" if db_initialized else "not initialized",
+        "agent": "initialized" if agent_executor is not None else "not initialized",
+        "error": init_error,
+        "timestamp": datetime.utcnow().isoformat()
+    }), 200 if ready else 503
+
+def check_agent() -> str:
+    """Health check: the agent, database schema and memory are initialized."""
+    if not is_ready():
+        raise RuntimeError(init_error or "not initialized")
+    return "initialized"
+
+def check_wallet_signing() -> str:
+    """Health check: the agent's CDP wallet is hydrated with its seed and can sign."""
+    if agent_executor is None:
+        raise RuntimeError("agent not initialized")
+    for tool in agent_executor.tools:
+        wrapper = getattr(tool, "cdp_agentkit_wrapper", None)
+        if wrapper is not None:
+            wallet = wrapper.wallet
+            if not wallet.can_sign:
+                raise RuntimeError(f"wallet {wallet.id} has no seed loaded")
+            return f"can sign as {wallet.default_address.address_id}"
+    raise RuntimeError("no CDP wallet configured")
+
+# Its thread does not survive a fork
+@per_process
+def get_health_monitor() -> HealthMonitor:
+    """Get this process's health monitor, starting it on first use."""
+    monitor = HealthMonitor(
+        {"database": check_database, "agent": check_agent, "wallet": check_wallet_signing},
+        interval=get_settings().health_check_interval,
+    )
+    monitor.start()
+    return monitor
+
+@app.route('/health')
+@limiter.exempt
+def health():
+    """Health check endpoint, served from the monitor's cached snapshot."""
+    snapshot = get_health_monitor().snapshot()
+    checks = snapshot["checks"]
     return jsonify({
-        "status": "healthy" if db_status == "connected" and agent_status == "initialized" else "unhealthy",
-        "database": db_status,
-        "agent": agent_status,
-        "timestamp": datetime.datetime.utcnow().isoformat()
+        "status": snapshot["status"],
+        "database": checks.get("database", {}).get("detail", "unknown"),
+        "agent": checks.get("agent", {}).get("detail", "unknown"),
+        "wallet": checks.get("wallet", {}).get("detail", "unknown"),
+        "checks": checks,
+        "checked_at": snapshot["checked_at"],
+        "age_seconds": snapshot["age_seconds"],
+        "timestamp": datetime.utcnow().isoformat()
     })
 
+def component_stats():
+    """get_stats() of this worker's caches, queues and outbox, for /metrics."""
+    from agent_backend.agent.llm_cache import get_response_cache
+    from agent_backend.agent.single_flight import get_single_flight
+    from agent_backend.agent.tool_cache import get_tool_cache
+    from agent_backend.agent.tool_output import get_tool_output_store
+    from agent_backend.agent.intent_router import get_intent_router
+    components = {
+        "llm_cache": get_response_cache(),
+        "tool_single_flight": get_single_flight(),
+        "tool_cache": get_tool_cache(),
+        "tool_outputs": get_tool_output_store(),
+        "intent_router": get_intent_router(),
+        "chat_admission": get_admission_controller(),
+        "lookup_admission": get_lookup_admission_controller(),
+        # Read-only: a worker that has not recorded a deployment has no outbox journal or thread yet
+        "outbox": peek_outbox(),
+    }
+    return {
+        (name, stat): value
+        for name, component in components.items() if component is not None
+        for stat, value in flatten_stats(component.get_stats()).items()
+    }
+
+def database_pool_stats():
+    """Pool statistics per database engine, for /metrics."""
+    return {
+        (database, stat): value
+        for database, stats in get_pool_stats().items()
+        for stat, value in flatten_stats(stats).items()
+    }
+
+COMPONENT_STATS.add_callback(component_stats)
+DB_POOL_STATS.add_callback(database_pool_stats)
+
+@app.before_request
+def track_request_start():
+    g.metrics_endpoint = request.endpoint or "unmatched"
+    g.metrics_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+
+def _finish_request_metrics(endpoint: str, started: float) -> None:
+    HTTP_IN_FLIGHT.dec(endpoint=endpoint)
+    HTTP_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+
+@app.after_request
+def track_response(response):
+    # Closing the response happens after the last SSE frame is sent, so streamed chats count in full
+    endpoint = g.pop("metrics_endpoint", None)
+    if endpoint is not None:
+        started = g.pop("metrics_started")
+        response.call_on_close(lambda: _finish_request_metrics(endpoint, started))
+    return response
+
+@app.teardown_request
+def track_request_error(exc):
+    # after_request does not run when the view raised
+    endpoint = g.pop("metrics_endpoint", None)
+    if endpoint is not None:
+        _finish_request_metrics(endpoint, g.pop("metrics_started"))
+
+@app.route('/metrics')
+@limiter.exempt
+def metrics():
+    """Per-stage latency metrics for this worker, in the Prometheus text format."""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+def too_busy(retry_after: int):
+    """429 for a chat turned away by admission control."""
+    response = jsonify({"error": "Too many chat requests in progress, please retry shortly"})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, 429
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """Chat endpoint."""
+    try:
+        data = chat_request_schema.load(request.get_json(silent=True) or {})
+    except ValidationError as e:
+        return jsonify({"error": e.messages}), 400
+
+    if not is_ready() and get_settings().eager_init:
+        # Initialization belongs to startup, not to a user request; /readyz keeps traffic away meanwhile
+        init_app_in_background()
+        response = jsonify({"error": "Agent is starting, please retry shortly"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+
     # Initialize if not already done
-    if not db_initialized or agent_executor is None:
+    if not is_ready():
         try:
             init_app()
         except Exception as e:
             logger.error(f"Failed to initialize: {e}")
             return jsonify({"error": f"Failed to initialize: {str(e)}"}), 500
-    
+
+    # Already loaded by init_app(); imported here to keep them off the module import path
+    from langchain_core.messages import HumanMessage
+    from agent_backend.agent.intent_router import get_intent_router, stream_routed_answer
+    from agent_backend.agent.run_agent import ActionRecordingHandler, run_agent
+
+    conversation_id = data['conversation_id']
+    stream = data['stream'] or request.accept_mimetypes.best == 'text/event-stream'
+
+    def remember(output: str) -> None:
+        conversation_memory.append_turn(conversation_id, data['input'], output)
+
+    # Plainly structured queries are answered without the LLM, under their own smaller bound
+    router = get_intent_router()
     try:
-        data = request.json
-        if not data or 'input' not in data:
-            return jsonify({"error": "Missing required field: input"}), 400
-        
-        response = agent_executor.invoke({"input": data['input']})
+        routed = router.route(data['input'], agent_executor, get_lookup_admission_controller()) if router else None
+    except Overloaded as e:
+        return too_busy(e.retry_after)
+    if routed is not None:
+        remember(routed.answer)
+        if stream:
+            return Response(
+                stream_routed_answer(routed),
+                mimetype='text/event-stream',
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        return jsonify({"response": routed.answer})
+
+    # Agent runs are bounded per worker so they cannot take the threads cheap endpoints need
+    admission = get_admission_controller()
+    if admission is not None and not admission.try_acquire():
+        return too_busy(admission.retry_after())
+
+    config = {"metadata": {"conversation_id": conversation_id}}
+    try:
+        history = conversation_memory.load(conversation_id)
+
+        # Stream tokens and tool events as SSE when the client asks for it
+        if stream:
+            frames = run_agent(
+                data['input'], agent_executor, config, history=history, on_complete=remember,
+                on_finish=admission.release if admission is not None else None,
+            )
+            # The run holds its slot until it ends, even if the client disconnects first
+            admission = None
+            return Response(
+                stream_with_context(frames),
+                mimetype='text/event-stream',
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
+        # Deployments go through the outbox on this path too
+        config["callbacks"] = [ActionRecordingHandler()]
+        response = agent_executor.invoke({"messages": [*history, HumanMessage(content=data['input'])]}, config)
+        remember(response['output'])
         return jsonify({"response": response['output']})
         
     except Exception as e:
         logger.error(f"Error processing chat request: {e}")
         return jsonify({"error": str(e)}), 500
+    finally:
+        if admission is not None:
+            admission.release()
+
+def address_page_response(key: str, get_page):
+    """
+    Paginated address listing with ETag/Last-Modified validators.
+    Unchanged pages are answered with 304 from the listing cache.
+    """
+    try:
+        params = page_request_schema.load(request.args)
+    except ValidationError as e:
+        return jsonify({'error': e.messages}), 400
+    try:
+        page = get_page(params['limit'], params['cursor'])
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify({key: page.addresses, 'next_cursor': page.next_cursor})
+    response.set_etag(page.etag)
+    response.last_modified = page.last_modified
+    # Clients may keep the page but must revalidate it on every poll
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 # Retrieve a list of tokens the agent has deployed
 @app.route("/tokens", methods=['GET'])
 @limiter.limit("1000/day;100/hour")
 def tokens():
     try:
-        tokens = get_tokens()
-        return jsonify({'tokens': tokens}), 200
+        return address_page_response('tokens', get_tokens_page)
     except Exception as e:
         app.logger.error(f"Unexpected error in tokens endpoint: {str(e)}")
         return jsonify({'error': str(e)}), 500
     
-# Retrieve a list of tokens the agent has deployed
+# Retrieve a list of NFTs the agent has deployed
 @app.route("/nfts", methods=['GET'])
 @limiter.limit("1000/day;100/hour")
 def nfts():
     try:
-        nfts = get_nfts()
-        return jsonify({'nfts': nfts}), 200
+        return address_page_response('nfts', get_nfts_page)
     except Exception as e:
         app.logger.error(f"Unexpected error in nfts endpoint: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def onchain_response(body, settled: bool = False):
+    """
+    Compact JSON with an ETag. Settled data (blocks past BLOCK_CONFIRMATIONS) may be cached for good;
+    anything that follows the head must be revalidated, which is answered with 304 until it changes.
+    """
+    response = jsonify(body)
+    response.add_etag()
+    if settled:
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# On-chain reads for the frontend, answered without the agent loop
+@app.route("/api/block/latest", methods=['GET'])
+@limiter.limit("60/minute")
+def latest_block():
+    from agent_backend import onchain
+    try:
+        params = block_request_schema.load(request.args)
+    except ValidationError as e:
+        return jsonify({'error': e.messages}), 400
+    try:
+        return onchain_response(onchain.latest_block(params['addresses']))
+    except Exception as e:
+        logger.error(f"Failed to read the latest block: {e}")
+        return jsonify({'error': str(e)}), 502
+
+@app.route("/api/blocks", methods=['GET'])
+@limiter.limit("60/minute")
+def blocks():
+    from agent_backend import onchain
+    from agent_backend.agent.custom_actions.block_range import BlockNotFoundError
+    try:
+        params = block_range_request_schema.load(request.args)
+    except ValidationError as e:
+        return jsonify({'error': e.messages}), 400
+    try:
+        summary, settled = onchain.block_range(params['start'], params['end'], params['addresses'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except BlockNotFoundError as e:
+        # The node does not have the blocks yet (or any more); that is the request, not the node, failing
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Failed to read blocks {params['start']}..{params['end']}: {e}")
+        return jsonify({'error': str(e)}), 502
+    return onchain_response(summary, settled)
+
+@app.route("/api/balance/<address>", methods=['GET'])
+@limiter.limit("60/minute")
+def balance(address):
+    from agent_backend import onchain
+    if not onchain.ADDRESS_PATTERN.fullmatch(address):
+        return jsonify({'error': f"Invalid address {address}"}), 400
+    try:
+        return onchain_response(onchain.address_balance(address))
+    except Exception as e:
+        logger.error(f"Failed to read the balance of {address}: {e}")
+        return jsonify({'error': str(e)}), 502
+
+@app.route("/api/wallet", methods=['GET'])
+@limiter.limit("60/minute")
+def wallet():
+    from agent_backend import onchain
+    if not is_ready():
+        # The wallet is loaded with the agent
+        init_app_in_background()
+        response = jsonify({"error": "Agent is starting, please retry shortly"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+    try:
+        details = onchain.wallet_details(agent_executor)
+    except Exception as e:
+        logger.error(f"Failed to read the agent wallet: {e}")
+        return jsonify({'error': str(e)}), 502
+    if details is None:
+        return jsonify({"error": "The agent has no wallet"}), 503
+    return onchain_response(details)
+
+# Eager startup. Under gunicorn with preload_app (see gunicorn.conf.py) this runs once in the
+# master and forked workers inherit the initialized agent; database pools and CDP connections
+# are reset in each child.
+if get_settings().eager_init:
+    try:
+        init_app()
+    except Exception as e:
+        logger.error(f"Eager initialization failed, workers will retry in the background: {e}")
+
 if __name__ == '__main__':
     # Initialize on startup when running directly
     init_app()
@@ -0,0 +1,263 @@
+"""In-process metrics rendered in the Prometheus text exposition format."""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384)
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+LabelValues = Tuple[str, ...]
+
+logger = logging.getLogger(__name__)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in sorted(values.items())]
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class CallbackGauge(_Metric):
+    """Gauge whose values are read from a callback when rendered, for state another module owns."""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._callbacks: List[Callable[[], Dict[LabelValues, float]]] = []
+
+    def add_callback(self, callback: Callable[[], Dict[LabelValues, float]]) -> None:
+        """Add a source of {label values: value} samples."""
+        self._callbacks.append(callback)
+
+    def samples(self) -> List[str]:
+        values: Dict[LabelValues, float] = {}
+        for callback in self._callbacks:
+            try:
+                values.update(callback())
+            except Exception as e:
+                # One broken source must not take the rest of /metrics with it
+                logger.warning(f"Could not collect {self.name}: {e}")
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in sorted(values.items())]
+
+def flatten_stats(stats: Optional[Dict[str, Any]], prefix: str = "") -> Dict[str, float]:
+    """The numeric entries of a get_stats() dict, nested keys joined with underscores."""
+    flat: Dict[str, float] = {}
+    for key, value in (stats or {}).items():
+        if isinstance(value, dict):
+            flat.update(flatten_stats(value, f"{prefix}{key}_"))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = float(value)
+    return flat
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket counts (non-cumulative, last slot is +Inf), sum, count
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, totals = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0, 0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[1][1]) if series else 0
+
+    def mean(self, **labels: str) -> Optional[float]:
+        """Mean of the observations, or None before the first."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[1][0] / series[1][1] if series else None
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = {key: (list(counts), list(totals)) for key, (counts, totals) in self._series.items()}
+        lines = []
+        for key, (counts, (total, count)) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                labels = _format_labels((*self.labelnames, "le"), (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {int(count)}")
+        return lines
+
+class MetricsRegistry:
+    """A set of metrics rendered together for /metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+AGENT_RUN_LATENCY = REGISTRY.register(Histogram(
+    "agent_run_latency_seconds", "End-to-end agent executor run latency.", ["outcome"]))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "agent_llm_latency_seconds", "LLM call latency, including responses served from the cache.", ["model"]))
+LLM_TIME_TO_FIRST_TOKEN = REGISTRY.register(Histogram(
+    "agent_llm_time_to_first_token_seconds", "Time from LLM call start to the first streamed token.", ["model"]))
+LLM_PROMPT_TOKENS = REGISTRY.register(Histogram(
+    "agent_llm_prompt_tokens", "Prompt tokens per LLM call.", ["model"], buckets=TOKEN_BUCKETS))
+LLM_COMPLETION_TOKENS = REGISTRY.register(Histogram(
+    "agent_llm_completion_tokens", "Completion tokens per LLM call.", ["model"], buckets=TOKEN_BUCKETS))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "agent_llm_errors_total", "LLM calls that raised.", ["model"]))
+AGENT_BOUND_TOOLS = REGISTRY.register(Histogram(
+    "agent_bound_tools", "Tool schemas sent with each LLM call after per-request tool selection.", buckets=COUNT_BUCKETS))
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "agent_tool_latency_seconds", "Tool (CDP action or block tool) latency.", ["tool"]))
+TOOL_ERRORS = REGISTRY.register(Counter(
+    "agent_tool_errors_total", "Tool calls that raised.", ["tool"]))
+TOOL_CALLS_COALESCED = REGISTRY.register(Counter(
+    "agent_tool_calls_coalesced_total", "Read-only tool calls served by an identical call already in flight.", ["tool"]))
+TOOL_OUTPUTS_COMPACTED = REGISTRY.register(Counter(
+    "agent_tool_outputs_compacted_total", "Tool outputs shortened for the agent scratchpad.", ["tool"]))
+TOOL_OUTPUT_TOKENS_SAVED = REGISTRY.register(Counter(
+    "agent_tool_output_tokens_saved_total", "Estimated scratchpad tokens saved per compaction (each turn re-sends the scratchpad).", ["tool"]))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    "db_query_latency_seconds", "Database statement latency by statement type.", ["operation"]))
+DB_QUERY_ERRORS = REGISTRY.register(Counter(
+    "db_query_errors_total", "Database statements that raised.", ["operation"]))
+INTENT_ROUTER_LATENCY = REGISTRY.register(Histogram(
+    "agent_intent_fast_path_latency_seconds", "Chat messages answered by the intent router without the agent.", ["intent"]))
+INTENT_ROUTER_FALLBACKS = REGISTRY.register(Counter(
+    "agent_intent_fallbacks_total", "Chat messages the intent router left to the agent: no rule matched, or the intent's lookup failed.", ["reason"]))
+CHAT_ADMISSION_IN_FLIGHT = REGISTRY.register(Gauge(
+    "chat_admission_running", "Chats holding an admission slot in this worker: agent runs or routed lookups.", ["pool"]))
+CHAT_ADMISSION_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "chat_admission_queue_depth", "Chat requests waiting for an admission slot.", ["pool"]))
+CHAT_ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "chat_admission_wait_seconds", "Time admitted chat requests waited for a slot.", ["pool"]))
+CHAT_ADMISSION_REJECTED = REGISTRY.register(Counter(
+    "chat_admission_rejected_total", "Chat requests turned away with 429: queue full, or no slot within the queue timeout.", ["pool", "reason"]))
+COMPONENT_STATS = REGISTRY.register(CallbackGauge(
+    "agent_component_stats", "Runtime statistics of this worker's caches, queues and outbox, read when scraped.", ["component", "stat"]))
+DB_POOL_STATS = REGISTRY.register(CallbackGauge(
+    "db_pool_stats", "Connection pool size, use and wait statistics per database engine, read when scraped.", ["database", "stat"]))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "Requests being handled, including open SSE streams.", ["endpoint"]))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Request duration until the response (or SSE stream) completes.", ["endpoint"]))
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+def instrument_engine(engine: Engine) -> None:
+    """Record the latency and errors of every statement run on the engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_QUERY_LATENCY.observe(time.perf_counter() - started, operation=_operation(statement))
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+        DB_QUERY_ERRORS.inc(operation=_operation(context.statement or ""))
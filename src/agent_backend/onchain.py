@@ -0,0 +1,96 @@
+"""
+On-chain reads served straight to the REST API, without the agent loop.
+
+These use the agent's own building blocks: the block follower and batch RPC client behind
+get_latest_block and get_recent_blocks, get_address_balance through the same single-flight
+group and block-aware cache as the agent's tool, and the agent's CDP wallet.
+"""
+
+import copy
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agent_backend.config import get_settings
+from agent_backend.constants import GET_ADDRESS_BALANCE
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_PATTERN = re.compile(r"0x[a-fA-F0-9]{40}")
+
+def _compact(summary: Dict[str, Any], addresses: bool) -> Dict[str, Any]:
+    # Every sender and receiver can run to thousands of entries; by default only their count is sent
+    if addresses:
+        return summary
+    compact = dict(summary)
+    compact["address_summary"] = {"total_unique_addresses": summary["address_summary"]["total_unique_addresses"]}
+    return compact
+
+def latest_block(addresses: bool = False) -> Dict[str, Any]:
+    """Summary of the chain head, from the block follower's buffer when it is fresh."""
+    from agent_backend.agent.custom_actions.get_latest_block import get_latest_block
+    return _compact(get_latest_block(), addresses)
+
+def chain_head() -> int:
+    """The chain head block number, from the follower when fresh."""
+    from agent_backend.agent.custom_actions.get_latest_block import get_follower_head
+    from agent_backend.agent.custom_actions.block_range import get_rpc_client
+    head = get_follower_head()
+    return head if head is not None else get_rpc_client().get_block_number()
+
+def _range_summary(start: int, end: int) -> Dict[str, Any]:
+    from agent_backend.agent.custom_actions.block_analytics import summarize_blocks
+    from agent_backend.agent.custom_actions.block_range import fetch_block_range
+    return summarize_blocks(fetch_block_range(start, end))
+
+# Settled ranges never change. Only the compact form is kept: the address lists of a busy
+# range run to megabytes, and the range is chosen by the client.
+@lru_cache(maxsize=64)
+def _settled_range_summary(start: int, end: int) -> Dict[str, Any]:
+    return _compact(_range_summary(start, end), addresses=False)
+
+def block_range(start: int, end: int, addresses: bool = False) -> Tuple[Dict[str, Any], bool]:
+    """
+    Analytics over blocks start..end (inclusive), and whether the range is settled: at least
+    BLOCK_CONFIRMATIONS blocks below the head, so a reorg will not change it and its summary is
+    kept in memory. Raises ValueError for an empty, oversized or future range.
+    """
+    head = chain_head()
+    if end > head:
+        raise ValueError(f"Block range {start}..{end} ends after the chain head {head}")
+    settled = end <= head - get_settings().block_confirmations
+    if settled and not addresses:
+        # A copy, so the response cannot change the cached summary
+        return copy.deepcopy(_settled_range_summary(start, end)), settled
+    return _compact(_range_summary(start, end), addresses), settled
+
+def address_balance(address: str) -> Dict[str, Any]:
+    """
+    ETH balance of `address` at the latest block. Goes through the same single-flight group
+    and cache entries as the agent's get_address_balance tool.
+    """
+    from agent_backend.agent.custom_actions.address_balance import checksum_address, get_address_balance
+    from agent_backend.agent.single_flight import get_single_flight
+    from agent_backend.agent.tool_cache import get_tool_cache
+    read: Callable[..., Dict[str, Any]] = get_address_balance
+    single_flight, tool_cache = get_single_flight(), get_tool_cache()
+    if single_flight is not None:
+        read = single_flight.wrap(GET_ADDRESS_BALANCE, read)
+    if tool_cache is not None:
+        read = tool_cache.wrap(GET_ADDRESS_BALANCE, read)
+    return read(address=checksum_address(address))
+
+def wallet_details(agent_executor: Any) -> Optional[Dict[str, Any]]:
+    """The agent's CDP wallet, or None when it has none (e.g. replaying a cassette)."""
+    for tool in agent_executor.tools:
+        wrapper = getattr(tool, "cdp_agentkit_wrapper", None)
+        if wrapper is not None and wrapper.wallet is not None:
+            wallet = wrapper.wallet
+            return {
+                "wallet_id": wallet.id,
+                "network_id": wallet.network_id,
+                "default_address": wallet.default_address.address_id,
+                "addresses": [address.address_id for address in wallet.addresses],
+            }
+    return None
@@ -4,5 +4,24 @@ class ChatRequestSchema(Schema):
     """Schema for validating chat requests."""
     input = fields.String(required=True, validate=validate.Length(min=1))
     conversation_id = fields.String(required=True, validate=validate.Length(min=1))
+    stream = fields.Boolean(load_default=False)
 
-chat_request_schema = ChatRequestSchema() 
\ No newline at end of file
+class PageRequestSchema(Schema):
+    """Schema for validating pagination query parameters."""
+    limit = fields.Integer(load_default=100, validate=validate.Range(min=1, max=500))
+    cursor = fields.String(load_default=None)
+
+class BlockRangeRequestSchema(Schema):
+    """Schema for validating block range query parameters."""
+    start = fields.Integer(required=True, data_key="from", validate=validate.Range(min=0))
+    end = fields.Integer(required=True, data_key="to", validate=validate.Range(min=0))
+    addresses = fields.Boolean(load_default=False)
+
+class BlockRequestSchema(Schema):
+    """Schema for validating block query parameters."""
+    addresses = fields.Boolean(load_default=False)
+
+chat_request_schema = ChatRequestSchema()
+page_request_schema = PageRequestSchema()
+block_range_request_schema = BlockRangeRequestSchema()
+block_request_schema = BlockRequestSchema()
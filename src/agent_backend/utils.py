@@ -1,7 +1,12 @@
 """Utility functions for the application."""
 
 import json
-from typing import List, Optional
+import os
+import threading
+from functools import lru_cache
+from typing import Callable, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
 
 def format_sse(content: str, event_type: str, functions: Optional[List[str]] = None) -> str:
     """Format a message for SSE transmission"""
@@ -12,4 +17,72 @@ def format_sse(content: str, event_type: str, functions: Optional[List[str]] = N
     if functions:
         data["functions"] = functions
     
-    return f"data: {json.dumps(data)}\n\n"
\ No newline at end of file
+    return f"data: {json.dumps(data)}\n\n"
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer from the environment, falling back to the default."""
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back to the default."""
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment, falling back to the default."""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    import tiktoken
+    from agent_backend.constants import AGENT_MODEL
+    try:
+        return tiktoken.encoding_for_model(AGENT_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str) -> int:
+    """Count model tokens in text, estimating at ~4 characters per token if tiktoken is unavailable."""
+    try:
+        return len(_token_encoding().encode(text))
+    except Exception:
+        return len(text) // 4 + 1
+
+class per_process(Generic[T]):
+    """
+    Lazily created, process-wide instance of `factory()`. Threads, connections and sessions do
+    not survive a fork, so a forked worker builds its own on first use instead of inheriting the
+    parent's. The lock is replaced in the child too, since a fork while another thread held it
+    would leave it locked forever. Use as a decorator on the factory; calling the result gets
+    the instance.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self.factory = factory
+        self.__doc__ = factory.__doc__
+        self._instance: Optional[T] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._instance = None
+        self._pid = None
+
+    def __call__(self) -> T:
+        with self._lock:
+            if self._instance is None or self._pid != os.getpid():
+                self._instance = self.factory()
+                self._pid = os.getpid()
+            return self._instance
+
+    def peek(self) -> Optional[T]:
+        """This process's instance if it has been created, without creating it."""
+        instance, pid = self._instance, self._pid
+        return instance if pid == os.getpid() else None
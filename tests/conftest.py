@@ -15,6 +15,9 @@ os.environ['CDP_API_KEY_NAME'] = 'test-key'
 os.environ['CDP_API_KEY_PRIVATE_KEY'] = 'test-private-key'
 os.environ['OPENAI_API_KEY'] = 'test-openai-key'
 
+# Tests stay offline: no background polling of the RPC node
+os.environ.setdefault('BLOCK_FOLLOWER_ENABLED', 'false')
+
 @pytest.fixture(scope='session')
 def test_db():
     """Create test database connection."""
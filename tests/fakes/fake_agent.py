@@ -0,0 +1,183 @@
+"""
+Offline stand-ins for the agent's external services: a scripted chat model in place of OpenAI
+and a wallet in place of the CDP SDK, wired into the same executor that production builds.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from cdp_langchain.utils import CdpAgentkitWrapper
+from langchain.agents import AgentExecutor
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, FunctionMessage, HumanMessage, ToolMessage
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agent_backend.agent.initialize_agent import create_agent_executor
+
+NETWORK_ID = "base-sepolia"
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that calls the tools in `plan` one step per turn, then answers with `reply`.
+    A step is one call, or a list of calls made together when bound with the tools API.
+    The turn is found from the tool results since the last human message, so concurrent
+    conversations each follow the script. Latencies simulate a remote model.
+    """
+
+    model_name: str = "scripted"
+    # Steps of {"name": tool name, "arguments": {...}}, or lists of them for parallel tool calls
+    plan: List[Union[Dict[str, Any], List[Dict[str, Any]]]] = []
+    reply: str = "Done."
+    first_token_latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[BaseTool], **kwargs: Any) -> Runnable[LanguageModelInput, BaseMessage]:
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _next_message(self, messages: List[BaseMessage], use_tools: bool) -> AIMessage:
+        results = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            results += isinstance(message, (FunctionMessage, ToolMessage))
+        step = 0
+        while step < len(self.plan) and results > 0:
+            results -= len(self.plan[step]) if isinstance(self.plan[step], list) else 1
+            step += 1
+        if step >= len(self.plan):
+            return AIMessage(content=self.reply)
+        calls = self.plan[step] if isinstance(self.plan[step], list) else [self.plan[step]]
+        if use_tools:
+            tool_calls = [
+                {"name": call["name"], "args": call.get("arguments", {}), "id": f"call_{step}_{i}"}
+                for i, call in enumerate(calls)
+            ]
+            return AIMessage(content="", tool_calls=tool_calls)
+        function_call = {"name": calls[0]["name"], "arguments": json.dumps(calls[0].get("arguments", {}))}
+        return AIMessage(content="", additional_kwargs={"function_call": function_call})
+
+    def _usage(self, messages: List[BaseMessage], completion: str) -> Dict[str, int]:
+        # Whitespace tokens are close enough for load shapes
+        prompt_tokens = sum(len(str(message.content).split()) for message in messages)
+        completion_tokens = len(completion.split())
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._next_message(messages, "tools" in kwargs)
+        time.sleep(self.first_token_latency + self.token_latency * len(message.content.split()))
+        message.usage_metadata = self._usage(messages, message.content)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._next_message(messages, "tools" in kwargs)
+        time.sleep(self.first_token_latency)
+        if message.tool_calls:
+            chunks = [
+                tool_call_chunk(name=call["name"], args=json.dumps(call["args"]), id=call["id"], index=i)
+                for i, call in enumerate(message.tool_calls)
+            ]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=chunks))
+        elif message.additional_kwargs:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", additional_kwargs=message.additional_kwargs))
+        else:
+            for i, word in enumerate(message.content.split()):
+                if i:
+                    time.sleep(self.token_latency)
+                token = f" {word}" if i else word
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+                if run_manager:
+                    run_manager.on_llm_new_token(token, chunk=chunk)
+                yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, message.content)))
+
+class FakeAddress:
+    def __init__(self, address_id: str, network_id: str) -> None:
+        self.address_id = address_id
+        self.network_id = network_id
+
+    def balance(self, asset_id: str) -> Decimal:
+        return Decimal("1.5")
+
+class FakeContract:
+    """A deployment that completes after `latency` seconds, like a mined transaction."""
+
+    def __init__(self, contract_address: str, latency: float) -> None:
+        self.contract_address = contract_address
+        self.latency = latency
+        self.transaction = SimpleNamespace(
+            transaction_link=f"https://sepolia.basescan.org/tx/0x{contract_address[2:].ljust(64, '0')}"
+        )
+
+    def wait(self) -> "FakeContract":
+        time.sleep(self.latency)
+        return self
+
+class FakeWallet:
+    """
+    The subset of cdp.Wallet that the agent's actions use. Every deployment gets a fresh contract
+    address (unique per process), so deployments produce real database writes.
+    """
+
+    def __init__(self, network_id: str = NETWORK_ID, latency: float = 0.0, seed_loaded: bool = True) -> None:
+        self.id = f"fake-wallet-{os.getpid()}"
+        self.seed_loaded = seed_loaded
+        self.network_id = network_id
+        self.latency = latency
+        self.default_address = FakeAddress(self._address("default"), network_id)
+        self.addresses = [self.default_address]
+        self._deployments = itertools.count()
+
+    @staticmethod
+    def _address(*parts: Any) -> str:
+        return "0x" + hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()[:40]
+
+    def _deploy(self, kind: str) -> FakeContract:
+        return FakeContract(self._address(kind, os.getpid(), next(self._deployments)), self.latency)
+
+    def deploy_token(self, name: str, symbol: str, total_supply: Any) -> FakeContract:
+        return self._deploy("token")
+
+    def deploy_nft(self, name: str, symbol: str, base_uri: str) -> FakeContract:
+        return self._deploy("nft")
+
+    @property
+    def can_sign(self) -> bool:
+        # A property on cdp.Wallet too
+        return self.seed_loaded
+
+def fake_agentkit(wallet: FakeWallet) -> CdpAgentkitWrapper:
+    """A CdpAgentkitWrapper around `wallet`, skipping the CDP SDK configuration its validator performs."""
+    return CdpAgentkitWrapper.model_construct(
+        wallet=wallet, network_id=wallet.network_id, cdp_api_key_name=None, cdp_api_key_private_key=None
+    )
+
+def create_fake_agent_executor(llm: ScriptedChatModel, wallet: Optional[FakeWallet] = None) -> AgentExecutor:
+    """The production agent executor over a scripted model and a fake wallet."""
+    return create_agent_executor(llm, fake_agentkit(wallet or FakeWallet()))
@@ -0,0 +1,110 @@
+"""
+The Flask app wired to a scripted model, a fake wallet and SQLite, for offline load tests.
+
+    PYTHONPATH=src:tests python -m fakes.fake_app --port 5101 --database-url sqlite:////tmp/bench.db
+"""
+
+import argparse
+import logging
+import os
+from typing import Optional
+
+from flask import Flask
+
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+
+logger = logging.getLogger(__name__)
+
+# Looks up the wallet, then deploys a token: two tool calls and a streamed answer per chat
+DEFAULT_PLAN = [
+    {"name": "get_wallet_details", "arguments": {}},
+    {"name": "deploy_token", "arguments": {"name": "Bench Token", "symbol": "BENCH", "total_supply": "1000000"}},
+]
+DEFAULT_REPLY = "I deployed the Bench Token (BENCH) with a total supply of 1,000,000 from your wallet."
+
+def create_fake_app(
+    database_url: str,
+    llm: Optional[ScriptedChatModel] = None,
+    wallet: Optional[FakeWallet] = None,
+    seed_addresses: int = 0,
+    rate_limits: bool = False,
+    cassette_path: Optional[str] = None,
+) -> Flask:
+    """
+    Import the web app against `database_url` and install a fake agent, ready to serve.
+    With `cassette_path`, the production agent replays a recorded session instead.
+    Settings are read from the environment once per process, so call this before anything
+    else imports agent_backend.index.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("EAGER_INIT", "false")
+    os.environ.setdefault("BLOCK_FOLLOWER_ENABLED", "false")
+    os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+    if cassette_path:
+        os.environ["CASSETTE_MODE"] = "replay"
+        os.environ["CASSETTE_PATH"] = cassette_path
+
+    from agent_backend import index
+    from agent_backend.agent.memory import ConversationMemory
+    from agent_backend.config import get_settings
+    from agent_backend.db.nfts import add_nft_records
+    from agent_backend.db.setup import setup_database
+    from agent_backend.db.tokens import add_token_records
+
+    setup_database()
+    if seed_addresses:
+        add_token_records([{"address": FakeWallet._address("seed-token", i)} for i in range(seed_addresses)])
+        add_nft_records([{"address": FakeWallet._address("seed-nft", i)} for i in range(seed_addresses)])
+
+    settings = get_settings()
+    index.db_initialized = True
+    if cassette_path:
+        from agent_backend.agent.initialize_agent import initialize_agent
+        index.agent_executor = initialize_agent()
+    else:
+        index.agent_executor = create_fake_agent_executor(
+            llm or ScriptedChatModel(plan=DEFAULT_PLAN, reply=DEFAULT_REPLY), wallet
+        )
+    index.conversation_memory = ConversationMemory(
+        settings.memory_token_budget, settings.memory_cache_size, cache_ttl=settings.memory_cache_ttl
+    )
+    # The default budgets would reject most of a load test
+    index.limiter.enabled = rate_limits
+    return index.app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5101)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--first-token-latency", type=float, default=0.3, help="Simulated seconds to first LLM token")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Simulated seconds per further token")
+    parser.add_argument("--cdp-latency", type=float, default=0.2, help="Simulated seconds per CDP deployment")
+    parser.add_argument("--seed-addresses", type=int, default=0, help="Tokens and NFTs to insert for the listings")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the configured rate limits")
+    parser.add_argument("--cassette", default=None, help="Replay this recorded session instead of the scripted model")
+    args = parser.parse_args()
+
+    llm = ScriptedChatModel(
+        plan=DEFAULT_PLAN,
+        reply=DEFAULT_REPLY,
+        first_token_latency=args.first_token_latency,
+        token_latency=args.token_latency,
+    )
+    app = create_fake_app(
+        args.database_url,
+        llm=llm,
+        wallet=FakeWallet(latency=args.cdp_latency),
+        seed_addresses=args.seed_addresses,
+        rate_limits=args.rate_limits,
+        cassette_path=args.cassette,
+    )
+
+    from werkzeug.serving import run_simple
+    # The app configures INFO logging on import; per-request logs would swamp the load test
+    for name in ("", "werkzeug"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    run_simple(args.host, args.port, app, threaded=True)
+
+if __name__ == "__main__":
+    main()
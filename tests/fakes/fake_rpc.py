@@ -0,0 +1,168 @@
+"""
+Local stand-in for a Base Sepolia JSON-RPC node with a deterministic synthetic chain.
+
+    PYTHONPATH=src:tests python -m fakes.fake_rpc --port 8545 --latency 0.05
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHAIN_ID = 84532  # Base Sepolia
+GENESIS_TIMESTAMP = 1_700_000_000
+BLOCK_TIME = 2
+
+def _hex_hash(*parts: Any) -> str:
+    return "0x" + hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()
+
+def _address(index: int) -> str:
+    return "0x" + hashlib.sha256(f"address:{index}".encode()).hexdigest()[:40]
+
+def make_block(number: int, transactions_per_block: int = 20) -> Dict[str, Any]:
+    """The synthetic block at `number`, in eth_getBlockByNumber format with full transactions."""
+    transactions = []
+    for i in range(transactions_per_block):
+        seed = number * 7919 + i
+        tx = {
+            "hash": _hex_hash("tx", number, i),
+            "from": _address(seed % 50),
+            "to": _address(seed % 37 + 50) if seed % 11 else None,
+            "value": hex((seed % 1000) * 10 ** 15),
+            "gas": hex(21_000 + seed % 5 * 10_000),
+            "blockNumber": hex(number),
+            "transactionIndex": hex(i),
+        }
+        # Mix legacy and dynamic-fee transactions without a gasPrice
+        if seed % 3:
+            tx["gasPrice"] = hex(1_000_000 + seed % 100 * 10_000)
+        transactions.append(tx)
+    return {
+        "number": hex(number),
+        "hash": _hex_hash("block", number),
+        "parentHash": _hex_hash("block", number - 1),
+        "timestamp": hex(GENESIS_TIMESTAMP + number * BLOCK_TIME),
+        "transactions": transactions,
+    }
+
+class FakeRpcServer:
+    """
+    Threaded JSON-RPC server on 127.0.0.1 that answers single and batch requests.
+
+    latency adds a fixed delay per HTTP request; fail_first makes the first N HTTP
+    requests return fail_status, to exercise client retries.
+    """
+
+    def __init__(
+        self,
+        head: int = 1_000,
+        transactions_per_block: int = 20,
+        latency: float = 0.0,
+        fail_first: int = 0,
+        fail_status: int = 503,
+        port: int = 0,
+    ) -> None:
+        self.head = head
+        self.transactions_per_block = transactions_per_block
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.requests: List[Any] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeRpcServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-rpc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeRpcServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one JSON-RPC call."""
+        method, params = request.get("method"), request.get("params") or []
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+        if method == "eth_blockNumber":
+            response["result"] = hex(self.head)
+        elif method == "eth_chainId":
+            response["result"] = hex(CHAIN_ID)
+        elif method == "eth_getBalance":
+            response["result"] = hex(int(_hex_hash("balance", params[0]), 16) % 10 ** 18)
+        elif method == "eth_getBlockByNumber":
+            tag = params[0]
+            number = self.head if tag in ("latest", "safe", "finalized", "pending") else int(tag, 16)
+            response["result"] = make_block(number, self.transactions_per_block) if 0 <= number <= self.head else None
+        else:
+            response["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+        return response
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with server._lock:
+                    server.requests.append(body)
+                    fail = len(server.requests) <= server.fail_first
+                if server.latency:
+                    time.sleep(server.latency)
+                if fail:
+                    self._send(server.fail_status, {"error": "unavailable"})
+                    return
+                result = [server.handle(call) for call in body] if isinstance(body, list) else server.handle(body)
+                self._send(200, result)
+
+            def _send(self, status: int, payload: Any) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(format % args)
+
+        return Handler
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--head", type=int, default=1_000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per HTTP request")
+    parser.add_argument("--transactions", type=int, default=20, help="Transactions per block")
+    args = parser.parse_args()
+
+    server = FakeRpcServer(head=args.head, transactions_per_block=args.transactions, latency=args.latency, port=args.port)
+    print(f"Fake JSON-RPC node listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
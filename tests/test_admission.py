@@ -0,0 +1,100 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from agent_backend import index
+from agent_backend.admission import AdmissionController
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+
+def test_queued_request_gets_the_next_free_slot():
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5.0)
+    assert admission.try_acquire()
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(admission.try_acquire()))
+    waiter.start()
+    while admission.get_stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+
+    # Slot taken and queue full: turned away without waiting
+    assert not admission.try_acquire()
+    admission.release()
+    waiter.join(timeout=5)
+    assert admitted == [True]
+    stats = admission.get_stats()
+    assert (stats["running"], stats["queue_depth"], stats["admitted"], stats["rejected_queue_full"]) == (1, 0, 2, 1)
+
+def test_queued_request_times_out():
+    admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.01)
+    assert admission.try_acquire()
+    assert not admission.try_acquire()
+    assert admission.get_stats()["rejected_timeout"] == 1
+    assert 1 <= admission.retry_after() <= 60
+
+def test_chat_overflow_is_rejected_with_retry_after(monkeypatch):
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.0)
+    monkeypatch.setattr(index, "get_admission_controller", lambda: admission)
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", create_fake_agent_executor(ScriptedChatModel(reply="Hello there.", token_latency=0.5), FakeWallet()))
+    monkeypatch.setattr(index, "conversation_memory", SimpleNamespace(load=lambda conversation_id: [], append_turn=lambda *turn: None))
+    monkeypatch.setattr(index.limiter, "enabled", False)
+    client = index.app.test_client()
+    chat = {"input": "Deploy a token called Bench", "conversation_id": "c1"}
+
+    with client.post("/api/chat", json={**chat, "stream": True}) as streaming:
+        # The run behind the open stream holds the only slot
+        with client.post("/api/chat", json=chat) as rejected:
+            assert rejected.status_code == 429
+            assert int(rejected.headers["Retry-After"]) >= 1
+        streaming.get_data()
+    assert admission.get_stats()["running"] == 0
+
+    with client.post("/api/chat", json=chat) as response:
+        assert response.get_json() == {"response": "Hello there."}
+    assert admission.get_stats()["running"] == 0
+    assert client.get("/livez").status_code == 200
+
+def test_disconnected_stream_holds_its_slot_until_the_run_ends(monkeypatch):
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.0)
+    llm = ScriptedChatModel(reply="one two three four five six", token_latency=0.2)
+    monkeypatch.setattr(index, "get_admission_controller", lambda: admission)
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", create_fake_agent_executor(llm, FakeWallet()))
+    monkeypatch.setattr(index, "conversation_memory", SimpleNamespace(load=lambda conversation_id: [], append_turn=lambda *turn: None))
+    monkeypatch.setattr(index.limiter, "enabled", False)
+    client = index.app.test_client()
+    chat = {"input": "Tell me a story", "conversation_id": "c1", "stream": True}
+
+    response = client.post("/api/chat", json=chat, buffered=False)
+    next(iter(response.response))
+    response.close()  # the client goes away mid-stream
+
+    runs = [thread for thread in threading.enumerate() if thread.name == "agent-stream"]
+    assert any(thread.is_alive() for thread in runs)
+    assert admission.get_stats()["running"] == 1
+    with client.post("/api/chat", json=chat) as rejected:
+        assert rejected.status_code == 429
+
+    for thread in runs:
+        thread.join(timeout=10)
+    assert admission.get_stats()["running"] == 0
+
+def test_routed_lookups_have_their_own_bound(monkeypatch):
+    lookups = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.0, pool="lookup")
+    monkeypatch.setattr(index, "get_lookup_admission_controller", lambda: lookups)
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", create_fake_agent_executor(ScriptedChatModel(reply="From the agent."), FakeWallet()))
+    monkeypatch.setattr(index, "conversation_memory", SimpleNamespace(load=lambda conversation_id: [], append_turn=lambda *turn: None))
+    monkeypatch.setattr(index.limiter, "enabled", False)
+    client = index.app.test_client()
+
+    with lookups.admitted():
+        with client.post("/api/chat", json={"input": "What's my address?", "conversation_id": "c1"}) as rejected:
+            assert rejected.status_code == 429 and rejected.headers["Retry-After"] == "1"
+        # Messages for the agent do not take lookup slots
+        with client.post("/api/chat", json={"input": "Tell me a story", "conversation_id": "c1"}) as response:
+            assert response.get_json() == {"response": "From the agent."}
+
+    with client.post("/api/chat", json={"input": "What's my address?", "conversation_id": "c1"}) as response:
+        assert response.get_json()["response"].startswith("Your wallet address is")
+    stats = lookups.get_stats()
+    assert (stats["admitted"], stats["rejected_queue_full"], stats["running"]) == (2, 1, 0)
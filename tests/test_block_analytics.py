@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+import pytest
+
+from agent_backend.agent.custom_actions import block_analytics
+from agent_backend.agent.custom_actions.block_analytics import columnar_block_from_rpc, summarize_block, summarize_blocks
+
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+CAROL = "0x" + "c" * 40
+
+def tx(sender, receiver, value_eth, gas_price_gwei=1, gas=21000):
+    return {
+        "from": sender,
+        "to": receiver,
+        "value": hex(int(Decimal(value_eth) * 10 ** 18)),
+        "gas": hex(gas),
+        "gasPrice": hex(int(gas_price_gwei * 10 ** 9)) if gas_price_gwei is not None else None,
+    }
+
+def rpc_block(number, transactions):
+    return {"number": hex(number), "timestamp": hex(1700000000 + number), "hash": "0x" + f"{number:064x}", "transactions": transactions}
+
+@pytest.fixture
+def blocks():
+    return [
+        columnar_block_from_rpc(rpc_block(10, [
+            tx(ALICE, BOB, "1.5", gas_price_gwei=2),
+            tx(ALICE, None, "0", gas_price_gwei=3, gas=500000),
+            tx(BOB, CAROL, "0.25", gas_price_gwei=None),
+        ])),
+        columnar_block_from_rpc(rpc_block(11, [
+            tx(CAROL, ALICE, "3", gas_price_gwei=4),
+            tx(ALICE, BOB, "0.5", gas_price_gwei=1),
+        ])),
+    ]
+
+def checksum(address):
+    from web3 import Web3
+    return Web3.to_checksum_address(address)
+
+def test_single_block_summary(blocks):
+    summary = summarize_block(blocks[0])
+    assert summary["block_number"] == 10
+    assert summary["transactions_count"] == 3
+    assert summary["total_value_transferred"] == pytest.approx(1.75)
+    assert summary["contract_creations"] == 1
+    assert summary["total_gas"] == 542000
+    assert summary["address_summary"]["unique_senders"] == [checksum(ALICE), checksum(BOB)]
+    assert summary["address_summary"]["unique_receivers"] == [checksum(BOB), checksum(CAROL)]
+    assert summary["address_summary"]["total_unique_addresses"] == 3
+
+def test_single_block_summary_is_cached_but_not_shared(blocks):
+    summary = summarize_block(blocks[0])
+    hits = block_analytics._block_summary.cache_info().hits
+    summary["address_summary"]["unique_senders"].clear()
+    summary["transactions_count"] = 0
+
+    again = summarize_block(blocks[0])
+    assert again["transactions_count"] == 3
+    assert again["address_summary"]["unique_senders"] == [checksum(ALICE), checksum(BOB)]
+    assert block_analytics._block_summary.cache_info().hits == hits + 1
+
+def test_window_summary(blocks):
+    summary = summarize_blocks(blocks, top_n=2)
+    assert (summary["first_block"], summary["last_block"], summary["blocks_count"]) == (10, 11, 2)
+    assert summary["transactions_count"] == 5
+    assert summary["total_value_transferred"] == pytest.approx(5.25)
+    assert summary["gas_price_gwei"]["p50"] == pytest.approx(2.5)
+    assert summary["top_senders"] == [
+        {"address": checksum(CAROL), "value_eth": pytest.approx(3.0), "transactions": 1},
+        {"address": checksum(ALICE), "value_eth": pytest.approx(2.0), "transactions": 3},
+    ]
+    assert summary["top_receivers"][0] == {"address": checksum(ALICE), "value_eth": pytest.approx(3.0), "transactions": 1}
+    assert summary["top_receivers"][1]["address"] == checksum(BOB)
+
+def test_empty_window():
+    summary = summarize_blocks([])
+    assert summary["transactions_count"] == 0
+    assert summary["top_senders"] == []
+    assert summary["gas_price_gwei"] == {"p50": None, "p90": None, "p99": None}
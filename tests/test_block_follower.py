@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from agent_backend.agent.custom_actions import get_latest_block as latest_block
+from agent_backend.agent.custom_actions.block_follower import BlockFollower
+
+class FakeChain:
+    def __init__(self, head):
+        self.head = head
+        self.fetched = []
+
+    def fetch(self, number):
+        self.fetched.append(number)
+        return SimpleNamespace(number=number)
+
+def make_follower(chain, buffer_size=4):
+    return BlockFollower(get_head=lambda: chain.head, fetch_block=chain.fetch, buffer_size=buffer_size, poll_interval=0.01)
+
+def test_first_sync_fetches_only_head():
+    chain = FakeChain(head=100)
+    follower = make_follower(chain)
+    follower.poll_once()
+    assert chain.fetched == [100]
+    assert follower.latest(max_staleness=5).number == 100
+
+def test_new_heads_fill_ring_buffer():
+    """Missed blocks are fetched, and only the last N are kept."""
+    chain = FakeChain(head=100)
+    follower = make_follower(chain, buffer_size=4)
+    follower.poll_once()
+    chain.head = 106
+    follower.poll_once()
+
+    assert chain.fetched == [100, 103, 104, 105, 106]
+    assert [b.number for b in follower.recent()] == [103, 104, 105, 106]
+    assert follower.get(104).number == 104
+    assert follower.get(100) is None
+
+    follower.poll_once()
+    assert chain.fetched[-1] == 106
+
+def test_stale_head_is_not_served():
+    chain = FakeChain(head=100)
+    follower = make_follower(chain)
+    assert follower.latest(max_staleness=5) is None
+    follower.poll_once()
+    assert follower.latest(max_staleness=-1) is None
+
+def test_background_thread_follows_head():
+    chain = FakeChain(head=7)
+    follower = make_follower(chain)
+    follower.start()
+    try:
+        for _ in range(200):
+            if follower.latest(max_staleness=5):
+                break
+            follower._stop.wait(0.01)
+        assert follower.latest(max_staleness=5).number == 7
+    finally:
+        follower.stop()
+
+def test_get_latest_block_falls_back_when_follower_lags(monkeypatch):
+    chain = FakeChain(head=50)
+    follower = make_follower(chain)
+    monkeypatch.setattr(latest_block, "get_block_follower", lambda: follower)
+    monkeypatch.setattr(latest_block, "get_settings", lambda: SimpleNamespace(block_max_staleness=5))
+    monkeypatch.setattr(latest_block, "fetch_block", lambda identifier: SimpleNamespace(number=51))
+    monkeypatch.setattr(latest_block, "summarize_block", lambda block: {"block_number": block.number})
+
+    # Nothing buffered yet, so the block comes from a direct fetch and seeds the buffer
+    assert latest_block.get_latest_block() == {"block_number": 51}
+    assert [b.number for b in follower.recent()] == [51]
+
+    chain.head = 52
+    follower.poll_once()
+    assert latest_block.get_latest_block() == {"block_number": 52}
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agent_backend.agent.custom_actions import block_range
+from agent_backend.agent.custom_actions.block_analytics import columnar_block_from_rpc
+from agent_backend.agent.custom_actions.block_range import BlockNotFoundError, JsonRpcBatchClient
+from fakes.fake_rpc import FakeRpcServer, make_block
+
+@pytest.fixture
+def rpc():
+    with FakeRpcServer(head=500, transactions_per_block=5) as server:
+        yield server
+
+def test_blocks_are_fetched_in_concurrent_batches(rpc):
+    client = JsonRpcBatchClient(rpc.url, batch_size=4, max_concurrency=2)
+    blocks = client.get_blocks(range(490, 500))
+
+    assert [block.number for block in blocks] == list(range(490, 500))
+    # 10 calls in batches of 4 -> three HTTP requests
+    assert sorted(len(request) for request in rpc.requests) == [2, 4, 4]
+    assert client.stats["calls"] == 10
+
+def test_retryable_status_is_retried(rpc):
+    rpc.fail_first = 2
+    client = JsonRpcBatchClient(rpc.url, max_retries=3, backoff=0.001)
+    assert client.get_block_number() == 500
+    assert client.stats["retries"] == 2
+
+def test_retries_are_bounded(rpc):
+    rpc.fail_first = 10
+    client = JsonRpcBatchClient(rpc.url, max_retries=1, backoff=0.001)
+    with pytest.raises(Exception, match="503"):
+        client.get_block_number()
+    assert len(rpc.requests) == 2
+
+def test_missing_blocks_raise(rpc):
+    client = JsonRpcBatchClient(rpc.url)
+    with pytest.raises(BlockNotFoundError, match="501") as raised:
+        client.get_blocks([500, 501])
+    assert raised.value.missing == [501]
+
+def test_range_uses_follower_buffer(rpc, monkeypatch):
+    client = JsonRpcBatchClient(rpc.url, batch_size=10)
+    buffered = [columnar_block_from_rpc(make_block(n, 5)) for n in (498, 499, 500)]
+    monkeypatch.setattr(block_range, "get_settings", lambda: SimpleNamespace(block_range_limit=20, block_max_staleness=5))
+    monkeypatch.setattr(block_range, "get_rpc_client", lambda: client)
+    monkeypatch.setattr(block_range, "get_block_follower", lambda: SimpleNamespace(recent=lambda: buffered))
+
+    blocks = block_range.fetch_block_range(495, 500)
+
+    assert [block.number for block in blocks] == list(range(495, 501))
+    assert blocks[-1] is buffered[-1]
+    assert [call["params"][0] for call in rpc.requests[0]] == [hex(n) for n in (495, 496, 497)]
+
+def test_range_limit_is_enforced(monkeypatch):
+    monkeypatch.setattr(block_range, "get_settings", lambda: SimpleNamespace(block_range_limit=5))
+    with pytest.raises(ValueError, match="exceeds the limit"):
+        block_range.fetch_block_range(1, 10)
+
+def test_get_recent_blocks_summarizes_window(rpc, monkeypatch):
+    client = JsonRpcBatchClient(rpc.url)
+    monkeypatch.setattr(block_range, "get_settings", lambda: SimpleNamespace(block_range_limit=20, block_max_staleness=5))
+    monkeypatch.setattr(block_range, "get_rpc_client", lambda: client)
+    monkeypatch.setattr(block_range, "get_block_follower", lambda: None)
+
+    summary = block_range.get_recent_blocks(count=3)
+
+    assert (summary["first_block"], summary["last_block"], summary["blocks_count"]) == (498, 500, 3)
+    assert summary["transactions_count"] == 15
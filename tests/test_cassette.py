@@ -0,0 +1,82 @@
+import json
+import time
+
+import httpx
+import openai
+import pytest
+from langchain_openai import ChatOpenAI
+
+from agent_backend.agent.custom_actions.block_range import JsonRpcBatchClient
+from agent_backend.cassette import RECORD, REPLAY, Cassette, CassetteMissError, CassetteTransport
+from fakes.fake_rpc import FakeRpcServer
+
+def chunk(delta, finish_reason=None):
+    return {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+SSE_BODY = "".join(
+    f"data: {json.dumps(event)}\n\n"
+    for event in (chunk({"role": "assistant", "content": "Hello"}), chunk({"content": " there"}), chunk({}, "stop"))
+) + "data: [DONE]\n\n"
+
+def test_json_rpc_batches_replay_offline_with_fresh_ids(tmp_path):
+    path = str(tmp_path / "rpc.json.gz")
+    recording = Cassette(path, RECORD)
+    with FakeRpcServer(head=300, transactions_per_block=3) as server:
+        client = JsonRpcBatchClient(server.url, batch_size=2)
+        recording.mount(client.session)
+        recorded = client.get_blocks([298, 299, 300])
+    recording.save()
+
+    replay = Cassette(path, REPLAY, latency_scale=0)
+    # The server is gone, and this client numbers its requests differently
+    client = JsonRpcBatchClient(server.url, batch_size=2)
+    replay.mount(client.session)
+    next(client._ids)
+    assert [block.number for block in client.get_blocks([298, 299, 300])] == [block.number for block in recorded]
+    assert replay.stats == {"recorded": 0, "replayed": 2, "misses": 0}
+
+def test_openai_stream_replays_through_chat_model(tmp_path):
+    path = str(tmp_path / "openai.json.gz")
+    served = []
+
+    def openai_api(request):
+        served.append(request)
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=SSE_BODY.encode())
+
+    recording = Cassette(path, RECORD)
+    client = httpx.Client(transport=CassetteTransport(recording, httpx.MockTransport(openai_api)))
+    llm = ChatOpenAI(model="gpt-4o-mini", api_key="test", streaming=True, http_client=client)
+    assert llm.invoke("hi").content == "Hello there"
+    recording.save()
+
+    replay = Cassette(path, REPLAY, latency=0.05)
+    llm = ChatOpenAI(model="gpt-4o-mini", api_key="test", streaming=True, max_retries=0, http_client=replay.httpx_client())
+    started = time.perf_counter()
+    tokens = [message.content for message in llm.stream("hi")]
+    assert "".join(tokens) == "Hello there"
+    assert time.perf_counter() - started >= 0.05
+    assert len(served) == 1
+
+    # The OpenAI SDK reports transport failures as connection errors
+    with pytest.raises(openai.APIConnectionError) as excinfo:
+        llm.invoke("something else")
+    assert isinstance(excinfo.value.__cause__, CassetteMissError)
+
+def test_cdp_actions_replay_without_wallet(tmp_path):
+    path = str(tmp_path / "cdp.json.gz")
+    calls = []
+
+    def deploy_token(wallet, name: str, symbol: str) -> str:
+        calls.append(wallet)
+        return f"Deployed {name} ({symbol}) from {wallet}"
+
+    recording = Cassette(path, RECORD)
+    assert recording.wrap_action(deploy_token)("wallet-1", name="Bench", symbol="BEN") == "Deployed Bench (BEN) from wallet-1"
+    recording.save()
+
+    replay = Cassette(path, REPLAY, latency_scale=0).wrap_action(deploy_token)
+    assert replay(None, name="Bench", symbol="BEN") == "Deployed Bench (BEN) from wallet-1"
+    assert calls == ["wallet-1"]
+    with pytest.raises(CassetteMissError):
+        replay(None, name="Other", symbol="OTH")
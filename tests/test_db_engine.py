@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+
+from agent_backend.db import setup as db_setup
+from agent_backend.db.setup import get_engine, get_pool_stats, dispose_engines
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    yield f"sqlite:///{tmp_path / 'engine.db'}"
+    dispose_engines()
+
+def test_engine_is_reused(sqlite_url):
+    """Repeated calls share one engine and pool."""
+    assert get_engine(sqlite_url) is get_engine(sqlite_url)
+
+def test_pool_stats(sqlite_url):
+    """Pool statistics report checkouts and wait time."""
+    engine = get_engine(sqlite_url)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = get_pool_stats()[sqlite_url]
+        assert stats["checked_out"] == 1
+
+    stats = get_pool_stats()[sqlite_url]
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] >= 1
+    assert stats["wait_seconds_max"] >= 0
+
+def test_pool_reset_after_fork(sqlite_url):
+    """The after-fork hook gives the child a fresh pool but keeps the engine."""
+    engine = get_engine(sqlite_url)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    pool = engine.pool
+
+    db_setup._reset_engines_after_fork()
+
+    assert get_engine(sqlite_url) is engine
+    assert engine.pool is not pool
+    assert engine.pool.wait_stats is pool.wait_stats
@@ -0,0 +1,54 @@
+import json
+from types import SimpleNamespace
+
+from langchain_core.messages import HumanMessage
+
+from agent_backend import index
+from agent_backend.agent import handle_agent_action
+from agent_backend.agent.run_agent import run_agent
+from agent_backend.constants import DEPLOY_TOKEN, EVENT_TYPE_AGENT, EVENT_TYPE_TOOLS
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+
+PLAN = [
+    {"name": "get_wallet_details", "arguments": {}},
+    {"name": DEPLOY_TOKEN, "arguments": {"name": "Bench", "symbol": "BEN", "total_supply": "1000"}},
+]
+
+def test_scripted_agent_runs_cdp_actions_against_fake_wallet():
+    wallet = FakeWallet()
+    executor = create_fake_agent_executor(ScriptedChatModel(plan=PLAN, reply="All done."), wallet)
+    executor.return_intermediate_steps = True
+
+    result = executor.invoke({"messages": [HumanMessage(content="deploy a token")]})
+
+    assert result["output"] == "All done."
+    steps = result["intermediate_steps"]
+    assert [action.tool for action, _ in steps] == ["get_wallet_details", DEPLOY_TOKEN]
+    assert wallet.default_address.address_id in steps[0][1]
+    assert "Deployed ERC20 token contract Bench (BEN)" in steps[1][1]
+
+def test_scripted_agent_streams_tokens_and_deployments(monkeypatch):
+    published = []
+    outbox = SimpleNamespace(publish=lambda action, address: published.append((action, address)))
+    monkeypatch.setattr(handle_agent_action, "get_outbox", lambda: outbox)
+    executor = create_fake_agent_executor(ScriptedChatModel(plan=PLAN, reply="Deployed it for you."))
+
+    events = [json.loads(frame[len("data: "):]) for frame in run_agent("deploy a token", executor)]
+
+    tools = [event for event in events if event["type"] == EVENT_TYPE_TOOLS]
+    assert [event["functions"] for event in tools] == [["get_wallet_details"], [DEPLOY_TOKEN]]
+    assert "".join(event["content"] for event in events if event["type"] == EVENT_TYPE_AGENT) == "Deployed it for you."
+    assert len(published) == 1 and published[0][0] == DEPLOY_TOKEN
+
+def test_plain_json_chat_records_deployments(monkeypatch):
+    published = []
+    outbox = SimpleNamespace(publish=lambda action, address: published.append((action, address)))
+    monkeypatch.setattr(handle_agent_action, "get_outbox", lambda: outbox)
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", create_fake_agent_executor(ScriptedChatModel(plan=PLAN, reply="Done.")))
+    monkeypatch.setattr(index, "conversation_memory", SimpleNamespace(load=lambda conversation_id: [], append_turn=lambda *turn: None))
+    monkeypatch.setattr(index.limiter, "enabled", False)
+
+    with index.app.test_client().post("/api/chat", json={"input": "deploy a token", "conversation_id": "c1"}) as response:
+        assert response.get_json() == {"response": "Done."}
+    assert len(published) == 1 and published[0][0] == DEPLOY_TOKEN
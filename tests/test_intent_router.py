@@ -0,0 +1,77 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agent_backend import index
+from agent_backend.agent.intent_router import IntentRouter, classify
+from agent_backend.constants import EVENT_TYPE_AGENT, EVENT_TYPE_COMPLETED, EVENT_TYPE_TOOLS
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+
+ADDRESS = "0x" + "aB" * 20
+
+@pytest.mark.parametrize("text, intent", [
+    ("What’s my wallet address?", "wallet_address"),
+    ("please show me my wallet details", "wallet_address"),
+    ("my USDC balance", "wallet_balance"),
+    (f"Balance of {ADDRESS}", "address_balance"),
+    ("what is the latest block number?", "latest_block"),
+    ("List my tokens", "list_tokens"),
+    ("what nfts have you deployed", "list_nfts"),
+    # Anything more than the bare query goes to the agent
+    ("what's my address and deploy a token called Bench", None),
+    ("tell me something interesting about the latest block", None),
+    ("send 0.1 eth to my address", None),
+])
+def test_rules_match_whole_messages_only(text, intent):
+    classified = classify(text)
+    assert (classified[0] if classified else None) == intent
+
+def test_chat_answers_structured_query_without_the_llm(monkeypatch):
+    wallet = FakeWallet()
+    llm = ScriptedChatModel(reply="from the model")
+    turns = []
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", create_fake_agent_executor(llm, wallet))
+    monkeypatch.setattr(index, "conversation_memory", SimpleNamespace(
+        load=lambda conversation_id: [], append_turn=lambda *turn: turns.append(turn)))
+    monkeypatch.setattr(index.limiter, "enabled", False)
+    client = index.app.test_client()
+
+    with client.post("/api/chat", json={"input": "What's my address?", "conversation_id": "c1", "stream": True}) as response:
+        events = [json.loads(frame[len("data: "):]) for frame in response.get_data(as_text=True).split("\n\n") if frame]
+
+    answer = f"Your wallet address is {wallet.default_address.address_id} on base-sepolia."
+    assert [event["type"] for event in events] == [EVENT_TYPE_TOOLS, EVENT_TYPE_AGENT, EVENT_TYPE_COMPLETED]
+    assert events[0]["functions"] == ["get_wallet_details"] and events[1]["content"] == answer
+    assert turns == [("c1", "What's my address?", answer)]
+
+    # Not a bare query: the agent (here, the scripted model) answers
+    with client.post("/api/chat", json={"input": "what's my address, and is it funded?", "conversation_id": "c1"}) as response:
+        assert response.get_json() == {"response": "from the model"}
+
+def test_failed_lookup_falls_back_and_is_counted():
+    router = IntentRouter()
+    broken = SimpleNamespace(name="get_balance", run=lambda arguments: "Error getting balance for all addresses")
+    executor = SimpleNamespace(tools=[broken])
+
+    assert router.route("my eth balance", executor) is None
+    assert router.route("hello there", executor) is None
+    stats = router.get_stats()
+    assert (stats["hits"], stats["fallbacks"], stats["hit_rate"]) == (0, 2, 0.0)
+
+def test_address_balance_uses_the_checksum_address():
+    from agent_backend.agent.custom_actions.address_balance import checksum_address
+
+    calls = []
+
+    def run(arguments):
+        calls.append(arguments)
+        return {"address": arguments["address"], "balance_wei": "10", "balance_eth": "0.00000000000000001"}
+
+    executor = SimpleNamespace(tools=[SimpleNamespace(name="get_address_balance", run=run)])
+    routed = IntentRouter().route(f"Balance of {ADDRESS.lower()}?", executor)
+
+    address = checksum_address(ADDRESS)
+    assert calls == [{"address": address}]
+    assert routed.answer == f"The balance of {address} is 0.00000000000000001 ETH."
@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+AGENT_STACK = ("langchain", "langchain_core", "langchain_openai", "cdp", "cdp_langchain", "web3")
+
+def test_web_app_imports_without_agent_stack():
+    """Cheap endpoints must be able to serve before the agent stack is loaded."""
+    code = (
+        "import sys, agent_backend.index as index\n"
+        "assert index.app.test_client().get('/livez').status_code == 200\n"
+        f"print(' '.join(m for m in {AGENT_STACK!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert result.stdout.split() == []
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+
+from agent_backend import index
+from agent_backend.db import setup as db_setup, tokens
+from agent_backend.db.setup import get_engine
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setattr(db_setup, "get_database_url", lambda: url)
+    with get_engine(url).connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE tokens (
+                address VARCHAR(42) PRIMARY KEY,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        # Several rows share a timestamp, so the cursor must break ties on address
+        for i in range(5):
+            conn.execute(
+                text("INSERT INTO tokens (address, created_at) VALUES (:address, :created_at)"),
+                {"address": f"0x{i}", "created_at": f"2024-01-01 10:00:0{i // 2}"}
+            )
+        conn.commit()
+    tokens.token_listing.invalidate()
+    index.limiter.enabled = False
+    yield index.app.test_client()
+    index.limiter.enabled = True
+    tokens.token_listing.invalidate()
+
+def test_cursor_pagination_walks_table_in_order(client):
+    seen, cursor = [], None
+    while True:
+        body = client.get("/tokens", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})}).get_json()
+        seen.extend(body["tokens"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"0x{i}" for i in range(5)]
+
+def test_unchanged_page_is_not_modified(client):
+    first = client.get("/tokens")
+    assert first.status_code == 200
+    assert first.headers["Last-Modified"] == "Mon, 01 Jan 2024 10:00:02 GMT"
+
+    again = client.get("/tokens", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert tokens.token_listing.stats["hits"] >= 1
+
+def test_local_write_invalidates_cache(client):
+    etag = client.get("/tokens").headers["ETag"]
+    tokens.add_token("0x9")
+
+    response = client.get("/tokens", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["tokens"][-1] == "0x9"
+
+def test_bad_parameters_are_rejected(client):
+    assert client.get("/tokens", query_string={"limit": 0}).status_code == 400
+    assert client.get("/tokens", query_string={"cursor": "not-a-cursor"}).status_code == 400
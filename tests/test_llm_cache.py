@@ -0,0 +1,75 @@
+import json
+import warnings
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from sqlalchemy import text
+
+from agent_backend.agent.llm_cache import LLMResponseCache, MemoryCacheTier, SQLCacheTier
+from agent_backend.db.setup import dispose_engines
+
+@pytest.fixture
+def sql_tier(tmp_path):
+    yield SQLCacheTier(f"sqlite:///{tmp_path / 'llm_cache.db'}")
+    dispose_engines()
+
+def fake_model(cache, *responses):
+    return GenericFakeChatModel(messages=iter(responses), cache=cache)
+
+def test_repeated_prompt_is_served_from_cache(sql_tier):
+    """Prompts differing only in whitespace share one LLM call."""
+    cache = LLMResponseCache([MemoryCacheTier(8), sql_tier], ttl=60)
+    model = fake_model(cache, AIMessage(content="I can deploy tokens."))
+
+    assert model.invoke([HumanMessage(content="what can you do?")]).content == "I can deploy tokens."
+    # The fake model has no responses left, so this must come from the cache
+    assert model.invoke([HumanMessage(content="  what can   you do? ")]).content == "I can deploy tokens."
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["tier_hits"] == {"MemoryCacheTier": 1, "SQLCacheTier": 0}
+
+def test_persistent_tier_survives_restart(sql_tier):
+    """A new process (fresh memory tier) hits the SQL tier and promotes the entry."""
+    fake_model(LLMResponseCache([MemoryCacheTier(8), sql_tier], ttl=60), AIMessage(content="0xabc")).invoke("my address?")
+
+    cache = LLMResponseCache([MemoryCacheTier(8), sql_tier], ttl=60)
+    assert fake_model(cache).invoke("my address?").content == "0xabc"
+    assert fake_model(cache).invoke("my address?").content == "0xabc"
+    assert cache.get_stats()["tier_hits"] == {"MemoryCacheTier": 1, "SQLCacheTier": 1}
+
+def test_persistent_tier_stores_plain_data(sql_tier):
+    """Rows hold plain message dicts, and tool calls survive the round trip."""
+    calls = [{"name": "get_balance", "args": {"asset_id": "eth"}, "id": "call_1"}]
+    fake_model(LLMResponseCache([sql_tier], ttl=60), AIMessage(content="", tool_calls=calls)).invoke("balance?")
+
+    with sql_tier._engine().connect() as conn:
+        stored = json.loads(conn.execute(text("SELECT generations FROM llm_cache")).scalar())
+    assert "lc" not in stored[0] and stored[0]["message"]["type"] in ("ai", "AIMessageChunk")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        message = fake_model(LLMResponseCache([sql_tier], ttl=60)).invoke("balance?")
+    assert [(call["name"], call["args"]) for call in message.tool_calls] == [("get_balance", {"asset_id": "eth"})]
+
+def test_state_changing_calls_are_not_cached():
+    """A turn that calls deploy_token must reach the model every time."""
+    cache = LLMResponseCache([MemoryCacheTier(8)], ttl=60)
+    deploy = AIMessage(content="", additional_kwargs={"function_call": {"name": "deploy_token", "arguments": "{}"}})
+    model = fake_model(cache, deploy, deploy)
+
+    model.invoke("deploy PAPA")
+    model.invoke("deploy PAPA")
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 0 and stats["bypassed"] == 2
+
+def test_expired_entries_miss():
+    """Entries past their TTL are not served."""
+    cache = LLMResponseCache([MemoryCacheTier(8)], ttl=0)
+    model = fake_model(cache, AIMessage(content="first"), AIMessage(content="second"))
+
+    assert model.invoke("hello").content == "first"
+    assert model.invoke("hello").content == "second"
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from agent_backend.agent import memory as memory_module
+from agent_backend.agent.memory import ConversationMemory
+from agent_backend.db import conversations
+from agent_backend.db.setup import get_engine, dispose_engines
+
+@pytest.fixture
+def conversations_db(tmp_path, monkeypatch):
+    engine = get_engine(f"sqlite:///{tmp_path / 'memory.db'}")
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE conversations (
+                conversation_id VARCHAR(255) PRIMARY KEY,
+                summary TEXT NOT NULL DEFAULT '',
+                messages TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 1,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.commit()
+    monkeypatch.setattr(conversations, "get_engine", lambda: engine)
+    yield engine
+    dispose_engines()
+
+def test_turns_are_remembered(conversations_db):
+    """Prior turns are returned for the messages placeholder."""
+    memory = ConversationMemory(token_budget=1000, cache_size=8)
+    assert memory.load("c1") == []
+
+    memory.append_turn("c1", "hello", "hi there").result()
+    memory.append_turn("c1", "my name is Ada", "nice to meet you").result()
+
+    history = memory.load("c1")
+    assert [(m.type, m.content) for m in history] == [
+        ("human", "hello"), ("ai", "hi there"),
+        ("human", "my name is Ada"), ("ai", "nice to meet you"),
+    ]
+
+def test_history_is_trimmed_into_summary(conversations_db):
+    """Old turns are summarized once the token budget is exceeded."""
+    summarized = []
+
+    def summarizer(summary, messages):
+        summarized.extend(m.content for m in messages)
+        return "earlier: " + ", ".join(m.content for m in messages)
+
+    memory = ConversationMemory(token_budget=60, cache_size=8, summarizer=summarizer)
+    for i in range(6):
+        memory.append_turn("c1", f"question {i} " * 3, f"answer {i} " * 3).result()
+
+    history = memory.load("c1")
+    assert history[0].type == "system" and history[0].content.startswith("Summary of the earlier conversation: earlier:")
+    assert history[-1].content == "answer 5 " * 3
+    assert summarized[:2] == ["question 0 " * 3, "answer 0 " * 3]
+    assert len(history) < 12
+
+def test_cache_sees_writes_from_other_workers(conversations_db):
+    """A turn saved by another process replaces this process's copy once its TTL is up."""
+    worker_a = ConversationMemory(token_budget=1000, cache_size=8)
+    worker_b = ConversationMemory(token_budget=1000, cache_size=8, cache_ttl=0)
+
+    worker_a.append_turn("c1", "one", "1").result()
+    assert len(worker_b.load("c1")) == 2
+    worker_b.append_turn("c1", "two", "2").result()
+    worker_a.append_turn("c1", "three", "3").result()
+
+    assert [m.content for m in worker_b.load("c1")] == ["one", "1", "two", "2", "three", "3"]
+
+def test_cached_conversation_is_loaded_without_a_query(conversations_db, monkeypatch):
+    """Within the TTL a cached conversation, including this worker's own saves, is trusted."""
+    memory = ConversationMemory(token_budget=1000, cache_size=8)
+    memory.append_turn("c1", "hello", "hi there").result()
+
+    def no_queries(conversation_id):
+        raise AssertionError("queried the database")
+
+    monkeypatch.setattr(memory_module, "get_conversation_version", no_queries)
+    monkeypatch.setattr(memory_module, "get_conversation", no_queries)
+    assert [m.content for m in memory.load("c1")] == ["hello", "hi there"]
+
+def test_load_includes_turns_waiting_to_be_saved(conversations_db, monkeypatch):
+    """A quick follow-up message sees the previous turn before the writer has saved it."""
+    memory = ConversationMemory(token_budget=1000, cache_size=8)
+    memory.append_turn("c1", "hello", "hi there").result()
+    release = threading.Event()
+    save = memory_module.save_conversation
+
+    def slow_save(*args):
+        release.wait(5)
+        return save(*args)
+
+    monkeypatch.setattr(memory_module, "save_conversation", slow_save)
+    saved = memory.append_turn("c1", "my name is Ada", "nice to meet you")
+
+    assert [m.content for m in memory.load("c1")] == ["hello", "hi there", "my name is Ada", "nice to meet you"]
+    release.set()
+    saved.result()
+    assert [m.content for m in memory.load("c1")] == ["hello", "hi there", "my name is Ada", "nice to meet you"]
@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from sqlalchemy import text
+
+from agent_backend import index, metrics
+from agent_backend.agent import run_agent as run_agent_module
+from agent_backend.agent.metrics_callback import MetricsCallbackHandler
+from agent_backend.db.setup import get_engine
+from agent_backend.metrics import CallbackGauge, Counter, Histogram, MetricsRegistry, flatten_stats
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("demo_seconds", "Demo.", ["stage"], buckets=(0.1, 1.0)))
+    errors = registry.register(Counter("demo_errors_total", "Demo errors.", ["stage"]))
+    histogram.observe(0.05, stage="llm")
+    histogram.observe(0.5, stage="llm")
+    histogram.observe(5, stage="llm")
+    errors.inc(stage='say "hi"')
+
+    rendered = registry.render()
+
+    assert "# TYPE demo_seconds histogram" in rendered
+    assert 'demo_seconds_bucket{stage="llm",le="0.1"} 1' in rendered
+    assert 'demo_seconds_bucket{stage="llm",le="1"} 2' in rendered
+    assert 'demo_seconds_bucket{stage="llm",le="+Inf"} 3' in rendered
+    assert 'demo_seconds_sum{stage="llm"} 5.55' in rendered
+    assert 'demo_seconds_count{stage="llm"} 3' in rendered
+    assert 'demo_errors_total{stage="say \\"hi\\""} 1' in rendered
+
+def test_callback_gauge_reads_stats_when_rendered():
+    registry = MetricsRegistry()
+    gauge = registry.register(CallbackGauge("demo_stats", "Demo.", ["component", "stat"]))
+    stats = {"hits": 1, "tiers": {"memory": 2}, "pool": "agent", "retry_after": None}
+    gauge.add_callback(lambda: {("cache", stat): value for stat, value in flatten_stats(stats).items()})
+    gauge.add_callback(lambda: 1 / 0)
+
+    rendered = registry.render()
+    stats["hits"] = 5
+
+    assert 'demo_stats{component="cache",stat="hits"} 1' in rendered
+    assert 'demo_stats{component="cache",stat="tiers_memory"} 2' in rendered
+    assert "pool" not in rendered and "retry_after" not in rendered
+    assert 'demo_stats{component="cache",stat="hits"} 5' in registry.render()
+
+def test_callback_handler_records_llm_and_tool_stages():
+    handler = MetricsCallbackHandler()
+    model, tool = "test-model-metrics", "deploy_token_metrics"
+    llm_run, tool_run, failed_run = uuid4(), uuid4(), uuid4()
+    ttft_before = metrics.LLM_TIME_TO_FIRST_TOKEN.count(model=model)
+
+    handler.on_chat_model_start({}, [[]], run_id=llm_run, invocation_params={"model_name": model})
+    handler.on_llm_new_token("Hel", run_id=llm_run)
+    handler.on_llm_new_token("lo", run_id=llm_run)
+    message = AIMessage(content="Hello", usage_metadata={"input_tokens": 120, "output_tokens": 2, "total_tokens": 122})
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=llm_run)
+
+    handler.on_tool_start({"name": tool}, "{}", run_id=tool_run)
+    handler.on_tool_end("ok", run_id=tool_run)
+    handler.on_tool_start({"name": tool}, "{}", run_id=failed_run)
+    handler.on_tool_error(RuntimeError("boom"), run_id=failed_run)
+
+    assert metrics.LLM_TIME_TO_FIRST_TOKEN.count(model=model) == ttft_before + 1
+    assert metrics.LLM_LATENCY.count(model=model) >= 1
+    assert metrics.LLM_PROMPT_TOKENS.count(model=model) >= 1
+    assert metrics.TOOL_LATENCY.count(tool=tool) == 2
+    assert metrics.TOOL_ERRORS.value(tool=tool) == 1
+
+def test_engine_records_query_latency(tmp_path):
+    before = metrics.DB_QUERY_LATENCY.count(operation="SELECT")
+    with get_engine(f"sqlite:///{tmp_path / 'metrics.db'}").connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert metrics.DB_QUERY_LATENCY.count(operation="SELECT") == before + 1
+
+def test_metrics_endpoint_counts_streams_in_flight(monkeypatch):
+    seen_in_flight = []
+
+    def fake_run_agent(input, agent_executor, config=None, history=None, on_complete=None, on_finish=None):
+        seen_in_flight.append(metrics.HTTP_IN_FLIGHT.value(endpoint="chat"))
+        yield "data: hi\n\n"
+        if on_finish:
+            on_finish()
+
+    monkeypatch.setattr(run_agent_module, "run_agent", fake_run_agent)
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", object())
+    monkeypatch.setattr(index, "conversation_memory", SimpleNamespace(load=lambda conversation_id: []))
+    monkeypatch.setattr(index.limiter, "enabled", False)
+    completed_before = metrics.HTTP_LATENCY.count(endpoint="chat")
+
+    client = index.app.test_client()
+    # WSGI servers close the response after sending the last frame
+    with client.post("/api/chat", json={"input": "hi", "conversation_id": "c1", "stream": True}) as response:
+        assert response.get_data(as_text=True) == "data: hi\n\n"
+
+    assert seen_in_flight == [1]
+    assert metrics.HTTP_IN_FLIGHT.value(endpoint="chat") == 0
+    assert metrics.HTTP_LATENCY.count(endpoint="chat") == completed_before + 1
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert "# TYPE http_request_duration_seconds histogram" in response.get_data(as_text=True)
+    assert 'agent_component_stats{component="chat_admission",stat="max_concurrent"}' in response.get_data(as_text=True)
+
+def test_shared_model_counts_each_llm_call_once():
+    from langchain_core.messages import HumanMessage
+    from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+
+    llm = ScriptedChatModel(reply="Hello.")
+    create_fake_agent_executor(llm, FakeWallet())
+    executor = create_fake_agent_executor(llm, FakeWallet())
+    before = metrics.LLM_LATENCY.count(model=llm.model_name)
+
+    executor.invoke({"messages": [HumanMessage(content="hi")]})
+
+    assert not llm.callbacks
+    assert metrics.LLM_LATENCY.count(model=llm.model_name) == before + 1
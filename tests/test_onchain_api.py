@@ -0,0 +1,88 @@
+import pytest
+
+from agent_backend import index, onchain
+from agent_backend.agent.custom_actions import address_balance, block_range, get_latest_block as latest_block
+from agent_backend.agent.custom_actions.block_range import JsonRpcBatchClient
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+from fakes.fake_rpc import FakeRpcServer
+
+@pytest.fixture
+def client(monkeypatch):
+    from web3 import Web3
+    with FakeRpcServer(head=500, transactions_per_block=5) as rpc:
+        w3 = Web3(Web3.HTTPProvider(rpc.url))
+        monkeypatch.setattr(latest_block, "get_web3", lambda: w3)
+        monkeypatch.setattr(address_balance, "get_web3", lambda: w3)
+        monkeypatch.setattr(block_range, "get_rpc_client", lambda: JsonRpcBatchClient(rpc.url))
+        monkeypatch.setattr(index.limiter, "enabled", False)
+        onchain._settled_range_summary.cache_clear()
+        yield index.app.test_client()
+
+def test_latest_block_is_compact_and_revalidates(client):
+    response = client.get("/api/block/latest")
+    body = response.get_json()
+    assert response.status_code == 200 and body["block_number"] == 500
+    assert body["address_summary"] == {"total_unique_addresses": body["address_summary"]["total_unique_addresses"]}
+    assert response.cache_control.no_cache
+
+    assert client.get("/api/block/latest", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    full = client.get("/api/block/latest", query_string={"addresses": "true"}).get_json()
+    assert "unique_senders" in full["address_summary"]
+
+def test_settled_block_ranges_are_immutable(client):
+    # 300 confirmations below the head of 500
+    response = client.get("/api/blocks", query_string={"from": 198, "to": 200})
+    assert response.status_code == 200
+    assert (response.get_json()["first_block"], response.get_json()["last_block"]) == (198, 200)
+    assert response.cache_control.immutable and response.cache_control.max_age == 31536000
+    full = client.get("/api/blocks", query_string={"from": 198, "to": 200, "addresses": "true"}).get_json()
+    assert "unique_senders" in full["address_summary"]
+    assert "unique_senders" not in onchain._settled_range_summary(198, 200)["address_summary"]
+
+    # Still within reach of a reorg
+    recent = client.get("/api/blocks", query_string={"from": 497, "to": 499})
+    assert recent.status_code == 200 and recent.cache_control.no_cache
+
+    assert client.get("/api/blocks", query_string={"from": 499, "to": 501}).status_code == 400
+    assert client.get("/api/blocks", query_string={"from": 499, "to": 498}).status_code == 400
+    assert client.get("/api/blocks", query_string={"from": 499}).status_code == 400
+
+def test_blocks_the_node_does_not_have_are_not_found(client, monkeypatch):
+    # The follower's head can run ahead of the node that serves the range
+    monkeypatch.setattr(onchain, "chain_head", lambda: 600)
+    response = client.get("/api/blocks", query_string={"from": 499, "to": 501})
+    assert response.status_code == 404 and "501" in response.get_json()["error"]
+
+def test_balance_of_any_address(client):
+    address = "0x" + "12" * 20
+    body = client.get(f"/api/balance/{address}").get_json()
+    assert body["address"] == address and int(body["balance_wei"]) > 0
+    assert client.get("/api/balance/0x1234").status_code == 400
+
+def test_wallet_comes_from_the_agent(client, monkeypatch):
+    wallet = FakeWallet()
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", create_fake_agent_executor(ScriptedChatModel(), wallet))
+    monkeypatch.setattr(index, "conversation_memory", object())
+
+    body = client.get("/api/wallet").get_json()
+
+    assert body == {
+        "wallet_id": wallet.id,
+        "network_id": "base-sepolia",
+        "default_address": wallet.default_address.address_id,
+        "addresses": [wallet.default_address.address_id],
+    }
+
+def test_wallet_errors_are_bad_gateway(client, monkeypatch):
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", object())
+    monkeypatch.setattr(index, "conversation_memory", object())
+
+    def unreachable(agent_executor):
+        raise ConnectionError("CDP is unreachable")
+
+    monkeypatch.setattr(onchain, "wallet_details", unreachable)
+    response = client.get("/api/wallet")
+
+    assert response.status_code == 502 and response.get_json() == {"error": "CDP is unreachable"}
@@ -0,0 +1,129 @@
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from agent_backend.agent.outbox import ActionOutbox
+from agent_backend.db import tokens
+from agent_backend.db import setup as db_setup
+from agent_backend.db.setup import get_engine
+
+class RecordingHandler:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def __call__(self, payloads):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(payloads))
+
+def test_flush_delivers_one_batch_per_kind(tmp_path):
+    token, nft = RecordingHandler(), RecordingHandler()
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"), {"token": token, "nft": nft})
+    for address in ("0xa", "0xb", "0xc"):
+        outbox.publish("token", address)
+    outbox.publish("nft", "0xd")
+
+    assert outbox.flush() == 4
+    assert token.batches == [["0xa", "0xb", "0xc"]]
+    assert nft.batches == [["0xd"]]
+    assert outbox.pending() == 0
+
+def test_failed_kind_stays_journaled_across_restart(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    token, nft = RecordingHandler(fail=True), RecordingHandler()
+    outbox = ActionOutbox(path, {"token": token, "nft": nft})
+    outbox.publish("token", "0xa")
+    outbox.publish("nft", "0xd")
+
+    with pytest.raises(RuntimeError):
+        outbox.flush()
+    assert nft.batches == [["0xd"]]
+    assert outbox.pending() == 1
+
+    # A new process picks up what the last one could not deliver
+    token = RecordingHandler()
+    restarted = ActionOutbox(path, {"token": token, "nft": nft})
+    assert restarted.flush() == 1
+    assert token.batches == [["0xa"]]
+
+def test_workers_sharing_a_journal_deliver_each_event_once(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    delivered, lock = [], threading.Lock()
+
+    def handler(payloads):
+        with lock:
+            delivered.extend(payloads)
+
+    workers = [ActionOutbox(path, {"token": handler}, batch_size=7) for _ in range(4)]
+    for i in range(200):
+        workers[i % 4].publish("token", f"0x{i}")
+
+    def drain(outbox):
+        while outbox.flush():
+            pass
+
+    threads = [threading.Thread(target=drain, args=(outbox,)) for outbox in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(delivered) == sorted(f"0x{i}" for i in range(200))
+    assert workers[0].pending() == 0
+
+def test_claims_of_a_dead_worker_are_taken_over(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    token = RecordingHandler()
+    outbox = ActionOutbox(path, {"token": token}, claim_timeout=60)
+    outbox.publish("token", "0xa")
+    # Claimed by a worker that died before delivering
+    outbox._claim()
+
+    assert outbox.flush() == 0
+    assert ActionOutbox(path, {"token": token}, claim_timeout=0).flush() == 1
+    assert token.batches == [["0xa"]]
+
+def test_journal_from_before_claims_is_upgraded(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.execute("INSERT INTO outbox (kind, payload, created_at) VALUES ('token', '0xa', 0)")
+    conn.commit()
+    conn.close()
+
+    token = RecordingHandler()
+    assert ActionOutbox(path, {"token": token}).flush() == 1
+    assert token.batches == [["0xa"]]
+
+def test_unknown_kind_is_rejected(tmp_path):
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"), {"token": RecordingHandler()})
+    with pytest.raises(ValueError):
+        outbox.publish("wallet", "0xa")
+
+def test_worker_delivers_in_background(tmp_path):
+    token = RecordingHandler()
+    outbox = ActionOutbox(str(tmp_path / "outbox.db"), {"token": token}, flush_interval=0.01)
+    outbox.start()
+    try:
+        outbox.publish("token", "0xa")
+        for _ in range(200):
+            if token.batches:
+                break
+            outbox._stop.wait(0.01)
+    finally:
+        outbox.stop()
+    assert token.batches == [["0xa"]]
+
+def test_add_tokens_is_one_idempotent_upsert(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setattr(db_setup, "get_database_url", lambda: url)
+    with get_engine(url).connect() as conn:
+        conn.execute(text("CREATE TABLE tokens (address VARCHAR(42) PRIMARY KEY, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"))
+        conn.commit()
+
+    tokens.add_tokens(["0xa", "0xb", "0xa"])
+    tokens.add_tokens(["0xb", "0xc"])
+    assert sorted(tokens.get_tokens()) == ["0xa", "0xb", "0xc"]
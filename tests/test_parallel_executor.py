@@ -0,0 +1,95 @@
+import asyncio
+import inspect
+import threading
+import time
+
+from langchain.agents import AgentExecutor
+
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
+from langchain.agents.output_parsers.tools import ToolsAgentOutputParser
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+
+from agent_backend.agent.parallel_executor import ParallelAgentExecutor
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+
+def slow_tool(name, spans, delay=0.1):
+    lock = threading.Lock()
+
+    def run(label: str) -> str:
+        started = time.perf_counter()
+        time.sleep(delay)
+        with lock:
+            spans.append((label, started, time.perf_counter()))
+        return f"{name}:{label}"
+    return StructuredTool.from_function(run, name=name, description=f"The {name} tool")
+
+def build_executor(plan, tools, read_only):
+    llm = ScriptedChatModel(plan=plan, reply="Done.")
+    prompt = ChatPromptTemplate.from_messages([
+        MessagesPlaceholder(variable_name="messages"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+    agent = (
+        {
+            "messages": lambda x: x["messages"],
+            "agent_scratchpad": lambda x: format_to_tool_messages(x.get("intermediate_steps", [])),
+        }
+        | prompt
+        | llm.bind_tools(tools)
+        | ToolsAgentOutputParser()
+    )
+    return ParallelAgentExecutor(
+        agent=agent, tools=tools, read_only_tools=frozenset(read_only), return_intermediate_steps=True
+    )
+
+MIXED_PLAN = [[
+    {"name": "read", "arguments": {"label": "r1"}},
+    {"name": "read", "arguments": {"label": "r2"}},
+    {"name": "write", "arguments": {"label": "w"}},
+    {"name": "read", "arguments": {"label": "r3"}},
+]]
+
+def assert_scheduled(result, spans):
+    assert result["output"] == "Done."
+    assert [observation for _, observation in result["intermediate_steps"]] == ["read:r1", "read:r2", "write:w", "read:r3"]
+    span = {label: (start, end) for label, start, end in spans}
+    # The first two reads overlap; the write waits for both and finishes before the last read
+    assert span["r1"][0] < span["r2"][1] and span["r2"][0] < span["r1"][1]
+    assert span["w"][0] >= max(span["r1"][1], span["r2"][1])
+    assert span["r3"][0] >= span["w"][1]
+
+def test_read_only_calls_overlap_and_state_changes_run_alone():
+    spans = []
+    executor = build_executor(MIXED_PLAN, [slow_tool("read", spans), slow_tool("write", spans)], read_only={"read"})
+    assert_scheduled(executor.invoke({"messages": [HumanMessage(content="go")]}), spans)
+
+def test_async_runs_are_scheduled_the_same_way():
+    spans = []
+    executor = build_executor(MIXED_PLAN, [slow_tool("read", spans), slow_tool("write", spans)], read_only={"read"})
+    assert_scheduled(asyncio.run(executor.ainvoke({"messages": [HumanMessage(content="go")]})), spans)
+
+def test_overridden_hooks_match_the_installed_langchain():
+    # These are private AgentExecutor methods; an upgrade that renames or reshapes them must fail here
+    for name in ("_perform_agent_action", "_iter_next_step", "_aperform_agent_action", "_aiter_next_step"):
+        assert list(inspect.signature(getattr(ParallelAgentExecutor, name)).parameters) == list(
+            inspect.signature(getattr(AgentExecutor, name)).parameters
+        ), name
+
+def test_parallel_cdp_reads_in_one_turn():
+    plan = [
+        [{"name": "get_wallet_details", "arguments": {}}, {"name": "get_balance", "arguments": {"asset_id": "eth"}}],
+        {"name": "deploy_token", "arguments": {"name": "Bench", "symbol": "BEN", "total_supply": "1000"}},
+    ]
+    wallet = FakeWallet()
+    executor = create_fake_agent_executor(ScriptedChatModel(plan=plan, reply="All done."), wallet)
+    executor.return_intermediate_steps = True
+
+    result = executor.invoke({"messages": [HumanMessage(content="check and deploy")]})
+
+    steps = result["intermediate_steps"]
+    assert [action.tool for action, _ in steps] == ["get_wallet_details", "get_balance", "deploy_token"]
+    assert wallet.default_address.address_id in steps[0][1]
+    assert "1.5" in steps[1][1]
+    assert "Deployed ERC20 token contract Bench (BEN)" in steps[2][1]
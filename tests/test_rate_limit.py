@@ -0,0 +1,65 @@
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from agent_backend.db.rate_limit import LeasedSQLStorage
+
+def make_worker(tmp_path, lease_size=3):
+    return storage_from_string(f"db+sqlite:///{tmp_path / 'limits.db'}", lease_size=lease_size)
+
+def test_scheme_is_registered(tmp_path):
+    assert isinstance(make_worker(tmp_path), LeasedSQLStorage)
+
+def test_limit_is_shared_across_workers(tmp_path):
+    workers = [make_worker(tmp_path), make_worker(tmp_path)]
+    limiters = [FixedWindowRateLimiter(worker) for worker in workers]
+    limit = parse("10/minute")
+
+    allowed = sum(limiters[i % 2].hit(limit, "client") for i in range(40))
+
+    # Never more than the limit in total; at most lease_size - 1 hits stranded in the other worker's lease
+    assert 8 <= allowed <= 10
+    # Hits are served from leases: one database round trip per lease, not per request
+    assert sum(worker.stats["leases"] for worker in workers) < sum(worker.stats["hits"] for worker in workers) / 2
+
+def test_clear_and_forked_child_drop_leases(tmp_path):
+    worker = make_worker(tmp_path)
+    limiter = FixedWindowRateLimiter(worker)
+    limit = parse("2/minute")
+    assert limiter.hit(limit, "client") and limiter.hit(limit, "client")
+    assert not limiter.hit(limit, "client")
+
+    worker.clear(limit.key_for("client"))
+    assert limiter.hit(limit, "client")
+
+    # A forked child must not reuse hits leased by its parent
+    worker._leases_pid = -1
+    assert worker.get(limit.key_for("client")) == 3
+    assert worker.incr(limit.key_for("client"), 60) == 4
+
+def test_reservation_in_flight_does_not_block_other_keys(tmp_path):
+    import threading
+
+    worker = make_worker(tmp_path)
+    worker.incr("warm", 60)  # creates the table
+    reserve, unblock = worker._reserve, threading.Event()
+
+    def slow_reserve(key, *args):
+        if key == "slow":
+            unblock.wait(5)
+        return reserve(key, *args)
+
+    worker._reserve = slow_reserve
+    results = []
+    slow = [threading.Thread(target=lambda: results.append(worker.incr("slow", 60))) for _ in range(2)]
+    for thread in slow:
+        thread.start()
+
+    assert worker.incr("fast", 60) == 1
+    assert not unblock.is_set()
+    unblock.set()
+    for thread in slow:
+        thread.join(5)
+    # Both hits on the slow key came out of one lease
+    assert sorted(results) == [1, 2]
+    assert worker.stats["leases"] == 3
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agent_backend import index
+from agent_backend.health import HealthMonitor
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(index, "db_initialized", False)
+    monkeypatch.setattr(index, "agent_executor", None)
+    monkeypatch.setattr(index, "conversation_memory", None)
+    return index.app.test_client()
+
+def test_livez_does_not_depend_on_initialization(client):
+    assert client.get("/livez").status_code == 200
+
+def test_readyz_reports_warming_worker(client, monkeypatch):
+    assert client.get("/readyz").status_code == 503
+
+    monkeypatch.setattr(index, "db_initialized", True)
+    monkeypatch.setattr(index, "agent_executor", object())
+    monkeypatch.setattr(index, "conversation_memory", object())
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "ready"
+
+def test_chat_never_initializes_inline_in_eager_mode(client, monkeypatch):
+    started = []
+    monkeypatch.setattr(index, "get_settings", lambda: SimpleNamespace(eager_init=True))
+    monkeypatch.setattr(index, "init_app", lambda: pytest.fail("initialized on the request path"))
+    monkeypatch.setattr(index, "init_app_in_background", lambda: started.append(True))
+
+    response = client.post("/api/chat", json={"input": "hi", "conversation_id": "c1"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert started == [True]
+
+def test_health_reads_cached_snapshot(client, monkeypatch):
+    calls = []
+    monitor = HealthMonitor({"database": lambda: calls.append(1) or "connected", "agent": index.check_agent}, interval=60)
+    monkeypatch.setattr(index, "get_health_monitor", lambda: monitor)
+
+    assert client.get("/health").get_json()["status"] == "unknown"
+    monitor.run_checks()
+    for _ in range(3):
+        body = client.get("/health").get_json()
+    assert calls == [1]
+    assert body["status"] == "unhealthy"
+    assert body["database"] == "connected"
+    assert body["checks"]["agent"]["detail"] == "failed: not initialized"
+
+def test_stale_snapshot_is_reported():
+    monitor = HealthMonitor({"database": lambda: "connected"}, interval=0.01)
+    monitor.run_checks()
+    monitor._checked_at -= 1
+    assert monitor.snapshot()["status"] == "stale"
+
+def test_wallet_check_reports_missing_seed(monkeypatch):
+    from fakes.fake_agent import FakeWallet, fake_agentkit
+
+    def executor(wallet):
+        return SimpleNamespace(tools=[SimpleNamespace(cdp_agentkit_wrapper=fake_agentkit(wallet))])
+
+    monkeypatch.setattr(index, "agent_executor", executor(FakeWallet()))
+    assert index.check_wallet_signing().startswith("can sign as 0x")
+
+    monkeypatch.setattr(index, "agent_executor", executor(FakeWallet(seed_loaded=False)))
+    with pytest.raises(RuntimeError, match="no seed loaded"):
+        index.check_wallet_signing()
+
+def test_metrics_does_not_start_the_outbox(client, monkeypatch):
+    from agent_backend.agent import outbox
+
+    monkeypatch.setattr(outbox.get_outbox, "_instance", None)
+    monkeypatch.setattr(outbox.get_outbox, "_pid", None)
+
+    assert 'component="outbox"' not in client.get("/metrics").get_data(as_text=True)
+    assert outbox.peek_outbox() is None
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql
+
+from agent_backend.db import setup as db_setup, tokens
+from agent_backend.db.setup import get_engine, setup_database
+from agent_backend.db.wallet import get_wallet_info, save_wallet_info, wallet_info_repository
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setattr(db_setup, "get_database_url", lambda: url)
+    setup_database()
+    return url
+
+def test_postgres_statements_are_native_upserts():
+    sql = str(wallet_info_repository.statement("postgresql").compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (wallet_id) DO UPDATE SET info = excluded.info" in sql
+    assert "validation_count = (wallet_info.validation_count + " in sql
+
+    sql = str(tokens.token_repository.statement("postgresql").compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (address) DO NOTHING" in sql
+
+def test_save_wallet_info_upserts_in_one_statement(database):
+    save_wallet_info("wallet-1", {"network_id": "base-sepolia"})
+    save_wallet_info("wallet-1", {"network_id": "base-sepolia", "default_address": "0xabc"})
+
+    info = get_wallet_info("wallet-1")
+    assert info["default_address"] == "0xabc"
+    assert info["validation_count"] == 2
+    assert get_wallet_info("missing") is None
+
+def test_backfill_is_batched_and_idempotent(database):
+    rows = [{"address": f"0x{i:040x}", "name": f"Token {i}", "symbol": f"T{i}"} for i in range(2500)]
+    statements = []
+    engine = get_engine(database)
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert tokens.add_token_records(rows + rows[:10]) == 2500
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # Far fewer statements than rows; SQLAlchemy pages each batch into multi-row INSERTs
+    assert len([s for s in statements if s.startswith("INSERT")]) < 50
+    tokens.add_tokens([rows[0]["address"], "0x" + "f" * 40])
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM tokens")).scalar() == 2501
+        assert conn.execute(text("SELECT name FROM tokens WHERE address = :a"), {"a": rows[0]["address"]}).scalar() == "Token 0"
@@ -0,0 +1,71 @@
+import json
+import threading
+import uuid
+
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.messages import AIMessage
+
+from agent_backend.agent.run_agent import run_agent
+from agent_backend.constants import EVENT_TYPE_AGENT, EVENT_TYPE_COMPLETED, EVENT_TYPE_TOOLS, EVENT_TYPE_ERROR
+
+def parse(frame):
+    assert frame.startswith("data: ") and frame.endswith("\n\n")
+    return json.loads(frame[len("data: "):])
+
+class ScriptedExecutor:
+    """Executor stand-in that drives the callbacks the way AgentExecutor does."""
+
+    def __init__(self, release=None, error=None):
+        self.release = release
+        self.error = error
+
+    def invoke(self, inputs, config):
+        handler = config["callbacks"][-1]
+        first, second = uuid.uuid4(), uuid.uuid4()
+        handler.on_llm_new_token("Checking", run_id=first)
+        if self.release:
+            assert self.release.wait(5)
+        handler.on_llm_new_token("", run_id=first)
+        handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=AIMessage(content="Checking"))]]), run_id=first)
+        handler.on_tool_end("Balance: 1 ETH", name="get_balance")
+        if self.error:
+            raise self.error
+        handler.on_llm_new_token(" done", run_id=second)
+        handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=AIMessage(content=" done"))]]), run_id=second)
+        return {"output": "Checking done"}
+
+def test_streams_tokens_before_agent_finishes():
+    """The first token reaches the client while the agent is still running."""
+    release = threading.Event()
+    stream = run_agent("balance?", ScriptedExecutor(release=release), {})
+
+    first = parse(next(stream))
+    assert first == {"type": EVENT_TYPE_AGENT, "content": "Checking"}
+
+    release.set()
+    events = [parse(frame) for frame in stream]
+    assert events == [
+        {"type": EVENT_TYPE_TOOLS, "content": "Balance: 1 ETH", "functions": ["get_balance"]},
+        {"type": EVENT_TYPE_AGENT, "content": " done"},
+        {"type": EVENT_TYPE_COMPLETED, "content": ""},
+    ]
+
+def test_agent_error_is_streamed():
+    """Errors become an error frame and the stream still completes."""
+    events = [parse(frame) for frame in run_agent("hi", ScriptedExecutor(error=RuntimeError("boom")), None)]
+    assert events[-2] == {"type": EVENT_TYPE_ERROR, "content": "Error: boom"}
+    assert events[-1]["type"] == EVENT_TYPE_COMPLETED
+
+def test_cached_response_is_streamed_whole():
+    """A response served from the LLM cache (no token callbacks) is sent as one frame."""
+    class CachedExecutor:
+        def invoke(self, inputs, config):
+            handler = config["callbacks"][-1]
+            handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=AIMessage(content="I can deploy tokens."))]]), run_id=uuid.uuid4())
+            return {"output": "I can deploy tokens."}
+
+    events = [parse(frame) for frame in run_agent("what can you do?", CachedExecutor())]
+    assert events == [
+        {"type": EVENT_TYPE_AGENT, "content": "I can deploy tokens."},
+        {"type": EVENT_TYPE_COMPLETED, "content": ""},
+    ]
@@ -0,0 +1,65 @@
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cdp import Wallet
+
+from agent_backend.agent.single_flight import SingleFlight, call_key
+from agent_backend.metrics import TOOL_CALLS_COALESCED
+
+def test_concurrent_identical_calls_share_one_execution():
+    group = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def get_balance(wallet: Wallet, asset_id: str) -> str:
+        calls.append(asset_id)
+        release.wait(5)
+        return f"{asset_id}: 1.5"
+
+    wrapped = group.wrap("get_balance", get_balance)
+    # CdpAgentkitWrapper only passes the wallet when the signature asks for it
+    assert next(iter(inspect.signature(wrapped).parameters.values())).annotation is Wallet
+    before = TOOL_CALLS_COALESCED.value(tool="get_balance")
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(wrapped, None, asset_id="eth") for _ in range(4)]
+        other = pool.submit(wrapped, None, asset_id="usdc")
+        while group.get_stats()["calls"] < 5:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ["eth: 1.5"] * 4 and other.result() == "usdc: 1.5"
+    assert sorted(calls) == ["eth", "usdc"]
+    assert group.get_stats() == {"calls": 5, "executed": 2, "coalesced": 3, "in_flight": 0, "coalesced_rate": 0.6}
+    assert TOOL_CALLS_COALESCED.value(tool="get_balance") - before == 3
+
+    # Finished calls are not cached
+    wrapped(None, asset_id="eth")
+    assert calls.count("eth") == 2
+
+def test_waiting_callers_get_the_leaders_error():
+    group = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.2)
+        raise ConnectionError("node down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(group.do, "key", fail)
+        started.wait(5)
+        follower = pool.submit(group.do, "key", fail)
+        for future in (leader, follower):
+            with pytest.raises(ConnectionError):
+                future.result()
+    assert group.get_stats()["executed"] == 1
+
+def test_call_key_ignores_argument_order_and_unset_arguments():
+    assert call_key("get_recent_blocks", {"count": 10, "cursor": None}) == call_key("get_recent_blocks", {"count": 10})
+    assert call_key("get_balance", {"a": 1, "b": 2}) == call_key("get_balance", {"b": 2, "a": 1})
+    assert call_key("get_balance", {"asset_id": "eth"}) != call_key("get_balance_nft", {"asset_id": "eth"})
@@ -0,0 +1,74 @@
+import pytest
+
+from agent_backend.agent.tool_cache import ToolResultCache
+
+class Chain:
+    def __init__(self, head=100):
+        self.head = head
+
+def counting(calls):
+    def get_balance(wallet, asset_id: str) -> str:
+        calls.append(asset_id)
+        return f"Balance of {asset_id}: {len(calls)}"
+    return get_balance
+
+def test_results_are_served_until_the_head_advances():
+    chain, calls = Chain(), []
+    cache = ToolResultCache(lambda: chain.head, max_bytes=10_000)
+    get_balance = cache.wrap("get_balance", counting(calls))
+
+    first = get_balance(None, asset_id="eth")
+    assert get_balance(None, asset_id="eth") == first
+    get_balance(None, asset_id="usdc")
+    assert calls == ["eth", "usdc"]
+
+    chain.head = 101
+    assert get_balance(None, asset_id="eth") != first
+    assert calls == ["eth", "usdc", "eth"]
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["head"]) == (1, 3, 1, 101)
+
+def test_own_transaction_invalidates_immediately():
+    chain, calls = Chain(), []
+    cache = ToolResultCache(lambda: chain.head, max_bytes=10_000)
+    get_balance = cache.wrap("get_balance", counting(calls))
+
+    def transfer(wallet, amount: str) -> str:
+        raise RuntimeError("reverted")
+
+    get_balance(None, asset_id="eth")
+    with pytest.raises(RuntimeError):
+        cache.invalidating(transfer)(None, amount="1")
+    get_balance(None, asset_id="eth")
+    assert calls == ["eth", "eth"]
+    assert cache.get_stats()["invalidations"] == 1
+
+def test_result_observed_before_an_invalidation_is_not_cached():
+    chain, calls = Chain(), []
+    cache = ToolResultCache(lambda: chain.head, max_bytes=10_000)
+
+    def racing_balance(wallet, asset_id: str) -> str:
+        calls.append(asset_id)
+        cache.invalidate()  # our transfer lands while the balance is being read
+        return "stale"
+
+    get_balance = cache.wrap("get_balance", racing_balance)
+    get_balance(None, asset_id="eth")
+    get_balance(None, asset_id="eth")
+    assert calls == ["eth", "eth"]
+
+def test_lru_eviction_keeps_within_the_memory_cap_and_bypasses_without_a_head():
+    chain, calls = Chain(), []
+    cache = ToolResultCache(lambda: chain.head, max_bytes=200)
+    get_balance = cache.wrap("get_balance", counting(calls))
+
+    for asset in ("a", "b", "c", "a", "d", "e"):
+        get_balance(None, asset_id=asset)
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 200 and stats["evictions"] > 0
+    get_balance(None, asset_id="e")
+    assert calls.count("e") == 1
+
+    chain.head = None
+    get_balance(None, asset_id="e")
+    assert calls.count("e") == 2 and cache.get_stats()["bypassed"] == 1
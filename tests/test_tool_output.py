@@ -0,0 +1,124 @@
+import json
+import re
+from types import SimpleNamespace
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+
+from agent_backend.agent import tool_output
+from agent_backend.agent.tool_output import ToolOutputStore, shorten
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+from agent_backend.utils import count_tokens
+
+TX_HASH = "0x" + "ab" * 32
+
+def busy_block(addresses=2000):
+    return {
+        "block_number": 123,
+        "transactions_count": addresses,
+        "transaction_hashes": [TX_HASH] * addresses,
+        "address_summary": {
+            "total_unique_addresses": addresses,
+            "senders": [f"0x{i:040x}" for i in range(addresses)],
+        },
+    }
+
+def test_small_outputs_are_unchanged():
+    store = ToolOutputStore(max_bytes=1_000_000, default_budget=500)
+    assert store.compact("get_balance", "Balances for wallet: 0.1 eth") == "Balances for wallet: 0.1 eth"
+    assert store.compact("get_address_balance", {"balance_eth": "0.1"}) == {"balance_eth": "0.1"}
+    assert store.get_stats()["entries"] == 0
+
+def test_large_output_is_compacted_under_budget_and_paged_back_in_full():
+    store = ToolOutputStore(max_bytes=1_000_000, default_budget=500, budgets={"get_latest_block": 300})
+    block = busy_block()
+    compacted = store.compact("get_latest_block", block)
+
+    assert count_tokens(json.dumps(compacted)) <= 300 + 60  # budget plus the handle and note
+    assert compacted["block_number"] == 123
+    assert compacted["address_summary"]["total_unique_addresses"] == 2000
+    assert compacted["address_summary"]["senders"][-1].endswith("more")
+    assert compacted["transaction_hashes"][0] == "0xabababab...abab"
+    # The same observation on the next turn reuses the handle
+    assert store.compact("get_latest_block", block) == compacted
+
+    handle, pages, page = compacted["output_handle"], [], 1
+    while True:
+        text = store.read(handle, page)
+        if "out of range" in text:
+            break
+        pages.append(text.split("\n", 1)[1])
+        page += 1
+    assert "".join(pages) == json.dumps(block)
+    assert store.get_stats()["compacted"] == 1
+
+def test_every_page_the_hint_promises_can_be_read():
+    # get_latest_block's budget is smaller than the default page size
+    store = ToolOutputStore(max_bytes=1_000_000, default_budget=500, budgets={"get_latest_block": 300})
+    block = busy_block(addresses=300)
+    compacted = store.compact("get_latest_block", block)
+    pages = int(re.search(r"\((\d+) pages\)", compacted["note"]).group(1))
+
+    texts = [store.read(compacted["output_handle"], page) for page in range(1, pages + 1)]
+
+    assert all(text.startswith(f"Page {page} of {pages} ") for page, text in enumerate(texts, 1))
+    assert "".join(text.split("\n", 1)[1] for text in texts) == json.dumps(block)
+    assert "out of range" in store.read(compacted["output_handle"], pages + 1)
+
+def test_token_counts_are_remembered_across_turns(monkeypatch):
+    counted = []
+
+    def counting(text):
+        counted.append(text)
+        return count_tokens(text)
+
+    monkeypatch.setattr(tool_output, "count_tokens", counting)
+    store = ToolOutputStore(max_bytes=1_000_000, default_budget=500)
+    steps = [(SimpleNamespace(tool="get_latest_block"), busy_block())]
+    full = json.dumps(busy_block(), ensure_ascii=False)
+
+    for _ in range(3):
+        assert store.shortened_any(steps)
+        store.compact_steps(steps)
+
+    assert counted.count(full) == 1
+
+def test_long_text_is_truncated_and_expired_handles_are_reported():
+    store = ToolOutputStore(max_bytes=10_000, default_budget=100)
+    compacted = store.compact("get_wallet_details", "x" * 8_000)
+    assert len(compacted["output"]) < 500
+    store.compact("trade", "y" * 8_000)  # evicts the first output
+    assert "expired" in store.read(compacted["output_handle"])
+
+def test_shorten_keeps_short_lists():
+    assert shorten({"a": [1, 2], "b": TX_HASH[:10]}, 3) == {"a": [1, 2], "b": TX_HASH[:10]}
+
+class Calls(BaseCallbackHandler):
+    def __init__(self):
+        self.tools, self.scratchpads = [], []
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.tools.append(sorted(tool["function"]["name"] for tool in kwargs["invocation_params"]["tools"]))
+        self.scratchpads.append([str(message.content) for message in messages[0] if message.type == "tool"])
+
+def test_agent_sees_the_compacted_output_and_gets_the_reader(monkeypatch):
+    block = busy_block()
+
+    def get_latest_block() -> dict:
+        """Get the latest block."""
+        return block
+
+    monkeypatch.setattr("agent_backend.agent.initialize_agent.get_latest_block", get_latest_block)
+    plan = [{"name": "get_latest_block", "arguments": {}}]
+    executor = create_fake_agent_executor(ScriptedChatModel(plan=plan, reply="Busy block."), FakeWallet())
+    calls = Calls()
+
+    result = executor.invoke(
+        {"messages": [HumanMessage(content="How busy is the latest block?")]}, {"callbacks": [calls]}
+    )
+
+    assert "read_tool_output" not in calls.tools[0]
+    assert "read_tool_output" in calls.tools[1]
+    [observation] = calls.scratchpads[1]
+    assert "output_handle" in observation and len(observation) < len(json.dumps(block)) / 10
+    assert result["output"] == "Busy block."
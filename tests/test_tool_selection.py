@@ -0,0 +1,38 @@
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agent_backend.agent.tool_selection import ToolSelector
+from fakes.fake_agent import FakeWallet, ScriptedChatModel, create_fake_agent_executor
+
+def tool(name):
+    return StructuredTool.from_function(lambda: name, name=name, description=f"The {name} tool")
+
+def test_selects_matching_tools_and_memoizes_schemas():
+    selector = ToolSelector([tool(name) for name in ("get_wallet_details", "deploy_token", "trade", "custom")], convert_to_openai_tool)
+
+    assert selector.select("Deploy a token called Bench") == {"deploy_token", "get_wallet_details", "custom"}
+    # Nothing to go on: the whole catalog
+    assert selector.select("What can you help me with?") == {"get_wallet_details", "deploy_token", "trade", "custom"}
+
+    names = selector.select("swap 1 eth for usdc")
+    assert [schema["function"]["name"] for schema in selector.schemas(names)] == ["get_wallet_details", "trade", "custom"]
+    assert selector.schemas(names) is selector.schemas(frozenset(names))
+
+class BoundTools(BaseCallbackHandler):
+    def __init__(self):
+        self.calls = []
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls.append(sorted(tool["function"]["name"] for tool in kwargs["invocation_params"]["tools"]))
+
+def test_each_llm_call_binds_only_the_selected_tools():
+    plan = [{"name": "deploy_token", "arguments": {"name": "Bench", "symbol": "BEN", "total_supply": "1000"}}]
+    executor = create_fake_agent_executor(ScriptedChatModel(plan=plan, reply="Deployed."), FakeWallet())
+    bound = BoundTools()
+
+    result = executor.invoke({"messages": [HumanMessage(content="Deploy a token called Bench")]}, {"callbacks": [bound]})
+
+    assert result["output"] == "Deployed."
+    assert bound.calls == [["deploy_nft", "deploy_token", "get_wallet_details"]] * 2
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from agent_backend.utils import per_process
+
+def test_per_process_builds_once_per_process():
+    built = []
+
+    @per_process
+    def get_thing():
+        built.append(object())
+        return built[-1]
+
+    assert get_thing.peek() is None
+    assert get_thing() is get_thing() is get_thing.peek()
+    assert len(built) == 1
+
+    # A forked child does not reuse the parent's instance
+    get_thing._pid = -1
+    assert get_thing.peek() is None
+    assert get_thing() is built[1]
+
+def test_per_process_child_is_not_deadlocked_by_a_held_lock():
+    if not hasattr(os, "fork"):
+        pytest.skip("needs fork")
+
+    @per_process
+    def get_thing():
+        return object()
+
+    # Fork while the parent holds the lock, as a thread building the instance would
+    with get_thing._lock:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if get_thing() is not None else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0